@@ -0,0 +1,254 @@
+# batch_fortune.py
+# This file contains the bulk fortune command. It streams birth records from a
+# CSV or JSONL file, computes the Thai/Chinese/BaZi details for each row, fans
+# the AI readings out over an asyncio worker pool that respects request- and
+# token-per-minute budgets, and appends results to a JSONL file that doubles as
+# the checkpoint for resuming after a crash.
+#
+# Usage:
+#   python batch_fortune.py customers.csv -o readings.jsonl --concurrency 16 --rpm 500 --tpm 300000
+#
+# Input rows need a birth_date (YYYY-MM-DD) column and may carry an id and a
+# birth_time (HH:MM, defaults to 12:00).
+
+import argparse
+import asyncio
+import csv
+import datetime
+import json
+import os
+import sys
+import time
+
+import fortune
+from fortune_core import ai_client, metrics, prompts, reading_cache
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RPM = 500
+DEFAULT_TPM = 300000
+# gpt-4o readings for this prompt run to roughly this many completion tokens.
+DEFAULT_EXPECTED_COMPLETION_TOKENS = 1500
+
+
+class TokenBucket:
+    """A per-minute budget refilled continuously; used from a single event loop."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(float(amount), self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def charge(self, amount):
+        """Debits (or, if negative, refunds) tokens after the true cost is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def read_rows(path):
+    """Yields input rows one at a time from a .csv or .jsonl file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def load_checkpoint(path):
+    """Returns the ids already written successfully to the output file."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from a crash; the row is simply redone.
+                continue
+            if "reading" in record:
+                done.add(record["id"])
+    return done
+
+
+def compute_details(row):
+    """
+    Computes the chart details for one input row.
+
+    Args:
+        row (dict): An input row with birth_date and optional birth_time.
+
+    Returns:
+        dict: The record written to the output, without the reading.
+    """
+    birth_date = datetime.date.fromisoformat(row["birth_date"].strip())
+    birth_time = datetime.datetime.strptime((row.get("birth_time") or "12:00").strip(), "%H:%M").time()
+    day_name, thai_color = fortune.get_thai_fortune_details(birth_date)
+    thai_animal, english_animal = fortune.get_chinese_fortune_details(birth_date, birth_time)
+    bazi = fortune.get_bazi_elements(birth_date, birth_time)
+    return {
+        "birth_date": birth_date.isoformat(),
+        "birth_time": birth_time.strftime("%H:%M"),
+        "day_name": day_name,
+        "thai_color": thai_color,
+        "thai_animal": thai_animal,
+        "zodiac": english_animal,
+        "bazi": {
+            "year_pillar": bazi["year_pillar"],
+            "month_pillar": bazi["month_pillar"],
+            "day_pillar": bazi["day_pillar"],
+            "hour_pillar": bazi["hour_pillar"],
+            "dominant_element": bazi["dominant_element"]["chinese"],
+        },
+    }
+
+
+class BatchRunner:
+    """Runs readings for a stream of rows through a bounded asyncio worker pool."""
+
+    def __init__(self, api_key, output_path, concurrency=DEFAULT_CONCURRENCY, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM,
+                 expected_completion_tokens=DEFAULT_EXPECTED_COMPLETION_TOKENS, cache=None, client=None, recorder=None):
+        self.api_key = api_key
+        self.client = client if client is not None else ai_client.get_default_client()
+        self.recorder = recorder if recorder is not None else metrics.get_default_recorder()
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.expected_completion_tokens = expected_completion_tokens
+        self.cache = cache
+        self.done = 0
+        self.failed = 0
+        self.cached = 0
+        self.started = time.monotonic()
+
+    async def _complete(self, messages, trace):
+        estimate = prompts.check_budget(messages) + self.expected_completion_tokens
+        await self.requests.acquire()
+        await self.tokens.acquire(estimate)
+        # The client retries 429/5xx itself, with jittered backoff that honours Retry-After.
+        response = await self.client.acomplete(messages, fortune.FORTUNE_MODEL, api_key=self.api_key, timeout=60)
+        trace.add_response_usage(fortune.FORTUNE_MODEL, response)
+        usage = response.get("usage") or {}
+        if usage.get("total_tokens"):
+            self.tokens.charge(usage["total_tokens"] - estimate)
+        return response["choices"][0]["message"]["content"]
+
+    async def _process(self, row_id, row, out):
+        record = {"id": row_id}
+        trace = metrics.ReadingTrace("batch")
+        try:
+            with trace.stage("chart"):
+                record.update(compute_details(row))
+            birth_time = datetime.datetime.strptime(record["birth_time"], "%H:%M").time()
+            trace.set_inputs(record["day_name"], record["thai_color"], record["thai_animal"], birth_time)
+            with trace.stage("prompt"):
+                messages = fortune.build_fortune_messages(
+                    record["day_name"], record["thai_color"], record["thai_animal"], birth_time
+                )
+            cache_key = reading_cache.make_cache_key(fortune.FORTUNE_MODEL, messages)
+            reading = self.cache.get(cache_key) if self.cache is not None else None
+            if reading is not None:
+                trace.cache_hit = True
+                self.cached += 1
+            else:
+                with trace.stage("generation"):
+                    reading = await self._complete(messages, trace)
+                if self.cache is not None:
+                    self.cache.put(cache_key, reading)
+            record["reading"] = reading
+            self.done += 1
+        except Exception as e:
+            trace.set_error(e)
+            record["error"] = f"{type(e).__name__}: {e}"
+            self.failed += 1
+        self.recorder.record(trace)
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    async def _worker(self, queue, out):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            await self._process(*item, out)
+
+    async def _report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.print_progress()
+
+    def print_progress(self):
+        minutes = (time.monotonic() - self.started) / 60
+        rate = self.done / minutes if minutes else 0.0
+        print(
+            f"\rdone={self.done} cached={self.cached} failed={self.failed} rate={rate:.1f} readings/min",
+            end="", file=sys.stderr, flush=True
+        )
+
+    async def run(self, rows, skip_ids=(), report_interval=5):
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        with open(self.output_path, "a", encoding="utf-8") as out:
+            workers = [asyncio.create_task(self._worker(queue, out)) for _ in range(self.concurrency)]
+            reporter = asyncio.create_task(self._report(report_interval))
+            for index, row in enumerate(rows, start=1):
+                row_id = str(row.get("id") or f"row-{index}")
+                if row_id in skip_ids:
+                    continue
+                await queue.put((row_id, row))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            reporter.cancel()
+        await self.client.aclose()
+        self.print_progress()
+        print(file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate AI fortune readings in bulk.")
+    parser.add_argument("input", help="CSV or JSONL file of birth records")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to append readings to (also the checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM, help="request-per-minute budget")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TPM, help="token-per-minute budget")
+    parser.add_argument("--expected-completion-tokens", type=int, default=DEFAULT_EXPECTED_COMPLETION_TOKENS)
+    parser.add_argument("--no-cache", action="store_true", help="bypass the shared reading cache")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"))
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("OpenAI API key is missing; set OPENAI_API_KEY or pass --api-key")
+
+    skip_ids = load_checkpoint(args.output)
+    if skip_ids:
+        print(f"Resuming: {len(skip_ids)} readings already in {args.output}", file=sys.stderr)
+
+    runner = BatchRunner(
+        args.api_key, args.output,
+        concurrency=args.concurrency, rpm=args.rpm, tpm=args.tpm,
+        expected_completion_tokens=args.expected_completion_tokens,
+        cache=None if args.no_cache else reading_cache.get_default_cache()
+    )
+    asyncio.run(runner.run(read_rows(args.input), skip_ids=skip_ids))
+    return 1 if runner.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+# Benchmarks for the fortune app: micro-benchmarks of the chart and render
+# steps and load tests of the full reading path against a mock OpenAI server.
+# Run them with `python -m benchmarks.run`.
@@ -0,0 +1,236 @@
+# benchmarks/load.py
+# This file contains load tests that drive N concurrent simulated sessions
+# through the full reading path against the mock OpenAI server: chart, prompt,
+# reading cache, single-flight and the pooled AI client, for each engine the
+# app can run. It reports throughput, p50/p95/p99 latency and time to first
+# text, upstream calls, the thread high-water mark and how much memory each
+# engine's run added. The stream, sectioned and jobs engines run the app's own
+# code from fortune_core.readings.
+
+import concurrent.futures
+import functools
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+import fortune
+from fortune_core import ai_client, jobs, metrics, reading_cache, readings, singleflight
+from fortune_core.chart import compute_chart
+
+from benchmarks import micro
+
+ENGINES = ("classic", "stream", "sectioned", "jobs")
+DEFAULT_SESSIONS = 32
+DEFAULT_READINGS_PER_SESSION = 4
+# Fraction of readings that reuse a popular input, as real traffic does.
+DEFAULT_REPEAT_RATIO = 0.2
+BENCH_API_KEY = "sk-benchmark"
+
+
+def _rss_mb():
+    """The process's resident memory now, in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        # Without /proc only the process's peak is known, so growth then only
+        # counts memory beyond what earlier engines in this process reached.
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class _Sampler:
+    """Samples the live thread count and resident memory in the background while a load test runs."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.peak_rss_mb = _rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        self.peak_threads = max(self.peak_threads, threading.active_count())
+        self.peak_rss_mb = max(self.peak_rss_mb, _rss_mb())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class _Session:
+    """The reading path of one engine, with state shared by every simulated session."""
+
+    def __init__(self, engine, client, cache, flights):
+        self.engine = engine
+        self.client = client
+        self.cache = cache
+        self.flights = flights
+        self.pool = None
+        if engine == "jobs":
+            self.queue = jobs.JobQueue("")
+            handler = functools.partial(
+                readings.run_reading_job, api_key=BENCH_API_KEY, cache=cache, client=client, flights=flights,
+                recorder=metrics.MetricsRecorder()
+            )
+            self.pool = jobs.WorkerPool(self.queue, {"reading": handler}, poll_interval=0.05).start()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.stop(timeout=5)
+            self.queue.close()
+
+    def read(self, birth_date, birth_time):
+        """Runs one reading; returns (latency, time to first text or None, error or None)."""
+        started = time.perf_counter()
+        first_text, error = getattr(self, f"_read_{self.engine}")(birth_date, birth_time, started)
+        return time.perf_counter() - started, first_text, error
+
+    def _reading_args(self, birth_date, birth_time):
+        chart = compute_chart(birth_date, birth_time)
+        return BENCH_API_KEY, chart.day_name_th, chart.color_th, chart.zodiac_th_short, birth_time
+
+    def _read_classic(self, birth_date, birth_time, started):
+        day_name, color = fortune.get_thai_fortune_details(birth_date)
+        thai_animal, _ = fortune.get_chinese_fortune_details(birth_date, birth_time)
+        trace = metrics.ReadingTrace("classic")
+        fortune.generate_ai_fortune(
+            BENCH_API_KEY, day_name, color, thai_animal, birth_time, cache=self.cache, client=self.client, trace=trace
+        )
+        # Not streamed: the first text is the whole reading.
+        return time.perf_counter() - started, trace.error_class
+
+    def _read_stream(self, birth_date, birth_time, started):
+        first_text = None
+        try:
+            for _ in readings.stream_reading(
+                *self._reading_args(birth_date, birth_time), cache=self.cache, client=self.client, flights=self.flights
+            ):
+                if first_text is None:
+                    first_text = time.perf_counter() - started
+        except Exception as e:
+            return first_text, type(e).__name__
+        return first_text, None
+
+    def _read_sectioned(self, birth_date, birth_time, started):
+        # A failed section is counted even when the rest of the reading succeeds.
+        trace = metrics.ReadingTrace("sectioned")
+        try:
+            readings.sectioned_reading(
+                *self._reading_args(birth_date, birth_time), cache=self.cache, client=self.client,
+                flights=self.flights, trace=trace
+            )
+        except Exception:
+            pass
+        return time.perf_counter() - started, trace.error_class
+
+    def _read_jobs(self, birth_date, birth_time, started, poll_interval=0.05):
+        # As the app does: submit, then poll the job until it finishes.
+        job_id = self.queue.submit(
+            "reading",
+            {"engine": "stream", "birth_date": birth_date.isoformat(), "birth_time": birth_time.strftime("%H:%M")},
+            idempotency_key=f"{birth_date.isoformat()}:{birth_time:%H:%M}"
+        )
+        first_text = None
+        while True:
+            job = self.queue.get(job_id)
+            if first_text is None and (job.partial or job.result):
+                first_text = time.perf_counter() - started
+            if job.finished:
+                return first_text, job.error
+            time.sleep(poll_interval)
+
+
+def _summarize(values):
+    values = sorted(v for v in values if v is not None)
+    return {
+        "p50_s": metrics.percentile(values, 0.50),
+        "p95_s": metrics.percentile(values, 0.95),
+        "p99_s": metrics.percentile(values, 0.99),
+    }
+
+
+def run(engine, server, sessions=DEFAULT_SESSIONS, readings_per_session=DEFAULT_READINGS_PER_SESSION,
+        repeat_ratio=DEFAULT_REPEAT_RATIO, seed=0):
+    """
+    Runs one load test against a started mock server.
+
+    Every session runs its readings back to back, as a user clicking through
+    the app would; all sessions start together.
+
+    Args:
+        engine (str): One of ENGINES.
+        server (mock_openai.MockOpenAIServer): The upstream to call.
+        sessions (int): Concurrent simulated sessions.
+        readings_per_session (int): Readings each session asks for.
+        repeat_ratio (float): Fraction of readings for a small set of hot inputs.
+        seed (int): Seeds the choice of inputs.
+
+    Returns:
+        dict: Throughput, latency and first-text percentiles, errors, upstream
+        calls, the thread high-water mark and the resident memory the run added.
+    """
+    import openai
+
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}; expected one of {ENGINES}")
+    openai.api_base = server.url
+    rng = random.Random(seed)
+    births = micro.sample_births(sessions * readings_per_session, seed=seed)
+    hot = births[:5]
+    plans = [
+        [rng.choice(hot) if rng.random() < repeat_ratio else births[s * readings_per_session + r]
+         for r in range(readings_per_session)]
+        for s in range(sessions)
+    ]
+
+    client = ai_client.FortuneAIClient(api_key=BENCH_API_KEY, pool_size=max(sessions, 8), backoff_cap=2.0)
+    cache = reading_cache.ReadingCache(memory=reading_cache.MemoryLRU())
+    flights = singleflight.SingleFlight()
+    session = _Session(engine, client, cache, flights)
+    upstream_before = server.stats()
+    rss_before = _rss_mb()
+
+    def simulate(plan):
+        return [session.read(birth_date, birth_time) for birth_date, birth_time in plan]
+
+    try:
+        with _Sampler() as sampler, concurrent.futures.ThreadPoolExecutor(max_workers=sessions) as executor:
+            started = time.perf_counter()
+            outcomes = [outcome for result in executor.map(simulate, plans) for outcome in result]
+            elapsed = time.perf_counter() - started
+    finally:
+        session.close()
+        ai_client.close_session()
+
+    upstream_after = server.stats()
+    errors = {}
+    for _, _, error in outcomes:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    return {
+        "engine": engine,
+        "sessions": sessions,
+        "readings": len(outcomes),
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(outcomes) / elapsed,
+        "latency": _summarize(latency for latency, _, _ in outcomes),
+        "first_text": _summarize(first for _, first, _ in outcomes),
+        "errors": errors,
+        "upstream_requests": upstream_after["requests"] - upstream_before["requests"],
+        "peak_threads": sampler.peak_threads,
+        "rss_growth_mb": max(0.0, sampler.peak_rss_mb - rss_before),
+    }
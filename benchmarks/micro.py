@@ -0,0 +1,125 @@
+# benchmarks/micro.py
+# This file contains micro-benchmarks for the CPU-bound steps of a reading:
+# the chart functions, prompt assembly, cache keys, the offline reading, the
+# HTML render step and the vectorized engines. Inputs are drawn from a fixed
+# seed, so runs on the same machine are comparable.
+
+import datetime
+import random
+import timeit
+
+import fortune
+from fortune_core import chart, metrics, offline, prompts, reading_cache, render, sexagenary
+
+DEFAULT_ROUNDS = 30
+DEFAULT_MIN_ROUND_SECONDS = 0.02
+
+
+def sample_births(count=1000, seed=0):
+    """Returns ``count`` reproducible (birth_date, birth_time) pairs from the app's date range."""
+    rng = random.Random(seed)
+    first = datetime.date(1950, 1, 1).toordinal()
+    last = datetime.date(2010, 12, 31).toordinal()
+    return [
+        (datetime.date.fromordinal(rng.randint(first, last)), datetime.time(rng.randrange(24), rng.randrange(60)))
+        for _ in range(count)
+    ]
+
+
+def time_calls(fn, rounds=DEFAULT_ROUNDS, min_round_seconds=DEFAULT_MIN_ROUND_SECONDS):
+    """
+    Times ``fn()`` in rounds long enough to rise above timer resolution.
+
+    Returns:
+        dict: Per-call p50/p95/p99 in microseconds over the rounds, and calls per second.
+    """
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_round_seconds / max(elapsed, 1e-9)))
+    per_call = sorted(t / number * 1e6 for t in timer.repeat(repeat=rounds, number=number))
+    return {
+        "p50_us": metrics.percentile(per_call, 0.50),
+        "p95_us": metrics.percentile(per_call, 0.95),
+        "p99_us": metrics.percentile(per_call, 0.99),
+        "calls_per_s": 1e6 / metrics.percentile(per_call, 0.50),
+    }
+
+
+def cycling(items):
+    """Returns a zero-argument function yielding the items round-robin, for varied inputs."""
+    index = -1
+
+    def next_item():
+        nonlocal index
+        index = (index + 1) % len(items)
+        return items[index]
+
+    return next_item
+
+
+def benchmarks(births):
+    """Returns (name, zero-argument callable) pairs to time."""
+    birth = cycling(births)
+    compute_uncached = chart.compute_chart.__wrapped__
+    charts = [compute_uncached(d, t) for d, t in births]
+    chart_of = cycling(charts)
+    reading = offline.generate_offline_fortune(*births[0])
+    messages = prompts.build_messages("enhanced", "จันทร์", "เหลือง", "ม้า", births[0][1])
+
+    def stream_render(chunk_size=24):
+        renderer = render.StreamRenderer()
+        for i in range(0, len(reading), chunk_size):
+            renderer.feed(reading[i:i + chunk_size])
+        return renderer.html
+
+    def enhanced_messages():
+        c, (_, t) = chart_of(), birth()
+        return prompts.build_messages("enhanced", c.day_name_th, c.color_th, c.zodiac_th_short, t)
+
+    cases = [
+        ("sexagenary.pillars", lambda: sexagenary.pillars(*birth())),
+        ("chart.compute_chart.uncached", lambda: compute_uncached(*birth())),
+        ("chart.compute_chart.cached", lambda: chart.compute_chart(*births[0])),
+        ("chart.bazi", lambda: chart_of().bazi()),
+        ("fortune.get_thai_fortune_details", lambda: fortune.get_thai_fortune_details(birth()[0])),
+        ("fortune.get_chinese_fortune_details", lambda: fortune.get_chinese_fortune_details(*birth())),
+        ("fortune.get_bazi_elements", lambda: fortune.get_bazi_elements(*birth())),
+        ("prompts.build_messages", enhanced_messages),
+        ("prompts.count_message_tokens", lambda: prompts.count_message_tokens(messages)),
+        ("reading_cache.make_cache_key", lambda: reading_cache.make_cache_key("gpt-4o", messages, max_tokens=2000)),
+        ("offline.generate_offline_fortune", lambda: offline.generate_offline_fortune(*birth())),
+        ("render.render_markdown", lambda: render.render_markdown(reading)),
+        ("render.render_reading.memoized", lambda: render.render_reading(reading)),
+        ("render.StreamRenderer.whole_reading", stream_render),
+    ]
+
+    try:
+        import numpy as np
+    except ImportError:
+        return cases
+    from fortune_core import auspicious, compatibility, vectorized
+
+    dates = np.array([d for d, _ in births], dtype="datetime64[D]")
+    hours = np.array([t.hour for _, t in births])
+    codes = compatibility.chart_codes(dates, hours)
+    cases += [
+        ("vectorized.bazi_codes.1000", lambda: vectorized.bazi_codes(dates, hours)),
+        ("auspicious.find_auspicious_days", lambda: auspicious.find_auspicious_days(*birth())),
+        ("compatibility.top_matches.1000", lambda: compatibility.top_matches(codes)),
+    ]
+    return cases
+
+
+def run(rounds=DEFAULT_ROUNDS, only=None):
+    """
+    Runs every micro-benchmark, or those whose name contains one of ``only``.
+
+    Returns:
+        dict: Name -> timing stats from time_calls().
+    """
+    results = {}
+    for name, fn in benchmarks(sample_births()):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = time_calls(fn, rounds=rounds)
+    return results
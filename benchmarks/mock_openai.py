@@ -0,0 +1,215 @@
+# benchmarks/mock_openai.py
+# This file contains a local stand-in for the OpenAI chat completion endpoint,
+# so benchmarks exercise the real client, retry and streaming code without
+# touching the network or spending tokens. Latency to the first token, token
+# rate, reply length and error injection are configurable, and replies are
+# deterministic for a given seed.
+#
+# Usage:
+#   python -m benchmarks.mock_openai --port 8089 --latency 0.5 --token-rate 60 --error-rate 0.02
+#   OPENAI_API_BASE=http://127.0.0.1:8089/v1 streamlit run streamlit_app.py
+
+import argparse
+import http.server
+import json
+import random
+import threading
+import time
+
+DEFAULT_LATENCY = 0.3
+DEFAULT_TOKEN_RATE = 80.0
+DEFAULT_COMPLETION_TOKENS = 400
+
+# Reply text, one list item per simulated token.
+REPLY_TOKENS = tuple(
+    "**เปิดฟ้าอ่านชะตา** ดวงชะตา ของ ท่าน มี พลัง ธาตุ ไฟ เป็น หลัก เสริม ด้วย ธาตุ ไม้ "
+    "จาก ปี นักษัตร ทำให้ มี ความ มุ่งมั่น และ กล้า ตัดสินใจ \n\n"
+    "**การงาน** ปี นี้ มี โอกาส ก้าวหน้า แต่ ต้อง ระวัง คำพูด กับ ผู้ใหญ่ \n"
+    "**การเงิน** รายรับ สม่ำเสมอ ควร เก็บออม ใน เดือน ที่ ดวง ขึ้น \n".split(" ")
+)
+
+
+class MockOpenAIServer:
+    """
+    A threaded HTTP server answering ``POST .../chat/completions``.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free one.
+        latency (float): Seconds before the first token (or the whole reply).
+        token_rate (float): Tokens per second after the first; 0 sends them all at once.
+        completion_tokens (int): Reply length, capped by the request's max_tokens.
+        error_rate (float): Fraction of requests answered with an error instead.
+        error_status (int): HTTP status of injected errors, e.g. 429, 500 or 503.
+        retry_after (float, optional): Retry-After header sent with injected errors.
+        seed (int): Seeds the error injection.
+    """
+
+    def __init__(self, port=0, latency=DEFAULT_LATENCY, token_rate=DEFAULT_TOKEN_RATE,
+                 completion_tokens=DEFAULT_COMPLETION_TOKENS, error_rate=0.0, error_status=429,
+                 retry_after=None, seed=0, host="127.0.0.1"):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "streamed": 0, "errors": 0, "completion_tokens": 0}
+        self._httpd = http.server.ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """The API base to point openai.api_base at."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+def _make_handler(server):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections alive, so the client's connection pooling is exercised.
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            server._count("requests")
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"unknown path {self.path}", "type": "invalid_request_error"}})
+                return
+            if server._should_fail():
+                server._count("errors")
+                headers = {}
+                if server.retry_after is not None:
+                    headers["Retry-After"] = str(server.retry_after)
+                self._send_json(
+                    server.error_status,
+                    {"error": {"message": "injected error", "type": "mock_error", "code": None}},
+                    headers
+                )
+                return
+
+            n_tokens = min(server.completion_tokens, body.get("max_tokens") or server.completion_tokens)
+            tokens = [REPLY_TOKENS[i % len(REPLY_TOKENS)] + " " for i in range(n_tokens)]
+            prompt_tokens = len(json.dumps(body.get("messages", []), ensure_ascii=False)) // 3
+            server._count("completion_tokens", n_tokens)
+            time.sleep(server.latency)
+            if body.get("stream"):
+                server._count("streamed")
+                self._stream(body, tokens)
+            else:
+                if server.token_rate:
+                    time.sleep(max(0, n_tokens - 1) / server.token_rate)
+                self._send_json(200, {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "".join(tokens)},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": n_tokens,
+                        "total_tokens": prompt_tokens + n_tokens,
+                    },
+                })
+
+        def _send_json(self, status, payload, headers=None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, body, tokens):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, token in enumerate(tokens):
+                if i and server.token_rate:
+                    time.sleep(1 / server.token_rate)
+                chunk = {
+                    "id": "chatcmpl-mock",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                }
+                self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI chat completion endpoint.")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="seconds to the first token")
+    parser.add_argument("--token-rate", type=float, default=DEFAULT_TOKEN_RATE, help="tokens per second; 0 = instant")
+    parser.add_argument("--completion-tokens", type=int, default=DEFAULT_COMPLETION_TOKENS)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--retry-after", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = MockOpenAIServer(
+        args.port, latency=args.latency, token_rate=args.token_rate, completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate, error_status=args.error_status, retry_after=args.retry_after, seed=args.seed
+    )
+    print(f"Mock OpenAI API listening on {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
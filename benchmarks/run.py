@@ -0,0 +1,180 @@
+# benchmarks/run.py
+# This file contains the benchmark runner. It runs the micro-benchmarks and the
+# load tests against a local mock OpenAI server, prints a report, writes the
+# results as JSON and compares them with a stored baseline, exiting non-zero
+# when a metric regresses by more than the tolerance. No baseline is shipped:
+# record one on the machine you compare on with --save-baseline.
+#
+# Usage:
+#   python -m benchmarks.run --save-baseline
+#   python -m benchmarks.run --engine stream --engine jobs --sessions 64 --error-rate 0.05
+#   python -m benchmarks.run --suite micro --only chart --only render
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+from benchmarks import load, micro, mock_openai
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_TOLERANCE = 0.15
+# Metrics where a larger value is an improvement; for every other one, smaller is.
+HIGHER_IS_BETTER = ("calls_per_s", "throughput_per_s")
+# Load-test fields that describe the run rather than measure it.
+_DESCRIPTIVE = ("engine", "sessions", "readings", "errors", "elapsed_s", "rss_growth_mb")
+
+
+def flatten(results):
+    """Flattens nested results into ``{"load.stream.latency.p95_s": value}`` for comparison."""
+    flat = {}
+
+    def walk(prefix, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key not in _DESCRIPTIVE:
+                    walk(f"{prefix}.{key}" if prefix else key, item)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = value
+
+    walk("", {"micro": results.get("micro", {}), "load": results.get("load", {})})
+    return flat
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares two result sets metric by metric.
+
+    Returns:
+        list: ``(metric, baseline, current, change, regressed)`` for every
+        metric present in both, where change is the relative difference.
+    """
+    rows = []
+    base = flatten(baseline)
+    for metric, value in sorted(flatten(current).items()):
+        before = base.get(metric)
+        if before is None or not before:
+            continue
+        change = (value - before) / before
+        worse = -change if metric.endswith(HIGHER_IS_BETTER) else change
+        rows.append((metric, before, value, change, worse > tolerance))
+    return rows
+
+
+def _format(value):
+    return "–" if value is None else f"{value:.4g}"
+
+
+def print_report(results, out=sys.stdout):
+    if results.get("micro"):
+        print("\nMicro-benchmarks (per call, µs)", file=out)
+        print(f"{'benchmark':<40} {'p50':>10} {'p95':>10} {'p99':>10} {'calls/s':>12}", file=out)
+        for name, stats in results["micro"].items():
+            print(
+                f"{name:<40} {_format(stats['p50_us']):>10} {_format(stats['p95_us']):>10} "
+                f"{_format(stats['p99_us']):>10} {_format(stats['calls_per_s']):>12}",
+                file=out
+            )
+    for engine, stats in results.get("load", {}).items():
+        latency, first = stats["latency"], stats["first_text"]
+        print(f"\nLoad test: {engine}, {stats['sessions']} sessions, {stats['readings']} readings", file=out)
+        print(f"  throughput        {stats['throughput_per_s']:.2f} readings/s over {stats['elapsed_s']:.2f}s", file=out)
+        print(
+            f"  latency (s)       p50 {_format(latency['p50_s'])}  p95 {_format(latency['p95_s'])}  "
+            f"p99 {_format(latency['p99_s'])}",
+            file=out
+        )
+        print(
+            f"  first text (s)    p50 {_format(first['p50_s'])}  p95 {_format(first['p95_s'])}  "
+            f"p99 {_format(first['p99_s'])}",
+            file=out
+        )
+        print(f"  upstream requests {stats['upstream_requests']}", file=out)
+        print(f"  peak threads      {stats['peak_threads']}", file=out)
+        print(f"  RSS growth        +{stats['rss_growth_mb']:.1f} MB", file=out)
+        if stats["errors"]:
+            print(f"  errors            {stats['errors']}", file=out)
+
+
+def print_comparison(rows, tolerance=DEFAULT_TOLERANCE, out=sys.stdout):
+    print(f"\nComparison with baseline (tolerance {tolerance:.0%})", file=out)
+    print(f"{'metric':<58} {'baseline':>10} {'current':>10} {'change':>8}", file=out)
+    for metric, before, value, change, regressed in rows:
+        flag = "  REGRESSED" if regressed else ""
+        print(f"{metric:<58} {_format(before):>10} {_format(value):>10} {change:>+8.1%}{flag}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the fortune benchmarks against a local mock OpenAI server.")
+    parser.add_argument("--suite", choices=("micro", "load", "all"), default="all")
+    parser.add_argument("--only", action="append", help="micro-benchmarks whose name contains this; repeatable")
+    parser.add_argument("--rounds", type=int, default=micro.DEFAULT_ROUNDS, help="timing rounds per micro-benchmark")
+    parser.add_argument("--engine", action="append", choices=load.ENGINES,
+                        help="engine to load test; repeatable (default: all)")
+    parser.add_argument("--sessions", type=int, default=load.DEFAULT_SESSIONS, help="concurrent simulated sessions")
+    parser.add_argument("--readings", type=int, default=load.DEFAULT_READINGS_PER_SESSION,
+                        help="readings per session")
+    parser.add_argument("--repeat-ratio", type=float, default=load.DEFAULT_REPEAT_RATIO,
+                        help="fraction of readings that reuse a popular input")
+    parser.add_argument("--latency", type=float, default=mock_openai.DEFAULT_LATENCY,
+                        help="mock seconds to the first token")
+    parser.add_argument("--token-rate", type=float, default=mock_openai.DEFAULT_TOKEN_RATE,
+                        help="mock tokens per second; 0 = instant")
+    parser.add_argument("--completion-tokens", type=int, default=mock_openai.DEFAULT_COMPLETION_TOKENS)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock requests that fail")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative change beyond which a metric counts as regressed")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "micro": {},
+        "load": {},
+    }
+    if args.suite in ("micro", "all"):
+        results["micro"] = micro.run(rounds=args.rounds, only=args.only)
+    if args.suite in ("load", "all"):
+        with mock_openai.MockOpenAIServer(
+            latency=args.latency, token_rate=args.token_rate, completion_tokens=args.completion_tokens,
+            error_rate=args.error_rate, error_status=args.error_status, seed=args.seed
+        ) as server:
+            for engine in args.engine or load.ENGINES:
+                results["load"][engine] = load.run(
+                    engine, server, sessions=args.sessions, readings_per_session=args.readings,
+                    repeat_ratio=args.repeat_ratio, seed=args.seed
+                )
+
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    print_comparison(rows, args.tolerance)
+    return 1 if any(regressed for *_, regressed in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
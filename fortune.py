@@ -4,7 +4,10 @@
 
 import datetime
 import os
-import openai # Import the openai library (older version syntax v0.28.0)
+
+from fortune_core import ai_client, metrics, prompts, reading_cache, singleflight
+from fortune_core.chart import compute_chart
+from fortune_core.tables import DAY_COLORS_EN, WEEKDAYS_EN, ZODIAC_EN, ZODIAC_TH
 
 def get_thai_fortune_details(birth_date):
     """
@@ -16,43 +19,68 @@ def get_thai_fortune_details(birth_date):
     Returns:
         tuple: A tuple containing the day name and its associated color.
     """
+    # A plain weekday lookup; it needs no chart, so no solar-term table either.
     day_index = birth_date.weekday()
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    day_name = days[day_index]
-
-    thai_colors = {
-        "Sunday": "Red",
-        "Monday": "Yellow",
-        "Tuesday": "Pink",
-        "Wednesday": "Green",
-        "Thursday": "Orange",
-        "Friday": "Blue",
-        "Saturday": "Purple"
-    }
-    return day_name, thai_colors[day_name]
-
-def get_chinese_fortune_details(year):
+    return WEEKDAYS_EN[day_index], DAY_COLORS_EN[day_index]
+
+def get_chinese_fortune_details(year, birth_time=None):
     """
     Determines the Chinese Zodiac animal.
 
     Args:
-        year (int): The user's year of birth.
+        year (int | datetime.date): The user's year of birth, or better their
+            date of birth, in which case the zodiac year starts at Lichun (立春)
+            rather than on January 1st.
+        birth_time (datetime.time, optional): The user's time of birth, used to
+            place births on the day of Lichun itself.
 
     Returns:
         str: The name of the zodiac animal.
     """
-    zodiac_animals = {
-        "Rat": "ชวด (หนู)", "Ox": "ฉลู (วัว)", "Tiger": "ขาล (เสือ)", 
-        "Rabbit": "เถาะ (กระต่าย)", "Dragon": "มะโรง (มังกร)", "Snake": "มะเส็ง (งูเล็ก)",
-        "Horse": "มะเมีย (ม้า)", "Goat": "มะแม (แพะ)", "Monkey": "วอก (ลิง)",
-        "Rooster": "ระกา (ไก่)", "Dog": "จอ (สุนัข)", "Pig": "กุน (หมู)"
-    }
-    english_zodiacs = ["Rat", "Ox", "Tiger", "Rabbit", "Dragon", "Snake", "Horse", "Goat", "Monkey", "Rooster", "Dog", "Pig"]
+    if isinstance(year, datetime.date):
+        chart = compute_chart(year, birth_time)
+        return chart.zodiac_th, chart.zodiac_en
     index = (year - 4) % 12
-    animal_key = english_zodiacs[index]
-    return zodiac_animals[animal_key], animal_key # Return both Thai and English names
+    return ZODIAC_TH[index], ZODIAC_EN[index] # Return both Thai and English names
+
+def get_bazi_elements(birth_date, birth_time):
+    """
+    Determines the four BaZi pillars and the dominant element.
+
+    The pillars come from the sexagenary calendar engine, so the year and
+    month follow the solar terms; the dominant element is the day master,
+    the element of the day stem.
+
+    Args:
+        birth_date (datetime.date): The user's date of birth.
+        birth_time (datetime.time): The user's time of birth.
+
+    Returns:
+        dict: The year/month/day/hour pillars and the dominant element details.
+    """
+    return compute_chart(birth_date, birth_time).bazi()
+
+FORTUNE_MODEL = "gpt-4o" # Upgraded to the latest model for best quality
 
-def generate_ai_fortune(api_key, day_name, thai_color, thai_animal, birth_time):
+def build_fortune_messages(day_name, thai_color, thai_animal, birth_time):
+    """
+    Builds the chat messages for a detailed fortune in Thai.
+
+    Args:
+        day_name (str): The day of the week of birth (English).
+        thai_color (str): The lucky color (English).
+        thai_animal (str): The Chinese zodiac animal (Thai).
+        birth_time (datetime.time): The user's time of birth.
+
+    Returns:
+        list: The messages to send to the chat completion endpoint.
+    """
+    # The instructions are a static prefix shared by every user; only the
+    # short chart block at the end differs.
+    return prompts.build_messages("classic", day_name, thai_color, thai_animal, birth_time)
+
+def generate_ai_fortune(api_key, day_name, thai_color, thai_animal, birth_time, cache=None, request_timeout=60,
+                        client=None, trace=None):
     """
     Generates a detailed fortune in Thai.
 
@@ -62,53 +90,75 @@ def generate_ai_fortune(api_key, day_name, thai_color, thai_animal, birth_time):
         thai_color (str): The lucky color (English).
         thai_animal (str): The Chinese zodiac animal (Thai).
         birth_time (datetime.time): The user's time of birth.
+        cache (reading_cache.ReadingCache, optional): Where to look up and store
+            readings. Defaults to the process-wide cache; pass False to disable.
+        request_timeout (float): Seconds to wait for the AI before giving up.
+        client (ai_client.FortuneAIClient, optional): The pooled client to call
+            through. Defaults to the process-wide client.
+        trace (metrics.ReadingTrace, optional): Receives the prompt and generation
+            timings, token usage, cache outcome and error class. When omitted, a
+            trace is recorded to the process-wide metrics recorder.
 
     Returns:
         str: A detailed, AI-generated fortune in Thai, or an error message.
     """
     if not api_key:
         return "Error: OpenAI API key is missing."
-    
+
+    # Imported here so the chart helpers above work without the AI stack installed.
+    import openai # Older version syntax v0.28.0
+
+    if trace is None:
+        # Without a caller-owned trace, the reading records its own.
+        trace = metrics.ReadingTrace("classic")
+        trace.set_inputs(day_name, thai_color, thai_animal, birth_time)
+        try:
+            return generate_ai_fortune(
+                api_key, day_name, thai_color, thai_animal, birth_time,
+                cache=cache, request_timeout=request_timeout, client=client, trace=trace
+            )
+        finally:
+            metrics.get_default_recorder().record(trace)
+
     try:
         # --- Using Stable Library Version (v0.28.0) ---
-        openai.api_key = api_key
-
-        # --- Generate Fortune Text in Thai ---
-        text_prompt = (
-            f"จงสวมบทบาทเป็น 'ซินแสผู้เชี่ยวชาญศาสตร์จีนระดับปรมาจารย์' ทำการวิเคราะห์ดวงชะตา (ปาจื่อ - 八字) ของบุคคลผู้ถือกำเนิดในวัน {day_name}, เวลา {birth_time.strftime('%H:%M')}, ในปีนักษัตร {thai_animal} (ซึ่งมีรากฐานธาตุตามปีเกิด) โดยมีสี {thai_color} เป็นสีเสริมดวงชะตา.\n\n"
-            f"**คำสั่งในการวิเคราะห์ดวงชะตา:**\n"
-            f"จงเริ่มต้นด้วยการ 'เปิดฟ้าอ่านชะตา' โดยวิเคราะห์ปัจจัยพื้นฐานแห่ง 'ฟ้า-ดิน-คน' ของดวงชะตานี้ก่อน:\n"
-            f"   - **ฟ้า (天):** อธิบายว่าพลังแห่งปีนักษัตร {thai_animal} กำหนด 'ธาตุประจำตัว' และภาพรวมแห่งชีวิตไว้อย่างไร\n"
-            f"   - **ดิน (地):** วิเคราะห์ว่าพลังหยิน (陰) หรือ หยาง (陽) จากเวลาตกฟาก {birth_time.strftime('%H:%M')} ส่งผลต่อเสถียรภาพและจังหวะชีวิตอย่างไร\n"
-            f"   - **คน (人):** อธิบายว่าอิทธิพลจากวันเกิด ({day_name}) ตามคติไทย ช่วยเสริมหรือขัดเกลาพลังจากฟ้าและดินอย่างไรบ้าง\n"
-            f"จงอธิบายปฏิสัมพันธ์ของทั้งสามส่วนนี้ เพื่อสร้างรากฐานความเข้าใจที่ลึกซึ้งและน่าเชื่อถือสูงสุด\n\n"
-            f"เมื่อวางรากฐานแห่งชะตาแล้ว จึงเริ่ม 'ชี้ชัดพยากรณ์' อย่างละเอียดในหัวข้อต่อไปนี้:\n"
-            f"1.  **วิเคราะห์แก่นแท้และพลังธาตุ:** เจาะลึกถึงบุคลิกภาพ อุปนิสัย จุดแข็งที่ควรส่งเสริม และจุดอ่อนที่ต้องระวัง ตามหลักเบญจธาตุ (ดิน น้ำ ไฟ ไม้ ทอง)\n"
-            f"2.  **ระดับวาสนาและคำเตือนที่ต้องจำให้ขึ้นใจ:** จากการวิเคราะห์ทั้งหมด ให้ประเมิน 'คะแนนวาสนา' เต็ม 100 (เกณฑ์: 90+ คือดวงชะตาระดับสูง, 60-89 คือระดับปานกลาง-ดี) จากนั้นให้อธิบายถึง 'วาสนาที่ดี' หรือพรสวรรค์ที่โดดเด่นของดวงชะตานี้ แล้วจึงให้ **'คำเตือน' ที่ใช้ภาษากระชับ รุนแรง แต่แฝงด้วยความปรารถนาดี (ขอความยาวเป็นพิเศษในส่วนนี้เพื่อความชัดเจน) เพื่อให้ผู้รับสารจำขึ้นใจและตระหนักถึงผลที่จะตามมา**\n"
-            f"3.  **พยากรณ์ชะตา 6 เดือนข้างหน้า:** วิเคราะห์แนวโน้มสำคัญในด้าน การงาน, การเงิน, และความรัก ที่จะเกิดขึ้นในอีก 6 เดือนนับจากนี้ ชี้ชัดถึงเดือนที่โดดเด่นและเดือนที่ต้องระมัดระวัง\n"
-            f"4.  **เส้นทางแห่งความมั่งคั่ง (การงาน-การเงิน):** ชี้แนะอาชีพที่ส่งเสริมธาตุประจำตัว ทิศทางการลงทุนที่เหมาะสม **เพิ่มหัวข้อ 'มุมมองจากเจ้าคนนายคน (สิ่งที่หัวหน้างานคิดกับท่านในตอนนี้)' โดยให้วิเคราะห์แบบตรงไปตรงมา ไม่ต้องอ้อมค้อม แต่ให้เป็นไปในเชิงสร้างสรรค์เพื่อการพัฒนา ไม่บั่นทอนกำลังใจ** และสุดท้ายมอบ 'คำคมนำทาง' ที่สร้างแรงบันดาลใจในการทำงาน 1 ประโยค\n"
-            f"5.  **วาสนาแห่งรักและเครือข่ายสัมพันธ์ (ความรัก-สังคม):** วิเคราะห์ลักษณะเนื้อคู่ตามธาตุที่สมพงษ์ วิธีการเสริมสร้างเสน่ห์ และการบริหารความสัมพันธ์กับคนรอบข้าง\n"
-            f"6.  **สมดุลแห่งสังขาร (สุขภาพ):** ให้คำแนะนำในการดูแลสุขภาพตามธาตุเจ้าเรือน และอวัยวะที่ต้องใส่ใจเป็นพิเศษ\n"
-            f"7.  **กลยุทธ์ปรับเปลี่ยนชะตา:** แนะนำแนวทางการใช้ชีวิต การปรับสภาพแวดล้อม (ฮวงจุ้ย) หรือการใช้วัตถุมงคล/สีมงคล เพื่อปรับสมดุลธาตุและเสริมสร้างสิริมงคล\n\n"
-            f"**ส่วนสุดท้าย: บทสรุปสำหรับท่าน (ฉบับเข้าใจง่าย)**\n"
-            f"หลังจากคำพยากรณ์ทั้งหมด จงสรุปใจความสำคัญในแต่ละด้าน (ภาพรวม, การงาน, ความรัก, และคำเตือนที่สำคัญที่สุด) ให้เป็นภาษาที่คนทั่วไปเข้าใจง่ายและนำไปใช้ได้ทันที โดยแยกเป็นข้อๆ\n\n"
-            f"จงรจนาคำพยากรณ์ทั้งหมดเป็น **'ภาษาไทย'** ด้วยลีลาของซินแสผู้ทรงภูมิ มีความหนักแน่น ชัดเจน และให้คำแนะนำที่สามารถนำไปปรับใช้ในชีวิตได้จริง"
-        )
-
-
-        chat_completion = openai.ChatCompletion.create(
-            model="gpt-4o", # Upgraded to the latest model for best quality
-            messages=[{"role": "user", "content": text_prompt}],
-            request_timeout=60
-        )
-        text_fortune = chat_completion['choices'][0]['message']['content']
-        
+        if client is None:
+            client = ai_client.get_default_client()
+        model = FORTUNE_MODEL
+        with trace.stage("prompt"):
+            messages = build_fortune_messages(day_name, thai_color, thai_animal, birth_time)
+
+        if cache is None:
+            cache = reading_cache.get_default_cache()
+        elif cache is False:
+            cache = None
+        cache_key = reading_cache.make_cache_key(model, messages)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                trace.cache_hit = True
+                return cached
+
+        def request_fortune():
+            response = client.complete(messages, model, api_key=api_key, timeout=request_timeout)
+            trace.add_response_usage(model, response)
+            return response['choices'][0]['message']['content']
+
+        # Identical concurrent requests share a single upstream call.
+        with trace.stage("generation"):
+            text_fortune = singleflight.get_default_flights().do(cache_key, request_fortune)
+
+        if cache is not None:
+            cache.put(cache_key, text_fortune)
         return text_fortune
 
     except openai.error.AuthenticationError as e:
+        trace.set_error(e)
         return f"Authentication Error: The OpenAI API key is invalid or has expired. Please check your key. Details: {e}"
     except openai.error.APIError as e:
+        trace.set_error(e)
         return f"The AI oracle's API returned an error: {e}"
     except Exception as e:
+        trace.set_error(e)
         return f"An unexpected error occurred: {type(e).__name__} - {e}"
 
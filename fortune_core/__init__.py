@@ -0,0 +1,8 @@
+# fortune_core/__init__.py
+# The shared core of the fortune app: immutable chart tables, the sexagenary
+# calendar, chart objects, prompts, readings, caching and the AI client.
+# Importing the package only loads the chart modules; NumPy-backed modules
+# (vectorized, auspicious, compatibility) and the AI stack (ai_client loads
+# openai lazily) are imported by the callers that need them.
+
+from fortune_core.chart import Chart, compute_chart
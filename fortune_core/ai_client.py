@@ -0,0 +1,271 @@
+# fortune_core/ai_client.py
+# This file contains the persistent OpenAI client layer. One client is created
+# per process; it owns a keep-alive HTTP connection pool for the synchronous
+# path and one aiohttp pool per event loop for the async path, passes the API
+# key and timeout per call instead of through global state, and retries 429
+# and 5xx responses with jittered exponential backoff that honours Retry-After.
+# openai, requests and aiohttp are imported on first use, so chart-only users of
+# fortune_core never load them.
+
+import asyncio
+import os
+import random
+import threading
+import time
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_TIMEOUT = 60
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_CAP = 20.0
+# Upper bound on one call including all of its retries, so a caller (e.g. a
+# reading job) never waits max_retries full timeouts on a failing upstream.
+DEFAULT_DEADLINE = 120.0
+
+
+def is_retryable(error):
+    """Returns True for rate limits, timeouts, connection failures and 5xx responses."""
+    import openai
+
+    if isinstance(error, (
+        openai.error.RateLimitError,
+        openai.error.ServiceUnavailableError,
+        openai.error.Timeout,
+        openai.error.APIConnectionError,
+        openai.error.TryAgain,
+    )):
+        return True
+    return isinstance(error, openai.error.APIError) and (error.http_status or 0) >= 500
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _new_session():
+    import requests
+
+    class SharedSession(requests.Session):
+        # openai 0.28 still closes each thread's session once it is a few
+        # minutes old and asks for a new one, which is this same session; the
+        # pool is only really closed by close_session().
+        def close(self):
+            pass
+
+        def close_pool(self):
+            super().close()
+
+    session = SharedSession()
+    session.pool_size = 0
+    return session
+
+
+def get_session(pool_size=DEFAULT_POOL_SIZE):
+    """
+    Returns the process-wide keep-alive session for synchronous requests.
+
+    openai 0.28 only takes a session through the module-global
+    ``openai.requestssession``, so there is one per process, installed on
+    first use; every client shares it. A caller asking for a larger pool
+    than it has grows it.
+    """
+    global _session
+    import openai
+    import requests
+
+    with _session_lock:
+        if _session is None:
+            _session = _new_session()
+            openai.requestssession = _session
+        if pool_size > _session.pool_size:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            _session.pool_size = pool_size
+        return _session
+
+
+def close_session():
+    """Closes the process-wide session's connections; the next request opens a new pool."""
+    global _session
+    import openai
+
+    with _session_lock:
+        if _session is None:
+            return
+        if openai.requestssession is _session:
+            openai.requestssession = None
+        _session.close_pool()
+        _session = None
+
+
+def retry_after_seconds(error):
+    """Returns the server's Retry-After hint in seconds, if it sent one."""
+    headers = getattr(error, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class FortuneAIClient:
+    """
+    Process-wide chat completion client.
+
+    Synchronous calls go through the process-wide session from get_session();
+    async calls through one aiohttp pool per event loop, owned by the client.
+
+    Args:
+        api_key (str, optional): Default API key; each call may override it.
+        pool_size (int): Maximum keep-alive connections per pool.
+        timeout (float): Default per-attempt timeout in seconds.
+        max_retries (int): Retries after the first attempt for retryable errors.
+        backoff_base (float): First backoff ceiling in seconds; doubles per retry.
+        backoff_cap (float): Upper bound on any single backoff.
+        deadline (float): Upper bound in seconds on one call with all its
+            retries; no retry starts that could not finish before it.
+    """
+
+    def __init__(self, api_key=None, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE, backoff_cap=DEFAULT_BACKOFF_CAP,
+                 deadline=DEFAULT_DEADLINE):
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.deadline = deadline
+
+        # openai 0.28 reuses this session for every synchronous request instead
+        # of a fresh per-thread session that is recycled every few minutes.
+        self.session = get_session(pool_size)
+
+        self._aio_sessions = {}
+        self._aio_lock = threading.Lock()
+
+    def _backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        return delay
+
+    def _next_delay(self, attempt, error, started):
+        # Seconds to back off before the next attempt, or None to give up.
+        if attempt == self.max_retries or not is_retryable(error):
+            return None
+        delay = self._backoff(attempt, error)
+        if time.monotonic() - started + delay >= self.deadline:
+            return None
+        return delay
+
+    def _attempt_timeout(self, timeout, started):
+        # The per-attempt timeout, shortened so the attempt ends by the deadline.
+        return min(timeout or self.timeout, self.deadline - (time.monotonic() - started))
+
+    def _request_args(self, messages, model, api_key, params):
+        return dict(
+            model=model,
+            messages=messages,
+            api_key=api_key or self.api_key,
+            **params
+        )
+
+    def complete(self, messages, model, api_key=None, timeout=None, **params):
+        """
+        Sends a chat completion, retrying transient failures.
+
+        Args:
+            messages (list): The chat messages.
+            model (str): The chat model name.
+            api_key (str, optional): Overrides the client's API key.
+            timeout (float, optional): Overrides the per-attempt timeout.
+            **params: Other completion parameters, including ``stream=True``.
+
+        Returns:
+            The openai response object, or the chunk iterator when streaming.
+        """
+        import openai
+
+        args = self._request_args(messages, model, api_key, params)
+        started = time.monotonic()
+        for attempt in range(self.max_retries + 1):
+            try:
+                args["request_timeout"] = self._attempt_timeout(timeout, started)
+                return openai.ChatCompletion.create(**args)
+            except Exception as e:
+                delay = self._next_delay(attempt, e, started)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    def complete_text(self, messages, model, **kwargs):
+        """Like complete(), but returns only the reply text."""
+        return self.complete(messages, model, **kwargs).choices[0].message.content
+
+    def stream(self, messages, model, **kwargs):
+        """
+        Yields the reply text chunk by chunk.
+
+        Only opening the stream is retried; once text has been yielded a
+        failure propagates, since the caller has already shown part of it.
+        """
+        for chunk in self.complete(messages, model, stream=True, **kwargs):
+            content = chunk.choices[0].delta.get("content")
+            if content:
+                yield content
+
+    def _aio_session(self):
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        with self._aio_lock:
+            session = self._aio_sessions.get(loop)
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+                )
+                self._aio_sessions[loop] = session
+            return session
+
+    async def acomplete(self, messages, model, api_key=None, timeout=None, **params):
+        """Async counterpart of complete(), on a pooled aiohttp session for the running loop."""
+        import openai
+
+        args = self._request_args(messages, model, api_key, params)
+        token = openai.aiosession.set(self._aio_session())
+        started = time.monotonic()
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    args["request_timeout"] = self._attempt_timeout(timeout, started)
+                    return await openai.ChatCompletion.acreate(**args)
+                except Exception as e:
+                    delay = self._next_delay(attempt, e, started)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+        finally:
+            openai.aiosession.reset(token)
+
+    async def aclose(self):
+        """Closes the aiohttp pool of the running event loop."""
+        with self._aio_lock:
+            session = self._aio_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Returns the process-wide client, keyed from OPENAI_API_KEY by default."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = FortuneAIClient(api_key=os.environ.get("OPENAI_API_KEY"))
+        return _default_client
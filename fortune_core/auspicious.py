@@ -0,0 +1,155 @@
+# fortune_core/auspicious.py
+# This file contains the auspicious-day search. Given one or many birth charts
+# and a date range, every candidate day is scored for element harmony with the
+# day master, its branch relation to the zodiac (year) branch and the Thai
+# weekday rules, and the top-K days are returned. A day's score depends only
+# on its place in the 60-day cycle and its weekday, so each chart gets a
+# 60 x 7 score table built by broadcasting the relation tables below, and a
+# whole range is scored for all charts with one gather.
+
+import datetime
+
+import numpy as np
+
+from fortune_core import tables, vectorized
+
+# ELEMENT_SCORES[day_master, day_element]: how the day's stem element treats
+# the day master. Being fed (resource) is best, being restrained (officer) worst.
+ELEMENT_SCORES = np.zeros((5, 5), dtype=np.int8)
+# BRANCH_SCORES[year_branch, day_branch]: six harmony and three harmony help,
+# a clash with the zodiac branch is the strongest warning.
+BRANCH_SCORES = np.zeros((12, 12), dtype=np.int8)
+# WEEKDAY_SCORES[birth_weekday, day_weekday]: the birth weekday's own day is
+# favourable, its กาลกิณี day is not.
+WEEKDAY_SCORES = np.zeros((7, 7), dtype=np.int8)
+
+for _master in range(5):
+    _relations = (
+        (_master, 1),                                     # companion
+        (tables.GENERATES.index(_master), 2),       # resource: the day feeds the day master
+        (tables.GENERATES[_master], 0),             # output: the day master feeds the day
+        (tables.CONTROLS[_master], 1),              # wealth: the day master controls the day
+        (tables.CONTROLS.index(_master), -2),       # officer: the day controls the day master
+    )
+    for _element, _score in _relations:
+        ELEMENT_SCORES[_master, _element] = _score
+
+for _year in range(12):
+    for _day in range(12):
+        if _day == tables.CLASH[_year]:
+            BRANCH_SCORES[_year, _day] = -3
+        elif _day == tables.SIX_HARMONY[_year]:
+            BRANCH_SCORES[_year, _day] = 2
+        elif _day != _year and tables.THREE_HARMONY_GROUP[_day] == tables.THREE_HARMONY_GROUP[_year]:
+            BRANCH_SCORES[_year, _day] = 1
+
+for _weekday in range(7):
+    WEEKDAY_SCORES[_weekday, _weekday] = 1
+    WEEKDAY_SCORES[_weekday, tables.KALAKINI_WEEKDAYS[_weekday]] = -2
+
+# Day-pillar tables indexed by position in the 60-day cycle.
+CYCLE = np.arange(60)
+CYCLE_STEM_ELEMENTS = vectorized.STEM_ELEMENTS[CYCLE % 10]
+CYCLE_BRANCHES = CYCLE % 12
+CYCLE_PILLARS = np.char.add(
+    vectorized.HEAVENLY_STEMS[CYCLE % 10], vectorized.EARTHLY_BRANCHES[CYCLE_BRANCHES]
+)
+
+
+def day_range(start, days):
+    """
+    Builds the candidate days.
+
+    Args:
+        start (datetime.date or numpy.datetime64): The first candidate day.
+        days (int): How many consecutive days to consider.
+
+    Returns:
+        tuple: ``(dates, keys)``: the datetime64[D] dates, and each day's index
+        into a flattened 60 x 7 score table (cycle position * 7 + weekday).
+    """
+    dates = np.datetime64(start, "D") + np.arange(days)
+    keys = vectorized.day_cycle_indices(dates) * 7 + vectorized.weekday_codes(dates)
+    return dates, keys
+
+
+def score_tables(births, hours=None):
+    """
+    Builds each chart's score for every (cycle position, weekday) pair.
+
+    Args:
+        births (array-like): datetime64 dates or timestamps of birth (Thai local time).
+        hours (array-like, optional): Birth hours, as for vectorized.bazi_codes.
+
+    Returns:
+        numpy.ndarray: int8 array of shape ``(len(births), 420)``.
+    """
+    codes = vectorized.bazi_codes(births, hours)
+    birth_weekdays = vectorized.weekday_codes(births)
+    table = (
+        ELEMENT_SCORES[codes["dominant_element"][:, None], CYCLE_STEM_ELEMENTS[None, :]]
+        + BRANCH_SCORES[codes["year_branch"][:, None], CYCLE_BRANCHES[None, :]]
+    )[:, :, None] + WEEKDAY_SCORES[birth_weekdays][:, None, :]
+    return table.reshape(len(table), 60 * 7).astype(np.int8)
+
+
+def score_days(births, start, days=365, hours=None):
+    """
+    Scores every day of a range for every chart.
+
+    Returns:
+        tuple: ``(dates, scores)``: datetime64[D] dates of shape ``(days,)`` and
+        int8 scores of shape ``(len(births), days)``; higher is more auspicious.
+    """
+    births = np.atleast_1d(vectorized._as_datetime64(births))
+    dates, keys = day_range(start, days)
+    return dates, score_tables(births, hours)[:, keys]
+
+
+def top_days(births, start, days=365, k=10, hours=None):
+    """
+    Finds each chart's K most auspicious days in a range.
+
+    Ties go to the earlier day.
+
+    Returns:
+        tuple: ``(dates, scores)``, each of shape ``(len(births), k)`` and
+        ordered best first.
+    """
+    dates, scores = score_days(births, start, days, hours)
+    k = min(k, days)
+    # One sortable key per day: the score first, then earlier days first.
+    rank = scores.astype(np.int32) * days - np.arange(days, dtype=np.int32)
+    best = np.argpartition(-rank, k - 1, axis=1)[:, :k]
+    best = np.take_along_axis(best, np.argsort(-np.take_along_axis(rank, best, axis=1), axis=1), axis=1)
+    return dates[best], np.take_along_axis(scores, best, axis=1)
+
+
+def find_auspicious_days(birth_date, birth_time, start=None, days=365, k=10):
+    """
+    Finds the most auspicious upcoming days for one birth chart.
+
+    Args:
+        birth_date (datetime.date): The user's date of birth.
+        birth_time (datetime.time): The user's time of birth.
+        start (datetime.date, optional): The first candidate day; defaults to today.
+        days (int): How many days ahead to search.
+        k (int): How many days to return.
+
+    Returns:
+        list: Dicts with ``date`` (datetime.date), ``score``, ``day_pillar``,
+        ``weekday`` and ``color`` (Thai), best first.
+    """
+    birth = np.array([datetime.datetime.combine(birth_date, birth_time)], dtype="datetime64[m]")
+    dates, scores = top_days(birth, start or datetime.date.today(), days, k)
+    results = []
+    for date, score in zip(dates[0].tolist(), scores[0].tolist()):
+        weekday = date.weekday()
+        results.append({
+            "date": date,
+            "score": score,
+            "day_pillar": str(CYCLE_PILLARS[vectorized.day_cycle_indices(np.datetime64(date, "D"))]),
+            "weekday": tables.WEEKDAYS_TH[weekday],
+            "color": tables.DAY_COLORS_TH[weekday],
+        })
+    return results
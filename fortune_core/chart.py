@@ -0,0 +1,96 @@
+# fortune_core/chart.py
+# This file contains the birth-chart object shared by every entry point. A
+# Chart is an immutable NamedTuple of small integer indices; names in English
+# or Thai are looked up from the tables on demand, so the app, fortune.py and
+# the batch and pre-warm jobs all describe a birth the same way.
+
+import functools
+from typing import NamedTuple
+
+from fortune_core import sexagenary
+from fortune_core.tables import (
+    DAY_COLORS_EN, DAY_COLORS_TH, EARTHLY_BRANCHES, ELEMENTS, HEAVENLY_STEMS, STEM_ELEMENTS,
+    WEEKDAYS_EN, WEEKDAYS_TH, ZODIAC_EN, ZODIAC_TH, ZODIAC_TH_SHORT
+)
+
+
+class Chart(NamedTuple):
+    """
+    A birth chart as table indices.
+
+    Attributes:
+        weekday (int): Civil weekday of birth, Monday = 0; also indexes the day colors.
+        pillars (sexagenary.Pillars): The four pillars as stem/branch indices.
+    """
+    weekday: int
+    pillars: sexagenary.Pillars
+
+    @property
+    def zodiac(self):
+        """Zodiac index, Rat = 0: the year branch, so the year starts at Lichun."""
+        return self.pillars.year_branch
+
+    @property
+    def element(self):
+        """Element index of the day master (the day stem)."""
+        return STEM_ELEMENTS[self.pillars.day_stem]
+
+    @property
+    def day_name_en(self):
+        return WEEKDAYS_EN[self.weekday]
+
+    @property
+    def day_name_th(self):
+        return WEEKDAYS_TH[self.weekday]
+
+    @property
+    def color_en(self):
+        return DAY_COLORS_EN[self.weekday]
+
+    @property
+    def color_th(self):
+        return DAY_COLORS_TH[self.weekday]
+
+    @property
+    def zodiac_en(self):
+        return ZODIAC_EN[self.zodiac]
+
+    @property
+    def zodiac_th(self):
+        """Full Thai zodiac name, e.g. "มะเมีย (ม้า)"."""
+        return ZODIAC_TH[self.zodiac]
+
+    @property
+    def zodiac_th_short(self):
+        """Everyday Thai animal name, e.g. "ม้า"."""
+        return ZODIAC_TH_SHORT[self.zodiac]
+
+    def bazi(self):
+        """
+        Returns:
+            dict: The year/month/day/hour pillars as strings such as "甲子",
+            and ``dominant_element``, the day master's entry in ELEMENTS.
+        """
+        p = self.pillars
+        return {
+            "year_pillar": HEAVENLY_STEMS[p.year_stem] + EARTHLY_BRANCHES[p.year_branch],
+            "month_pillar": HEAVENLY_STEMS[p.month_stem] + EARTHLY_BRANCHES[p.month_branch],
+            "day_pillar": HEAVENLY_STEMS[p.day_stem] + EARTHLY_BRANCHES[p.day_branch],
+            "hour_pillar": HEAVENLY_STEMS[p.hour_stem] + EARTHLY_BRANCHES[p.hour_branch],
+            "dominant_element": ELEMENTS[self.element],
+        }
+
+
+@functools.lru_cache(maxsize=4096)
+def compute_chart(birth_date, birth_time=None):
+    """
+    Computes the chart of a birth, memoized since users repeat inputs.
+
+    Args:
+        birth_date (datetime.date): Local (Thai) date of birth.
+        birth_time (datetime.time, optional): Local time of birth; noon if omitted.
+
+    Returns:
+        Chart: The birth chart.
+    """
+    return Chart(birth_date.weekday(), sexagenary.pillars(birth_date, birth_time))
@@ -0,0 +1,172 @@
+# fortune_core/compatibility.py
+# This file contains the สมพงษ์ (compatibility) engine. Two charts are scored
+# on the relation between their zodiac (year) branches, between their day
+# branches (the spouse palace), and between their day-master elements. A
+# chart's contribution depends only on those three values, 12 x 12 x 5 = 720
+# chart codes, so every pair score is precomputed into one 720 x 720 table and
+# an N x M score matrix for thousands of people is a single NumPy gather.
+
+import numpy as np
+
+from fortune_core import sexagenary, tables, vectorized
+
+# Score and Thai label of each branch relation, strongest first.
+BRANCH_RELATIONS = {
+    "six_harmony": (3, "ปีสมพงษ์ (六合)"),
+    "three_harmony": (2, "สามประสาน (三合)"),
+    "same": (1, "นักษัตรเดียวกัน"),
+    "neutral": (0, "เป็นกลาง"),
+    "clash": (-3, "ปีชง (六冲)"),
+}
+# Score and Thai label of each element relation; every pair of elements is
+# exactly one of these, in one direction or the other.
+ELEMENT_RELATIONS = {
+    "generating": (2, "ธาตุเกื้อหนุนกัน (相生)"),
+    "same": (1, "ธาตุเดียวกัน"),
+    "controlling": (-2, "ธาตุข่มกัน (相克)"),
+}
+CHART_CODES = 12 * 12 * 5
+
+
+def branch_relation(a, b):
+    """Names the relation between two earthly branches (Rat = 0)."""
+    if b == tables.SIX_HARMONY[a]:
+        return "six_harmony"
+    if b == tables.CLASH[a]:
+        return "clash"
+    if a == b:
+        return "same"
+    if tables.THREE_HARMONY_GROUP[a] == tables.THREE_HARMONY_GROUP[b]:
+        return "three_harmony"
+    return "neutral"
+
+
+def element_relation(a, b):
+    """Names the relation between two elements, in either direction."""
+    if a == b:
+        return "same"
+    if tables.GENERATES[a] == b or tables.GENERATES[b] == a:
+        return "generating"
+    return "controlling"
+
+
+BRANCH_SCORES = np.array(
+    [[BRANCH_RELATIONS[branch_relation(a, b)][0] for b in range(12)] for a in range(12)], dtype=np.int8
+)
+ELEMENT_SCORES = np.array(
+    [[ELEMENT_RELATIONS[element_relation(a, b)][0] for b in range(5)] for a in range(5)], dtype=np.int8
+)
+MIN_SCORE = 2 * int(BRANCH_SCORES.min()) + int(ELEMENT_SCORES.min())
+MAX_SCORE = 2 * int(BRANCH_SCORES.max()) + int(ELEMENT_SCORES.max())
+
+# PAIR_SCORES[code_a, code_b] for chart codes (year_branch * 12 + day_branch) * 5 + element.
+_year, _day, _element = np.unravel_index(np.arange(CHART_CODES), (12, 12, 5))
+PAIR_SCORES = (
+    BRANCH_SCORES[_year[:, None], _year[None, :]]
+    + BRANCH_SCORES[_day[:, None], _day[None, :]]
+    + ELEMENT_SCORES[_element[:, None], _element[None, :]]
+).astype(np.int8)
+
+
+def to_percent(score):
+    """Maps a pair score onto 0-100."""
+    return np.round((np.asarray(score, dtype=np.float32) - MIN_SCORE) * 100 / (MAX_SCORE - MIN_SCORE))
+
+
+def chart_codes(births, hours=None):
+    """
+    Reduces birth charts to compatibility codes.
+
+    Args:
+        births (array-like): datetime64 dates or timestamps of birth (Thai local time).
+        hours (array-like, optional): Birth hours, as for vectorized.bazi_codes.
+
+    Returns:
+        numpy.ndarray: int16 codes indexing PAIR_SCORES.
+    """
+    births = np.atleast_1d(vectorized._as_datetime64(births))
+    codes = vectorized.bazi_codes(births, hours)
+    return (
+        (codes["year_branch"].astype(np.int16) * 12 + codes["day_branch"]) * 5 + codes["dominant_element"]
+    )
+
+
+def score_matrix(codes_a, codes_b=None):
+    """
+    Scores every pair across two groups.
+
+    Args:
+        codes_a (numpy.ndarray): Chart codes of the first group, from chart_codes().
+        codes_b (numpy.ndarray, optional): Chart codes of the second group;
+            defaults to the first group.
+
+    Returns:
+        numpy.ndarray: int8 scores of shape ``(len(codes_a), len(codes_b))``.
+    """
+    if codes_b is None:
+        codes_b = codes_a
+    return PAIR_SCORES[codes_a[:, None], codes_b[None, :]]
+
+
+def top_matches(codes, k=5, candidates=None, block_size=1024):
+    """
+    Finds each person's best matches.
+
+    Rows are scored ``block_size`` at a time, so memory stays bounded however
+    large the groups are. Ties go to the candidate listed first.
+
+    Args:
+        codes (numpy.ndarray): Chart codes of the people to match.
+        k (int): Matches to return per person.
+        candidates (numpy.ndarray, optional): Chart codes to match against.
+            Defaults to ``codes`` itself, in which case nobody matches themselves.
+        block_size (int): Rows scored per step.
+
+    Returns:
+        tuple: ``(indices, scores)``, each of shape ``(len(codes), k)``, best
+        first; indices point into ``candidates`` (or ``codes``).
+    """
+    same_group = candidates is None
+    if same_group:
+        candidates = codes
+    count = len(candidates)
+    k = min(k, count - 1 if same_group else count)
+    # One sortable key per pair: the score first, then earlier candidates first.
+    tiebreak = np.arange(count, dtype=np.int32)
+    indices = np.empty((len(codes), k), dtype=np.intp)
+    scores = np.empty((len(codes), k), dtype=np.int8)
+    for start in range(0, len(codes), block_size):
+        block = score_matrix(codes[start:start + block_size], candidates)
+        rank = block.astype(np.int32) * count - tiebreak
+        if same_group:
+            rows = np.arange(len(block))
+            # Below any real pair, so nobody is matched with themselves.
+            rank[rows, rows + start] = (MIN_SCORE - 1) * count
+        best = np.argpartition(-rank, k - 1, axis=1)[:, :k]
+        best = np.take_along_axis(best, np.argsort(-np.take_along_axis(rank, best, axis=1), axis=1), axis=1)
+        indices[start:start + len(block)] = best
+        scores[start:start + len(block)] = np.take_along_axis(block, best, axis=1)
+    return indices, scores
+
+
+def pair_compatibility(birth_date_a, birth_time_a, birth_date_b, birth_time_b):
+    """
+    Explains the compatibility of two people.
+
+    Returns:
+        dict: ``score``, ``percent`` and the Thai labels of the ``zodiac``,
+        ``spouse_palace`` (day branch) and ``element`` relations.
+    """
+    a = sexagenary.pillars(birth_date_a, birth_time_a)
+    b = sexagenary.pillars(birth_date_b, birth_time_b)
+    zodiac = branch_relation(a.year_branch, b.year_branch)
+    spouse_palace = branch_relation(a.day_branch, b.day_branch)
+    element = element_relation(tables.STEM_ELEMENTS[a.day_stem], tables.STEM_ELEMENTS[b.day_stem])
+    score = BRANCH_RELATIONS[zodiac][0] + BRANCH_RELATIONS[spouse_palace][0] + ELEMENT_RELATIONS[element][0]
+    return {
+        "score": score,
+        "percent": int(to_percent(score)),
+        "zodiac": BRANCH_RELATIONS[zodiac][1],
+        "spouse_palace": BRANCH_RELATIONS[spouse_palace][1],
+        "element": ELEMENT_RELATIONS[element][1],
+    }
@@ -0,0 +1,436 @@
+# fortune_core/jobs.py
+# This file contains a local job queue for AI readings, so generation does not
+# run on the thread serving a page. Jobs live in a SQLite file and are claimed
+# by a bounded pool of worker threads in priority-lane order. Each job carries
+# an idempotency key, so identical submissions share one job while it is
+# queued or running; finished jobs are never handed out again. Workers write
+# partial text back while they generate, which lets the page poll the job and
+# show the reading as it grows.
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+DEFAULT_JOBS_PATH = ".fortune_jobs.sqlite3"
+DEFAULT_WORKERS = 8
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_PARTIAL_INTERVAL = 0.25
+# Running jobs whose worker has been silent this long are assumed lost (e.g. the
+# process restarted) and are queued again, up to DEFAULT_MAX_ATTEMPTS times.
+# Workers send a heartbeat every DEFAULT_HEARTBEAT_INTERVAL seconds for as long
+# as a job runs, whether or not it produces text, so a slow job is not "lost".
+DEFAULT_STALE_SECONDS = 300
+DEFAULT_HEARTBEAT_INTERVAL = 30
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETENTION_SECONDS = 24 * 60 * 60
+
+# Lanes are served strictly in this order; within a lane, oldest first.
+LANES = {"interactive": 0, "background": 1}
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job(NamedTuple):
+    """
+    A snapshot of one job.
+
+    Attributes:
+        id (int): The job id.
+        kind (str): Selects the handler that runs the job.
+        payload (dict): The handler's JSON arguments.
+        lane (str): The priority lane, a key of LANES.
+        status (str): "queued", "running", "done" or "failed".
+        partial (str | None): The text produced so far, while running.
+        result (str | None): The final text, once done.
+        error (str | None): Why the job failed.
+        attempts (int): How many times a worker has claimed the job.
+        created_at (float): Submission time, epoch seconds.
+        started_at (float | None): When the current attempt was claimed.
+        finished_at (float | None): When the job completed or failed.
+    """
+    id: int
+    kind: str
+    payload: dict
+    lane: str
+    status: str
+    partial: str
+    result: str
+    error: str
+    attempts: int
+    created_at: float
+    started_at: float
+    finished_at: float
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+
+_COLUMNS = (
+    "id, kind, payload, priority, status, partial, result, error, attempts, created_at, started_at, finished_at"
+)
+_LANE_NAMES = {priority: lane for lane, priority in LANES.items()}
+
+
+def _to_job(row):
+    return Job(row[0], row[1], json.loads(row[2]), _LANE_NAMES.get(row[3], str(row[3])), *row[4:])
+
+
+class JobQueue:
+    """
+    A durable FIFO-per-lane job queue in one SQLite file.
+
+    Claims use an immediate transaction, so several processes may share the
+    file; within a process one connection is shared behind a lock.
+    """
+
+    def __init__(self, path=DEFAULT_JOBS_PATH, stale_seconds=DEFAULT_STALE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, retention_seconds=DEFAULT_RETENTION_SECONDS):
+        self.path = path or ":memory:"
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._work = threading.Condition()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " idempotency_key TEXT UNIQUE,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " partial TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " heartbeat_at REAL,"
+            " finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, priority, id)")
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds a queue configured from environment variables.
+
+        FORTUNE_JOBS_PATH selects the SQLite file (empty keeps the queue in
+        memory, for a single process) and FORTUNE_JOBS_STALE_SECONDS how long a
+        silent running job is trusted before it is queued again.
+        """
+        return cls(
+            os.environ.get("FORTUNE_JOBS_PATH", DEFAULT_JOBS_PATH),
+            stale_seconds=float(os.environ.get("FORTUNE_JOBS_STALE_SECONDS", DEFAULT_STALE_SECONDS))
+        )
+
+    def submit(self, kind, payload, idempotency_key=None, lane="interactive"):
+        """
+        Queues a job, or returns the queued or running one with the same idempotency key.
+
+        A finished job gives up its key, so submitting again starts a new job:
+        results are only reused through whatever caching the handler itself
+        does, under that cache's own expiry and key.
+
+        Args:
+            kind (str): Selects the handler that runs the job.
+            payload (dict): JSON-serializable handler arguments.
+            idempotency_key (str, optional): Identifies equivalent submissions.
+            lane (str): A key of LANES.
+
+        Returns:
+            int: The job id.
+        """
+        if lane not in LANES:
+            raise ValueError(f"unknown lane {lane!r}; expected one of {sorted(LANES)}")
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            # Immediate, so processes sharing the file cannot both insert the same key.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                job_id = None
+                inserted = False
+                if idempotency_key is not None:
+                    row = self._conn.execute(
+                        "SELECT id, status FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                    ).fetchone()
+                    if row is not None and row[1] in (QUEUED, RUNNING):
+                        job_id = row[0]
+                    elif row is not None:
+                        # Kept, without its key, for pages still polling it until it is purged.
+                        self._conn.execute("UPDATE jobs SET idempotency_key = NULL WHERE id = ?", (row[0],))
+                if job_id is None:
+                    job_id = self._conn.execute(
+                        "INSERT INTO jobs (idempotency_key, kind, payload, priority, status, created_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        (idempotency_key, kind, json.dumps(payload, ensure_ascii=False), LANES[lane], QUEUED, now)
+                    ).lastrowid
+                    inserted = True
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if inserted:
+            self._notify()
+        return job_id
+
+    def get(self, job_id):
+        """Returns the Job, or None if it does not exist (or was purged)."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else _to_job(row)
+
+    def position(self, job_id):
+        """Returns the 1-based position of a queued job across all lanes, or 0 if it is not queued."""
+        with self._lock:
+            row = self._conn.execute("SELECT priority, status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or row[1] != QUEUED:
+                return 0
+            (ahead,) = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority < ? OR (priority = ? AND id < ?))",
+                (QUEUED, row[0], row[0], job_id)
+            ).fetchone()
+        return ahead + 1
+
+    def claim(self, kinds=None):
+        """
+        Marks the next queued job as running and returns it.
+
+        Args:
+            kinds (iterable, optional): Only claim jobs of these kinds.
+
+        Returns:
+            Job | None: The claimed job, or None if nothing is queued.
+        """
+        now = time.time()
+        query = f"SELECT {_COLUMNS} FROM jobs WHERE status = ?"
+        args = [QUEUED]
+        if kinds is not None:
+            kinds = list(kinds)
+            query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            args += kinds
+        query += " ORDER BY priority, id LIMIT 1"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(query, args).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, heartbeat_at = ?"
+                        " WHERE id = ?",
+                        (RUNNING, now, now, row[0])
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return _to_job(row)._replace(status=RUNNING, attempts=row[8] + 1, started_at=now)
+
+    # The writes below name the attempt they come from, so a worker whose job
+    # was requeued as stale cannot overwrite the attempt that replaced it.
+    # Each returns False when the write was dropped for that reason.
+
+    def update_partial(self, job_id, attempt, text):
+        """Stores the text produced so far; this also serves as the worker's heartbeat."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET partial = ?, heartbeat_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (text, time.time(), job_id, RUNNING, attempt)
+            )
+        return cursor.rowcount > 0
+
+    def heartbeat(self, job_id, attempt):
+        """Marks a running attempt as alive without touching its text."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time(), job_id, RUNNING, attempt)
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id, attempt, result):
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, partial = NULL, finished_at = ?, heartbeat_at = ?"
+                " WHERE id = ? AND status = ? AND attempts = ?",
+                (DONE, result, now, now, job_id, RUNNING, attempt)
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id, attempt, error):
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, heartbeat_at = ?"
+                " WHERE id = ? AND status = ? AND attempts = ?",
+                (FAILED, str(error), now, now, job_id, RUNNING, attempt)
+            )
+        return cursor.rowcount > 0
+
+    def requeue_stale(self):
+        """
+        Recovers running jobs whose worker went silent for ``stale_seconds``.
+
+        Returns:
+            int: How many jobs were queued again; jobs out of attempts fail instead.
+        """
+        now = time.time()
+        cutoff = now - self.stale_seconds
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?"
+                " WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+                (FAILED, "worker lost", now, RUNNING, cutoff, self.max_attempts)
+            )
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, partial = NULL, started_at = NULL, heartbeat_at = NULL"
+                " WHERE status = ? AND heartbeat_at < ?",
+                (QUEUED, RUNNING, cutoff)
+            )
+        if cursor.rowcount:
+            self._notify()
+        return cursor.rowcount
+
+    def _purge(self, now):
+        # Finished jobs only need to outlive the pages polling them.
+        self._conn.execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+            (DONE, FAILED, now - self.retention_seconds)
+        )
+
+    def _notify(self):
+        with self._work:
+            self._work.notify_all()
+
+    def wait_for_work(self, timeout):
+        """Blocks until a job is submitted in this process, or ``timeout`` seconds pass."""
+        with self._work:
+            self._work.wait(timeout)
+
+    def stats(self):
+        """Returns the number of jobs in each status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        stats = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        stats.update(rows)
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WorkerPool:
+    """
+    A fixed number of worker threads running jobs from a JobQueue.
+
+    Handlers are called as ``handler(payload, progress)`` and return the final
+    text; ``progress(text)`` publishes the text produced so far, throttled to
+    one write per ``partial_interval`` seconds. An exception fails the job
+    with its message. One more thread sends a heartbeat for every running job
+    each ``heartbeat_interval`` seconds, which must stay well below the
+    queue's ``stale_seconds``.
+    """
+
+    def __init__(self, queue, handlers, workers=DEFAULT_WORKERS, poll_interval=DEFAULT_POLL_INTERVAL,
+                 partial_interval=DEFAULT_PARTIAL_INTERVAL, heartbeat_interval=DEFAULT_HEARTBEAT_INTERVAL):
+        self.queue = queue
+        self.handlers = dict(handlers)
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.partial_interval = partial_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._stopping = threading.Event()
+        self._threads = []
+        # job id -> attempt, for every job a worker of this pool is running.
+        self._running = {}
+        self._running_lock = threading.Lock()
+
+    def start(self):
+        """Starts the worker threads and the heartbeat thread; returns self."""
+        self.queue.requeue_stale()
+        targets = [(self._run, f"fortune-job-worker-{index}") for index in range(self.workers)]
+        targets.append((self._heartbeat, "fortune-job-heartbeat"))
+        for target, name in targets:
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        """Asks the workers to exit after their current job and waits for them."""
+        self._stopping.set()
+        self.queue._notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stopping.is_set():
+            job = self.queue.claim(self.handlers)
+            if job is None:
+                self.queue.requeue_stale()
+                self.queue.wait_for_work(self.poll_interval)
+                continue
+            self._execute(job)
+
+    def _heartbeat(self):
+        while not self._stopping.wait(self.heartbeat_interval):
+            with self._running_lock:
+                running = list(self._running.items())
+            for job_id, attempt in running:
+                self.queue.heartbeat(job_id, attempt)
+
+    def _execute(self, job):
+        last_write = 0.0
+
+        def progress(text):
+            nonlocal last_write
+            now = time.monotonic()
+            if now - last_write >= self.partial_interval:
+                self.queue.update_partial(job.id, job.attempts, text)
+                last_write = now
+
+        with self._running_lock:
+            self._running[job.id] = job.attempts
+        try:
+            result = self.handlers[job.kind](job.payload, progress)
+        except Exception as e:
+            print(f"job {job.id} ({job.kind}) failed: {type(e).__name__}: {e}", file=sys.stderr)
+            self.queue.fail(job.id, job.attempts, e)
+        else:
+            self.queue.complete(job.id, job.attempts, result)
+        finally:
+            with self._running_lock:
+                self._running.pop(job.id, None)
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_default_queue():
+    """Returns the process-wide queue, creating it from the environment on first use."""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue.from_env()
+        return _default_queue
+
+
+def start_default_pool(handlers):
+    """Starts a pool on the process-wide queue, sized by FORTUNE_WORKERS."""
+    return WorkerPool(
+        get_default_queue(), handlers, workers=int(os.environ.get("FORTUNE_WORKERS", DEFAULT_WORKERS))
+    ).start()
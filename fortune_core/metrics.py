@@ -0,0 +1,333 @@
+# fortune_core/metrics.py
+# This file contains the instrumentation layer for fortune readings. Each
+# reading carries a trace of per-stage timings, token usage, estimated cost,
+# cache outcome and error class; finished traces go into an in-memory ring
+# buffer that can be summarised as percentiles, exported as Prometheus text or
+# JSONL, and optionally appended to a JSONL log as they are recorded.
+
+import collections
+import contextlib
+import http.server
+import json
+import math
+import os
+import threading
+import time
+
+from fortune_core import prompts
+
+DEFAULT_MAX_TRACES = 2000
+# The metrics endpoint is local-only unless FORTUNE_METRICS_HOST says otherwise.
+DEFAULT_METRICS_HOST = "127.0.0.1"
+# Stages in the order they happen. ttft is measured from the start of the
+# generation stage to the first text the user could see.
+STAGES = ("chart", "prompt", "ttft", "generation", "render")
+QUANTILES = (0.5, 0.95, 0.99)
+
+# USD list prices per million (input, output) tokens.
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Returns the estimated cost of a call in USD, or 0.0 for unpriced models."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def estimate_tokens(text):
+    """Counts or estimates the tokens in a streamed reply, which carries no usage block."""
+    return prompts.count_tokens(text)
+
+
+class ReadingTrace:
+    """
+    Timings and accounting for a single reading.
+
+    A trace is written by the request that owns it, possibly from a worker
+    thread, and handed to MetricsRecorder.record() once the reading is done.
+
+    Args:
+        engine (str): Which path produced the reading ("stream", "sectioned", "batch"...).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.timestamp = time.time()
+        self.stages = {}
+        self.model = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.usage_estimated = False
+        self.cost_usd = 0.0
+        self.cache_hit = False
+        self.error_class = None
+        # The prompt inputs (day_name, thai_color, thai_animal, birth_time), so
+        # the request log can tell which readings are most in demand.
+        self.inputs = None
+        self._started = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times the enclosed block as stage ``name``; repeated blocks add up."""
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def start(self, name):
+        """Starts timing a stage whose end is observed somewhere else."""
+        self._started[name] = time.perf_counter()
+
+    def stop(self, name, since=None):
+        """
+        Ends a stage begun with start().
+
+        Args:
+            name (str): The stage to record.
+            since (str, optional): Measure from the start of this stage instead,
+                e.g. ``stop("ttft", since="generation")``.
+        """
+        started = self._started.get(since or name)
+        if started is not None and name not in self.stages:
+            self.stages[name] = time.perf_counter() - started
+
+    def add_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_usage(self, model, prompt_tokens, completion_tokens, estimated=False):
+        """Adds the tokens and cost of one upstream call; a reading may make several, concurrently."""
+        with self._lock:
+            self.model = model
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.usage_estimated = self.usage_estimated or estimated
+            self.cost_usd += estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def add_response_usage(self, model, response):
+        """Adds the ``usage`` block of an openai response, if it has one."""
+        usage = response.get("usage") or {}
+        self.add_usage(model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+
+    def set_error(self, error):
+        self.error_class = type(error).__name__
+
+    def set_inputs(self, day_name, thai_color, thai_animal, birth_time):
+        self.inputs = {
+            "day_name": day_name,
+            "thai_color": thai_color,
+            "thai_animal": thai_animal,
+            "birth_time": birth_time.strftime("%H:%M"),
+        }
+
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "engine": self.engine,
+            "model": self.model,
+            "stages": dict(self.stages),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "usage_estimated": self.usage_estimated,
+            "cost_usd": self.cost_usd,
+            "cache_hit": self.cache_hit,
+            "error_class": self.error_class,
+            "inputs": self.inputs,
+        }
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))]
+
+
+class MetricsRecorder:
+    """
+    A bounded ring buffer of recent traces plus process-lifetime counters.
+
+    Percentiles are computed over the ring buffer; the counters keep growing,
+    as Prometheus expects. Stages timed outside any reading's trace, such as
+    rendering a reading on the page after its job finished, are kept in a
+    second ring buffer of the same size and summarised with the traces.
+
+    Args:
+        max_traces (int): How many recent traces to keep in memory.
+        log_path (str, optional): JSONL file each trace is appended to as it
+            is recorded. Disabled when None.
+    """
+
+    def __init__(self, max_traces=DEFAULT_MAX_TRACES, log_path=None):
+        self.log_path = log_path
+        self._traces = collections.deque(maxlen=max_traces)
+        self._stage_samples = collections.deque(maxlen=max_traces)
+        self._stage_totals = collections.defaultdict(lambda: [0, 0.0])
+        self._counters = collections.Counter()
+        self._errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds a recorder from FORTUNE_METRICS_BUFFER (traces kept in memory)
+        and FORTUNE_METRICS_LOG (a JSONL file to append traces to).
+        """
+        return cls(
+            max_traces=int(os.environ.get("FORTUNE_METRICS_BUFFER", DEFAULT_MAX_TRACES)),
+            log_path=os.environ.get("FORTUNE_METRICS_LOG") or None
+        )
+
+    def record(self, trace):
+        """Stores a finished trace."""
+        entry = trace.to_dict()
+        with self._lock:
+            self._traces.append(entry)
+            for name, seconds in entry["stages"].items():
+                totals = self._stage_totals[name]
+                totals[0] += 1
+                totals[1] += seconds
+            self._counters["readings"] += 1
+            self._counters["cache_hits"] += entry["cache_hit"]
+            self._counters["prompt_tokens"] += entry["prompt_tokens"]
+            self._counters["completion_tokens"] += entry["completion_tokens"]
+            self._counters["cost_usd"] += entry["cost_usd"]
+            if entry["error_class"]:
+                self._errors[entry["error_class"]] += 1
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def record_time(self, name, seconds):
+        """Stores one timing of stage ``name`` that belongs to no trace."""
+        with self._lock:
+            self._stage_samples.append((name, seconds))
+            totals = self._stage_totals[name]
+            totals[0] += 1
+            totals[1] += seconds
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times the enclosed block with record_time()."""
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.record_time(name, time.perf_counter() - started)
+
+    def traces(self):
+        """Returns the buffered traces, oldest first."""
+        with self._lock:
+            return list(self._traces)
+
+    def summary(self):
+        """
+        Summarises the buffered traces.
+
+        Returns:
+            dict: ``stages`` maps each stage to its count and p50/p95/p99 in
+            seconds; ``counters`` and ``errors`` are the lifetime totals.
+        """
+        with self._lock:
+            traces = list(self._traces)
+            samples = list(self._stage_samples)
+            counters = dict(self._counters)
+            errors = dict(self._errors)
+        stages = {}
+        for name in STAGES:
+            values = [t["stages"][name] for t in traces if name in t["stages"]]
+            values = sorted(values + [seconds for stage, seconds in samples if stage == name])
+            stages[name] = {"count": len(values)}
+            for q in QUANTILES:
+                stages[name][f"p{round(q * 100)}"] = percentile(values, q)
+        return {"stages": stages, "counters": counters, "errors": errors, "buffered": len(traces)}
+
+    def to_jsonl(self):
+        return "".join(json.dumps(t, ensure_ascii=False) + "\n" for t in self.traces())
+
+    def to_prometheus(self):
+        """Renders the metrics in the Prometheus text exposition format."""
+        summary = self.summary()
+        with self._lock:
+            stage_totals = {name: tuple(totals) for name, totals in self._stage_totals.items()}
+        counters = summary["counters"]
+        lines = [
+            "# HELP fortune_stage_seconds Time spent in each stage of a reading.",
+            "# TYPE fortune_stage_seconds summary",
+        ]
+        for name in STAGES:
+            for q in QUANTILES:
+                value = summary["stages"][name][f"p{round(q * 100)}"]
+                if value is not None:
+                    lines.append(f'fortune_stage_seconds{{stage="{name}",quantile="{q}"}} {value:.6f}')
+            count, total = stage_totals.get(name, (0, 0.0))
+            lines.append(f'fortune_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'fortune_stage_seconds_count{{stage="{name}"}} {count}')
+        for name, kind, help_text in (
+            ("readings", "counter", "Readings completed."),
+            ("cache_hits", "counter", "Readings served from the reading cache."),
+            ("prompt_tokens", "counter", "Prompt tokens sent upstream."),
+            ("completion_tokens", "counter", "Completion tokens received."),
+            ("cost_usd", "counter", "Estimated upstream cost in USD."),
+        ):
+            lines.append(f"# HELP fortune_{name}_total {help_text}")
+            lines.append(f"# TYPE fortune_{name}_total {kind}")
+            lines.append(f"fortune_{name}_total {counters.get(name, 0)}")
+        lines.append("# HELP fortune_errors_total Failed readings by error class.")
+        lines.append("# TYPE fortune_errors_total counter")
+        for error_class, count in sorted(summary["errors"].items()):
+            lines.append(f'fortune_errors_total{{error_class="{error_class}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(recorder, port, host=DEFAULT_METRICS_HOST):
+    """
+    Serves ``recorder.to_prometheus()`` at /metrics on a daemon thread.
+
+    Returns:
+        http.server.ThreadingHTTPServer: The running server.
+    """
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = recorder.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_default_recorder = None
+_default_recorder_lock = threading.Lock()
+
+
+def get_default_recorder():
+    """
+    Returns the process-wide recorder, creating it from the environment on
+    first use. When FORTUNE_METRICS_PORT is set, a Prometheus endpoint is
+    started alongside it, listening on FORTUNE_METRICS_HOST (127.0.0.1 by
+    default; set 0.0.0.0 for a scraper on another machine).
+    """
+    global _default_recorder
+    with _default_recorder_lock:
+        if _default_recorder is None:
+            _default_recorder = MetricsRecorder.from_env()
+            port = os.environ.get("FORTUNE_METRICS_PORT")
+            if port:
+                serve_prometheus(
+                    _default_recorder, int(port), os.environ.get("FORTUNE_METRICS_HOST") or DEFAULT_METRICS_HOST
+                )
+        return _default_recorder
@@ -0,0 +1,190 @@
+# fortune_core/offline.py
+# This file contains the local, template-based reading generator used when the
+# AI oracle is slow or unavailable. A full Thai reading is assembled from
+# precomputed fragments indexed by zodiac, weekday, day-master element and
+# hour branch; there are only 12 x 7 x 5 x 12 combinations, so assembled
+# readings are memoized and repeat lookups cost microseconds.
+
+import functools
+
+from fortune_core import sexagenary
+from fortune_core.tables import (
+    CLASH, DAY_COLORS_TH, EARTHLY_BRANCHES, ELEMENTS, SIX_HARMONY, STEM_ELEMENTS, WEEKDAYS_TH, ZODIAC_TH_SHORT
+)
+
+NOTICE = "_คำพยากรณ์เบื้องต้นจากตำราของซินแส ระหว่างรอคำพยากรณ์ฉบับเต็มจากซินแสปรมาจารย์_"
+
+# ฟ้า (天): indexed by zodiac / year branch, Rat = 0.
+ZODIAC_FRAGMENTS = (
+    "ปีชวดมอบไหวพริบและความช่างสังเกต ท่านมองเห็นโอกาสก่อนผู้อื่นและรู้จักเก็บออมเพื่อวันข้างหน้า",
+    "ปีฉลูมอบความอดทนและความมั่นคง ท่านค่อยเป็นค่อยไปแต่ไปถึงเป้าหมายเสมอ เป็นที่ไว้วางใจของผู้คน",
+    "ปีขาลมอบความกล้าหาญและพลังผู้นำ ท่านไม่กลัวการเริ่มต้นใหม่และพร้อมปกป้องคนที่ท่านรัก",
+    "ปีเถาะมอบความอ่อนโยนและรสนิยมที่ดี ท่านประสานผู้คนได้เก่งและหลีกเลี่ยงความขัดแย้งได้อย่างแนบเนียน",
+    "ปีมะโรงมอบบารมีและความทะเยอทะยาน ท่านมีพลังดึงดูดผู้คนและมักได้รับโอกาสใหญ่ในชีวิต",
+    "ปีมะเส็งมอบปัญญาลึกซึ้งและสัญชาตญาณแม่นยำ ท่านคิดก่อนทำและมักตัดสินใจได้ถูกจังหวะ",
+    "ปีมะเมียมอบความกระตือรือร้นและอิสระ ท่านเคลื่อนไหวเร็ว ชอบการเดินทาง และไม่ยอมจำนนต่อข้อจำกัด",
+    "ปีมะแมมอบความเมตตาและความคิดสร้างสรรค์ ท่านมีจิตใจศิลปินและได้รับความเอ็นดูจากผู้ใหญ่",
+    "ปีวอกมอบความเฉลียวฉลาดและความยืดหยุ่น ท่านแก้ปัญหาได้รวดเร็วและปรับตัวได้ในทุกสถานการณ์",
+    "ปีระกามอบความละเอียดรอบคอบและความซื่อตรง ท่านทำงานเป็นระบบและรักษาคำพูดอย่างเคร่งครัด",
+    "ปีจอมอบความซื่อสัตย์และความยุติธรรม ท่านเป็นเพื่อนแท้ที่พึ่งพาได้และยืนหยัดเพื่อความถูกต้อง",
+    "ปีกุนมอบความใจกว้างและโชคลาภ ท่านจริงใจ รักความสงบ และมักมีผู้หยิบยื่นความช่วยเหลือให้",
+)
+
+# ดิน (地): indexed by hour branch, 子 = 0. Even branches are yang, odd are yin.
+HOUR_FRAGMENTS = (
+    "เวลาตกฟากในยามชวด พลังหยางเพิ่งก่อตัวกลางความมืด ชีวิตท่านเริ่มต้นจากความเงียบแล้วค่อยเติบโตอย่างมั่นคง",
+    "เวลาตกฟากในยามฉลู พลังหยินหนักแน่นดุจผืนดินยามรุ่ง จังหวะชีวิตท่านช้าแต่หนักแน่นและไม่หวั่นไหว",
+    "เวลาตกฟากในยามขาล พลังหยางตื่นขึ้นพร้อมแสงแรก ท่านมีแรงขับเคลื่อนสูงและเหมาะกับการบุกเบิก",
+    "เวลาตกฟากในยามเถาะ พลังหยินอ่อนโยนยามเช้า ชีวิตท่านรุ่งเรืองผ่านมิตรภาพและความร่วมมือ",
+    "เวลาตกฟากในยามมะโรง พลังหยางเต็มเปี่ยมยามสาย ท่านมีพลังในการสร้างสรรค์และรับผิดชอบงานใหญ่",
+    "เวลาตกฟากในยามมะเส็ง พลังหยินแฝงความร้อนแรง ท่านเก็บงำความคิดเก่งและเคลื่อนไหวเมื่อถึงเวลา",
+    "เวลาตกฟากในยามมะเมีย พลังหยางสูงสุดกลางวัน ชีวิตท่านโดดเด่นแต่ต้องระวังความใจร้อน",
+    "เวลาตกฟากในยามมะแม พลังหยินเริ่มผ่อนคลาย ท่านมีจังหวะชีวิตที่สมดุลและรู้จักพักเพื่อไปต่อ",
+    "เวลาตกฟากในยามวอก พลังหยางคล่องแคล่วยามบ่าย ท่านคิดเร็วทำเร็วและคว้าโอกาสได้ทันท่วงที",
+    "เวลาตกฟากในยามระกา พลังหยินสงบยามตะวันรอน ท่านเติบโตผ่านวินัยและความสม่ำเสมอ",
+    "เวลาตกฟากในยามจอ พลังหยางปกป้องยามพลบค่ำ ท่านเป็นหลักให้ครอบครัวและคนรอบข้าง",
+    "เวลาตกฟากในยามกุน พลังหยินลึกซึ้งยามดึก ท่านมีญาณหยั่งรู้และความเข้าใจชีวิตที่ลึกกว่าวัย",
+)
+
+# คน (人): indexed like datetime.date.weekday(), Monday = 0.
+WEEKDAY_FRAGMENTS = (
+    "ผู้เกิดวันจันทร์มีเทวดาประจำวันคือพระจันทร์ จิตใจอ่อนโยน มีเสน่ห์ต่อผู้คน ช่วยทำให้พลังจากฟ้าและดินนุ่มนวลขึ้น",
+    "ผู้เกิดวันอังคารมีพระอังคารคุ้มครอง ใจกล้า ไม่ยอมแพ้ ช่วยเติมความเด็ดเดี่ยวให้พลังแห่งดวงชะตา",
+    "ผู้เกิดวันพุธมีพระพุธคุ้มครอง วาจาดี สื่อสารเก่ง ช่วยให้พลังจากฟ้าและดินถูกนำไปใช้อย่างชาญฉลาด",
+    "ผู้เกิดวันพฤหัสบดีมีพระพฤหัสบดีคุ้มครอง รักความรู้และคุณธรรม ช่วยขัดเกลาพลังแห่งดวงให้สุขุมรอบคอบ",
+    "ผู้เกิดวันศุกร์มีพระศุกร์คุ้มครอง รักความงามและความสุข ช่วยเสริมเสน่ห์และโชคด้านความสัมพันธ์",
+    "ผู้เกิดวันเสาร์มีพระเสาร์คุ้มครอง อดทน หนักแน่น ช่วยเสริมรากฐานให้พลังแห่งดวงชะตามั่นคงยาวนาน",
+    "ผู้เกิดวันอาทิตย์มีพระอาทิตย์คุ้มครอง มีศักดิ์ศรีและความเป็นผู้นำ ช่วยส่องสว่างให้พลังแห่งดวงชะตาเจิดจ้า",
+)
+
+# Per-section fragments indexed by day-master element: wood, fire, earth, metal, water.
+ESSENCE_FRAGMENTS = (
+    "ธาตุไม้ประจำตัวทำให้ท่านเติบโตไม่หยุดนิ่ง มีเมตตาและความคิดริเริ่ม จุดแข็งคือความมุ่งมั่นพัฒนา จุดอ่อนคือความดื้อรั้นเมื่อถูกขัดใจ",
+    "ธาตุไฟประจำตัวทำให้ท่านร่าเริง กระตือรือร้น และจุดประกายผู้อื่นได้ จุดแข็งคือพลังขับเคลื่อน จุดอ่อนคือใจร้อนและหมดไฟเร็ว",
+    "ธาตุดินประจำตัวทำให้ท่านมั่นคง ซื่อตรง และเป็นที่พึ่งพิง จุดแข็งคือความน่าเชื่อถือ จุดอ่อนคือความกังวลและลังเลต่อการเปลี่ยนแปลง",
+    "ธาตุทองประจำตัวทำให้ท่านเด็ดขาด ยุติธรรม และมีวินัย จุดแข็งคือการตัดสินใจ จุดอ่อนคือความแข็งกร้าวจนผู้อื่นเข้าถึงยาก",
+    "ธาตุน้ำประจำตัวทำให้ท่านฉลาด ปรับตัวเก่ง และเข้าใจผู้คน จุดแข็งคือปัญญาและความยืดหยุ่น จุดอ่อนคือความลังเลและอารมณ์แปรปรวน",
+)
+WARNING_FRAGMENTS = (
+    "จงระวังการรับปากเกินกำลัง ไม้ที่แตกกิ่งมากเกินไปย่อมหักง่าย เลือกทำสิ่งสำคัญให้สำเร็จทีละเรื่อง",
+    "จงระวังคำพูดยามโกรธ ไฟที่ลุกโชนเผาได้ทั้งศัตรูและมิตร ความสำเร็จทั้งปีอาจพังเพราะอารมณ์เพียงชั่ววูบ",
+    "จงระวังการยึดติดกับความปลอดภัยจนพลาดโอกาส ดินที่ไม่เคยไถพรวนย่อมไม่ให้ผลผลิต กล้าก้าวออกจากที่เดิม",
+    "จงระวังความดื้อดึงเชื่อมั่นในตนเองเกินไป ทองที่แข็งเกินไปย่อมเปราะ ฟังคำทัดทานของผู้หวังดีบ้าง",
+    "จงระวังการปล่อยให้ความลังเลกินเวลา น้ำที่ไม่ไหลย่อมเน่า ตัดสินใจให้เด็ดขาดเมื่อข้อมูลพร้อมแล้ว",
+)
+CAREER_FRAGMENTS = (
+    "งานที่ส่งเสริมธาตุไม้คือการศึกษา การออกแบบ เกษตร และงานพัฒนาคน การลงทุนควรเน้นระยะยาวที่ค่อยๆ เติบโต",
+    "งานที่ส่งเสริมธาตุไฟคือการตลาด สื่อ พลังงาน และงานที่ต้องพบปะผู้คน การลงทุนควรเลือกสิ่งที่ท่านเข้าใจและมีจุดตัดขาดทุนชัดเจน",
+    "งานที่ส่งเสริมธาตุดินคืออสังหาริมทรัพย์ การบริหาร บัญชี และงานบริการ การลงทุนในทรัพย์สินที่จับต้องได้จะให้ผลดี",
+    "งานที่ส่งเสริมธาตุทองคือการเงิน กฎหมาย วิศวกรรม และงานที่ต้องใช้ความแม่นยำ การลงทุนควรมีวินัยและกระจายความเสี่ยง",
+    "งานที่ส่งเสริมธาตุน้ำคือการค้า การขนส่ง เทคโนโลยี และงานที่ใช้ความคิด การลงทุนที่หมุนเวียนคล่องตัวจะเหมาะกับท่าน",
+)
+BOSS_FRAGMENTS = (
+    "หัวหน้ามองว่าท่านมีศักยภาพสูงแต่ยังกระจายพลังไปหลายทาง หากท่านเลือกโฟกัส ท่านจะได้รับมอบหมายงานสำคัญ",
+    "หัวหน้าชื่นชมพลังของท่านแต่กังวลเรื่องความสม่ำเสมอ ผลงานที่ต่อเนื่องจะเปลี่ยนความกังวลนั้นเป็นความไว้ใจ",
+    "หัวหน้าไว้วางใจท่านเสมอแต่ยังไม่เห็นความกล้าริเริ่ม ลองเสนอความคิดใหม่ แล้วท่านจะถูกมองในฐานะผู้นำ",
+    "หัวหน้าเคารพความสามารถของท่านแต่อยากเห็นความยืดหยุ่นมากขึ้น การรับฟังทีมจะทำให้ท่านก้าวขึ้นอีกขั้น",
+    "หัวหน้ามองว่าท่านฉลาดและเข้าใจงานลึกซึ้ง แต่อยากให้ท่านแสดงจุดยืนชัดเจนกว่านี้ในการประชุม",
+)
+QUOTE_FRAGMENTS = (
+    "\"ต้นไม้ใหญ่ไม่ได้เติบโตในชั่วข้ามคืน แต่ไม่เคยหยุดเติบโตแม้เพียงวันเดียว\"",
+    "\"จงเป็นแสงที่ส่องทาง ไม่ใช่เปลวไฟที่เผาผลาญ\"",
+    "\"ภูเขาไม่เคยรีบ แต่ไม่มีสิ่งใดโค่นมันลงได้\"",
+    "\"ดาบที่คมที่สุดคือดาบที่รู้ว่าเมื่อใดควรอยู่ในฝัก\"",
+    "\"น้ำที่ไหลไม่หยุดย่อมเจาะหินได้ในที่สุด\"",
+)
+LOVE_FRAGMENTS = (
+    "เนื้อคู่ที่สมพงษ์คือผู้มีธาตุน้ำหล่อเลี้ยงหรือธาตุไฟที่ท่านช่วยจุดประกาย ความรักของท่านเติบโตจากความเอาใจใส่ในเรื่องเล็กๆ",
+    "เนื้อคู่ที่สมพงษ์คือผู้มีธาตุไม้ที่ช่วยเติมพลังหรือธาตุดินที่ช่วยรองรับ ท่านต้องการคนที่ใจเย็นพอจะอยู่เคียงข้างไฟในตัวท่าน",
+    "เนื้อคู่ที่สมพงษ์คือผู้มีธาตุไฟที่ให้ความอบอุ่นหรือธาตุทองที่ท่านช่วยประคับประคอง ความรักของท่านมั่นคงและยั่งยืน",
+    "เนื้อคู่ที่สมพงษ์คือผู้มีธาตุดินที่ช่วยหนุนหลังหรือธาตุน้ำที่ช่วยให้ท่านอ่อนโยนลง ความจริงใจคือเสน่ห์ที่แท้จริงของท่าน",
+    "เนื้อคู่ที่สมพงษ์คือผู้มีธาตุทองที่ช่วยให้ท่านมีหลักยึดหรือธาตุไม้ที่ท่านช่วยหล่อเลี้ยง ความเข้าใจคือภาษารักของท่าน",
+)
+HEALTH_FRAGMENTS = (
+    "ธาตุไม้สัมพันธ์กับตับและถุงน้ำดี ควรพักผ่อนให้พอ ลดความเครียด และยืดเหยียดร่างกายเป็นประจำ",
+    "ธาตุไฟสัมพันธ์กับหัวใจและระบบไหลเวียนโลหิต ควรดูแลความดัน นอนให้เป็นเวลา และหลีกเลี่ยงความเครียดสะสม",
+    "ธาตุดินสัมพันธ์กับกระเพาะอาหารและม้าม ควรรับประทานอาหารตรงเวลา ลดของหวาน และเคี้ยวอาหารให้ละเอียด",
+    "ธาตุทองสัมพันธ์กับปอดและผิวหนัง ควรหลีกเลี่ยงมลภาวะ ฝึกหายใจลึก และดูแลระบบทางเดินหายใจ",
+    "ธาตุน้ำสัมพันธ์กับไตและกระเพาะปัสสาวะ ควรดื่มน้ำให้เพียงพอ ระวังความเย็นสะสม และไม่หักโหมจนเกินกำลัง",
+)
+REMEDY_FRAGMENTS = (
+    "เสริมธาตุไม้ด้วยต้นไม้มงคลทางทิศตะวันออก ใช้สีเขียวและสีฟ้าเป็นสีนำโชค และหมั่นทำบุญปลูกต้นไม้",
+    "เสริมธาตุไฟด้วยแสงสว่างในทิศใต้ของบ้าน ใช้สีแดงและสีเขียวเป็นสีนำโชค และจุดประทีปบูชาพระเป็นประจำ",
+    "เสริมธาตุดินด้วยเครื่องปั้นหรือหินมงคลกลางบ้าน ใช้สีเหลืองและสีแดงเป็นสีนำโชค และรักษาบ้านให้เป็นระเบียบ",
+    "เสริมธาตุทองด้วยวัตถุมงคลโลหะทางทิศตะวันตก ใช้สีขาวและสีเหลืองเป็นสีนำโชค และจัดโต๊ะทำงานให้โปร่งโล่ง",
+    "เสริมธาตุน้ำด้วยน้ำพุหรืออ่างน้ำทางทิศเหนือ ใช้สีน้ำเงินและสีขาวเป็นสีนำโชค และทำบุญด้วยการให้ทานน้ำดื่ม",
+)
+
+
+def _year_outlook(zodiac):
+    ally = ZODIAC_TH_SHORT[SIX_HARMONY[zodiac]]
+    rival = ZODIAC_TH_SHORT[CLASH[zodiac]]
+    return (
+        f"ปีที่จะมาถึงผู้เกิดปี{ZODIAC_TH_SHORT[zodiac]}จะได้แรงหนุนจากคนปี{ally} "
+        f"ช่วงต้นปีเหมาะกับการวางแผน กลางปีเหมาะกับการลงมือ ส่วนปลายปีเหมาะกับการเก็บเกี่ยวผล "
+        f"เดือนที่ต้องระวังคือช่วงที่พลังปี{rival}แรง ให้ชะลอการตัดสินใจครั้งใหญ่และรักษาสุขภาพ"
+    )
+
+
+def _fortune_score(zodiac, weekday, element, hour_branch):
+    # Deterministic, and kept in the 60-94 band the AI prompt describes as good.
+    return 60 + (zodiac * 7 + weekday * 5 + element * 11 + hour_branch * 3) % 35
+
+
+@functools.lru_cache(maxsize=None)
+def compose_reading(zodiac, weekday, element, hour_branch):
+    """
+    Assembles a full reading from the fragment tables.
+
+    Args:
+        zodiac (int): Zodiac / year branch index, Rat = 0.
+        weekday (int): Weekday of birth, Monday = 0.
+        element (int): Day-master element index, wood = 0.
+        hour_branch (int): Hour branch index, 子 = 0.
+
+    Returns:
+        str: A Markdown reading in the same shape as the AI one.
+    """
+    element_name = ELEMENTS[element]["thai"]
+    lucky_color = DAY_COLORS_TH[weekday]
+    sections = (
+        NOTICE,
+        "**เปิดฟ้าอ่านชะตา: ฟ้า-ดิน-คน**\n"
+        f"- **ฟ้า (天):** {ZODIAC_FRAGMENTS[zodiac]}\n"
+        f"- **ดิน (地):** {HOUR_FRAGMENTS[hour_branch]}\n"
+        f"- **คน (人):** {WEEKDAY_FRAGMENTS[weekday]}",
+        f"**1. วิเคราะห์แก่นแท้และพลังธาตุ**\n{ESSENCE_FRAGMENTS[element]}",
+        f"**2. ระดับวาสนาและคำเตือนที่ต้องจำให้ขึ้นใจ**\n"
+        f"คะแนนวาสนา: {_fortune_score(zodiac, weekday, element, hour_branch)}/100\n"
+        f"**คำเตือน:** {WARNING_FRAGMENTS[element]}",
+        f"**3. แนวโน้มชะตาปีข้างหน้า**\n{_year_outlook(zodiac)}",
+        f"**4. เส้นทางแห่งความมั่งคั่ง (การงาน-การเงิน)**\n{CAREER_FRAGMENTS[element]}\n"
+        f"**มุมมองจากเจ้าคนนายคน:** {BOSS_FRAGMENTS[element]}\n"
+        f"**คำคมนำทาง:** {QUOTE_FRAGMENTS[element]}",
+        f"**5. วาสนาแห่งรักและเครือข่ายสัมพันธ์ (ความรัก-สังคม)**\n{LOVE_FRAGMENTS[element]}",
+        f"**6. สมดุลแห่งสังขาร (สุขภาพ)**\n{HEALTH_FRAGMENTS[element]}",
+        f"**7. กลยุทธ์ปรับเปลี่ยนชะตา**\n{REMEDY_FRAGMENTS[element]} "
+        f"และสวมใส่สี{lucky_color}ซึ่งเป็นสีประจำวัน{WEEKDAYS_TH[weekday]}เพื่อเสริมสิริมงคล",
+        "**ส่วนสุดท้าย: บทสรุปสำหรับท่าน (ฉบับเข้าใจง่าย)**\n"
+        f"- **ภาพรวม:** ท่านคือคนปี{ZODIAC_TH_SHORT[zodiac]} ธาตุ{element_name} เกิดยาม{EARTHLY_BRANCHES[hour_branch]}\n"
+        f"- **การงาน:** {CAREER_FRAGMENTS[element].split(' ')[0]}\n"
+        f"- **ความรัก:** มองหาผู้ที่ธาตุเกื้อหนุนกับธาตุ{element_name}ของท่าน\n"
+        f"- **คำเตือนสำคัญที่สุด:** {WARNING_FRAGMENTS[element].split(' ')[0]}",
+    )
+    return "\n\n".join(sections)
+
+
+def generate_offline_fortune(birth_date, birth_time):
+    """
+    Builds the local reading for a birth date and time.
+
+    Args:
+        birth_date (datetime.date): The user's date of birth.
+        birth_time (datetime.time): The user's time of birth.
+
+    Returns:
+        str: The template-based reading in Thai.
+    """
+    p = sexagenary.pillars(birth_date, birth_time)
+    return compose_reading(p.year_branch, birth_date.weekday(), STEM_ELEMENTS[p.day_stem], p.hour_branch)
+
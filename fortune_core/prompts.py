@@ -0,0 +1,178 @@
+# fortune_core/prompts.py
+# This file contains the prompt assembly for AI readings. Every request is laid
+# out as a byte-stable static prefix (persona, analysis instructions, sections
+# 1-7, summary and style rules) followed by a small per-user chart block, so
+# all users share one cacheable prefix at the provider and only the last few
+# dozen tokens differ. It also counts tokens, to measure input size and keep
+# prompts under budget.
+
+import math
+
+# gpt-4o's tokenizer.
+TOKEN_ENCODING = "o200k_base"
+# Chat formatting overhead per message, and for priming the reply.
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+DEFAULT_PROMPT_TOKEN_BUDGET = 3000
+
+# Model and completion parameters of the enhanced reading. They are part of its
+# reading-cache key, so everything that writes enhanced readings uses these.
+ENHANCED_MODEL = "gpt-4o"
+ENHANCED_PARAMS = {"max_tokens": 2000, "temperature": 0.8}
+
+PERSONA = (
+    "คุณเป็นซินแสผู้เชี่ยวชาญศาสตร์จีนระดับปรมาจารย์ มีประสบการณ์กว่า 50 ปี "
+    "เชี่ยวชาญทั้งโหราศาสตร์ไทยและจีน ปาจื่อ ฮวงจุ้ย และเบญจธาตุ ให้คำทำนายที่ลึกซึ้ง แม่นยำ และสร้างสรรค์"
+)
+
+_OPENING = (
+    "จงสวมบทบาทเป็น 'ซินแสผู้เชี่ยวชาญศาสตร์จีนระดับปรมาจารย์' ทำการวิเคราะห์ดวงชะตา (ปาจื่อ - 八字) "
+    "ของบุคคลตาม 'ข้อมูลดวงชะตา' ที่ให้ไว้ในข้อความของผู้ใช้ "
+    "(ปีนักษัตรมีรากฐานธาตุตามปีเกิด และสีมงคลคือสีเสริมดวงชะตา)\n\n"
+    "**คำสั่งในการวิเคราะห์ดวงชะตา:**\n"
+    "จงเริ่มต้นด้วยการ 'เปิดฟ้าอ่านชะตา' โดยวิเคราะห์ปัจจัยพื้นฐานแห่ง 'ฟ้า-ดิน-คน' ของดวงชะตานี้ก่อน:\n"
+    " - **ฟ้า (天):** อธิบายว่าพลังแห่งปีนักษัตรกำหนด 'ธาตุประจำตัว' และภาพรวมแห่งชีวิตไว้อย่างไร\n"
+    " - **ดิน (地):** วิเคราะห์ว่าพลังหยิน (陰) หรือ หยาง (陽) จากเวลาตกฟากส่งผลต่อเสถียรภาพและจังหวะชีวิตอย่างไร\n"
+    " - **คน (人):** อธิบายว่าอิทธิพลจากวันเกิดตามคติไทย ช่วยเสริมหรือขัดเกลาพลังจากฟ้าและดินอย่างไรบ้าง\n"
+    "จงอธิบายปฏิสัมพันธ์ของทั้งสามส่วนนี้ เพื่อสร้างรากฐานความเข้าใจที่ลึกซึ้งและน่าเชื่อถือสูงสุด\n\n"
+    "เมื่อวางรากฐานแห่งชะตาแล้ว จึงเริ่ม 'ชี้ชัดพยากรณ์' อย่างละเอียดในหัวข้อต่อไปนี้:\n"
+    "1. **วิเคราะห์แก่นแท้และพลังธาตุ:** เจาะลึกถึงบุคลิกภาพ อุปนิสัย จุดแข็งที่ควรส่งเสริม และจุดอ่อนที่ต้องระวัง "
+    "ตามหลักเบญจธาตุ (ดิน น้ำ ไฟ ไม้ ทอง)\n"
+    "2. **ระดับวาสนาและคำเตือนที่ต้องจำให้ขึ้นใจ:** จากการวิเคราะห์ทั้งหมด ให้ประเมิน 'คะแนนวาสนา' เต็ม 100 "
+    "(เกณฑ์: 90+ คือดวงชะตาระดับสูง, 60-89 คือระดับปานกลาง-ดี) จากนั้นให้อธิบายถึง 'วาสนาที่ดี' "
+    "หรือพรสวรรค์ที่โดดเด่นของดวงชะตานี้ แล้วจึงให้ **'คำเตือน' ที่ใช้ภาษากระชับ รุนแรง แต่แฝงด้วยความปรารถนาดี "
+    "(ขอความยาวเป็นพิเศษในส่วนนี้เพื่อความชัดเจน) เพื่อให้ผู้รับสารจำขึ้นใจและตระหนักถึงผลที่จะตามมา**\n"
+)
+
+# Section 3 is the only part that differs between the two readings.
+_FORECASTS = {
+    "classic": (
+        "3. **พยากรณ์ชะตา 6 เดือนข้างหน้า:** วิเคราะห์แนวโน้มสำคัญในด้าน การงาน, การเงิน, และความรัก "
+        "ที่จะเกิดขึ้นในอีก 6 เดือนนับจากนี้ ชี้ชัดถึงเดือนที่โดดเด่นและเดือนที่ต้องระมัดระวัง\n"
+    ),
+    "enhanced": (
+        "3. **กลอนพยากรณ์ชะตา 1 ปีข้างหน้า:** จงเขียนกลอนสี่สุภาพ (กลอนไทยแบบดั้งเดิม) "
+        "ทำนายแนวโน้มแต่ละเดือนตลอดปีข้างหน้า โดยแต่ละบทกลอนต้องพูดตรงๆ ไม่อ้อมค้อม ชี้ชัดถึงเดือนที่ดี "
+        "เดือนที่ต้องระวัง ด้วยคำคมกะทัดรัดแต่แหลมคม ให้ผู้ฟังได้คิดและตระหนัก\n"
+    ),
+}
+
+_CLOSING = (
+    "4. **เส้นทางแห่งความมั่งคั่ง (การงาน-การเงิน):** ชี้แนะอาชีพที่ส่งเสริมธาตุประจำตัว ทิศทางการลงทุนที่เหมาะสม "
+    "**เพิ่มหัวข้อ 'มุมมองจากเจ้าคนนายคน (สิ่งที่หัวหน้างานคิดกับท่านในตอนนี้)' โดยให้วิเคราะห์แบบตรงไปตรงมา "
+    "ไม่ต้องอ้อมค้อม แต่ให้เป็นไปในเชิงสร้างสรรค์เพื่อการพัฒนา ไม่บั่นทอนกำลังใจ** "
+    "และสุดท้ายมอบ 'คำคมนำทาง' ที่สร้างแรงบันดาลใจในการทำงาน 1 ประโยค\n"
+    "5. **วาสนาแห่งรักและเครือข่ายสัมพันธ์ (ความรัก-สังคม):** วิเคราะห์ลักษณะเนื้อคู่ตามธาตุที่สมพงษ์ "
+    "วิธีการเสริมสร้างเสน่ห์ และการบริหารความสัมพันธ์กับคนรอบข้าง\n"
+    "6. **สมดุลแห่งสังขาร (สุขภาพ):** ให้คำแนะนำในการดูแลสุขภาพตามธาตุเจ้าเรือน และอวัยวะที่ต้องใส่ใจเป็นพิเศษ\n"
+    "7. **กลยุทธ์ปรับเปลี่ยนชะตา:** แนะนำแนวทางการใช้ชีวิต การปรับสภาพแวดล้อม (ฮวงจุ้ย) "
+    "หรือการใช้วัตถุมงคล/สีมงคล เพื่อปรับสมดุลธาตุและเสริมสร้างสิริมงคล\n\n"
+    "**ส่วนสุดท้าย: บทสรุปสำหรับท่าน (ฉบับเข้าใจง่าย)**\n"
+    "หลังจากคำพยากรณ์ทั้งหมด จงสรุปใจความสำคัญในแต่ละด้าน (ภาพรวม, การงาน, ความรัก, และคำเตือนที่สำคัญที่สุด) "
+    "ให้เป็นภาษาที่คนทั่วไปเข้าใจง่ายและนำไปใช้ได้ทันที โดยแยกเป็นข้อๆ\n\n"
+    "จงรจนาคำพยากรณ์ทั้งหมดเป็น **'ภาษาไทย'** ด้วยลีลาของซินแสผู้ทรงภูมิ มีความหนักแน่น ชัดเจน "
+    "และให้คำแนะนำที่สามารถนำไปปรับใช้ในชีวิตได้จริง"
+)
+
+# The complete system message of each reading variant. These strings are the
+# shared prefix; anything per-user must go in the chart block instead.
+STATIC_PREFIXES = {
+    variant: f"{PERSONA}\n\n{_OPENING}{forecast}{_CLOSING}"
+    for variant, forecast in _FORECASTS.items()
+}
+VARIANTS = tuple(STATIC_PREFIXES)
+
+
+def build_chart_block(day_name, thai_color, thai_animal, birth_time):
+    """
+    Builds the per-user part of a prompt.
+
+    Args:
+        day_name (str): The day of the week of birth.
+        thai_color (str): The lucky color.
+        thai_animal (str): The Chinese zodiac animal.
+        birth_time (datetime.time): The user's time of birth.
+
+    Returns:
+        str: A short, fixed-layout description of the chart.
+    """
+    return (
+        "ข้อมูลดวงชะตา:\n"
+        f"- วันเกิด: วัน {day_name}\n"
+        f"- เวลาเกิด: {birth_time.strftime('%H:%M')}\n"
+        f"- ปีนักษัตร: {thai_animal}\n"
+        f"- สีมงคล: {thai_color}"
+    )
+
+
+def build_messages(variant, day_name, thai_color, thai_animal, birth_time):
+    """
+    Builds the chat messages for a full reading.
+
+    Args:
+        variant (str): "classic" (six-month forecast) or "enhanced" (one-year verse).
+        day_name (str): The day of the week of birth.
+        thai_color (str): The lucky color.
+        thai_animal (str): The Chinese zodiac animal.
+        birth_time (datetime.time): The user's time of birth.
+
+    Returns:
+        list: The static system message followed by the chart block.
+    """
+    return [
+        {"role": "system", "content": STATIC_PREFIXES[variant]},
+        {"role": "user", "content": build_chart_block(day_name, thai_color, thai_animal, birth_time)},
+    ]
+
+
+_encoding = None
+
+
+def _get_encoding():
+    # tiktoken is optional and slow to import, so it is loaded on first use.
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+        except ImportError:
+            _encoding = False
+        else:
+            _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+    return _encoding
+
+
+def count_tokens(text):
+    """
+    Counts the tokens in ``text`` with the gpt-4o tokenizer when tiktoken is
+    installed, and estimates them otherwise.
+    """
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    # Without tiktoken: about four characters per token for ASCII and a little
+    # over two for Thai.
+    ascii_chars = sum(1 for c in text if c < "\x80")
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 2)
+
+
+def count_message_tokens(messages):
+    """Counts the prompt tokens a list of chat messages will be billed for."""
+    return TOKENS_PER_REPLY + sum(
+        TOKENS_PER_MESSAGE + count_tokens(message["content"]) for message in messages
+    )
+
+
+def check_budget(messages, budget=DEFAULT_PROMPT_TOKEN_BUDGET):
+    """
+    Checks that a prompt fits the input-token budget.
+
+    Returns:
+        int: The prompt's token count.
+
+    Raises:
+        ValueError: If the prompt is over budget.
+    """
+    tokens = count_message_tokens(messages)
+    if tokens > budget:
+        raise ValueError(f"prompt is {tokens} tokens, over the budget of {budget}")
+    return tokens
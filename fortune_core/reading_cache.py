@@ -0,0 +1,224 @@
+# fortune_core/reading_cache.py
+# This file contains a content-addressed cache for AI fortune readings.
+# Readings are keyed on a hash of the fully rendered prompt plus the model and
+# its parameters, and stored in an in-process LRU tier in front of a persistent
+# SQLite tier, so repeated birth inputs skip the model call entirely.
+
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = ".fortune_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MEMORY_ENTRIES = 256
+
+
+def make_cache_key(model, messages, **params):
+    """
+    Builds the content address of a reading request.
+
+    Args:
+        model (str): The chat model name.
+        messages (list): The fully rendered chat messages.
+        **params: Any other completion parameters (temperature, max_tokens...).
+
+    Returns:
+        str: A hex SHA-256 digest that is stable across processes.
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryLRU:
+    """A thread-safe, size-bounded LRU tier with per-entry expiry."""
+
+    def __init__(self, max_entries=DEFAULT_MEMORY_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """A persistent tier backed by a single SQLite file, shared across restarts."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS readings ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS readings_accessed ON readings (accessed_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM readings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if created_at + self.ttl_seconds < now:
+                self._conn.execute("DELETE FROM readings WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE readings SET accessed_at = ? WHERE key = ?", (now, key))
+            return value
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO readings (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        # Drop expired rows first, then the least recently read ones over the bound.
+        self._conn.execute("DELETE FROM readings WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM readings").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM readings WHERE key IN ("
+                " SELECT key FROM readings ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM readings")
+
+    def __len__(self):
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM readings").fetchone()
+        return count
+
+
+class ReadingCache:
+    """
+    Two-tier reading cache with hit/miss counters.
+
+    Any object with ``get(key)`` and ``put(key, value)`` can be plugged in as
+    either tier; pass ``None`` to disable a tier.
+    """
+
+    def __init__(self, memory=None, store=None):
+        self.memory = memory
+        self.store = store
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "store_hits": 0, "misses": 0, "writes": 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds a cache configured from environment variables.
+
+        FORTUNE_CACHE_PATH selects the SQLite file (empty disables the disk tier),
+        FORTUNE_CACHE_TTL the expiry in seconds, FORTUNE_CACHE_MAX_ENTRIES the
+        disk bound and FORTUNE_CACHE_MEMORY_ENTRIES the in-process bound.
+        """
+        ttl = int(os.environ.get("FORTUNE_CACHE_TTL", DEFAULT_TTL_SECONDS))
+        memory = MemoryLRU(
+            max_entries=int(os.environ.get("FORTUNE_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES)),
+            ttl_seconds=ttl
+        )
+        path = os.environ.get("FORTUNE_CACHE_PATH", DEFAULT_CACHE_PATH)
+        store = None
+        if path:
+            store = SQLiteStore(
+                path,
+                ttl_seconds=ttl,
+                max_entries=int(os.environ.get("FORTUNE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+            )
+        return cls(memory=memory, store=store)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key):
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                self._count("memory_hits")
+                return value
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self._count("store_hits")
+                if self.memory is not None:
+                    self.memory.put(key, value)
+                return value
+        self._count("misses")
+        return None
+
+    def put(self, key, value):
+        if self.memory is not None:
+            self.memory.put(key, value)
+        if self.store is not None:
+            self.store.put(key, value)
+        self._count("writes")
+
+    def stats(self):
+        """Returns a snapshot of the hit/miss counters and the hit ratio."""
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["memory_hits"] + stats["store_hits"] + stats["misses"]
+        stats["hit_ratio"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Returns the process-wide cache, creating it from the environment on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ReadingCache.from_env()
+        return _default_cache
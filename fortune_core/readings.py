@@ -0,0 +1,223 @@
+# fortune_core/readings.py
+# This file contains the AI reading engines the app runs on its job pool: the
+# "stream" reading, written progressively by one completion, and the
+# "sectioned" reading (see sectioned.py), plus the job handler that runs either
+# one for a job's payload. The benchmarks drive these same functions, so they
+# measure exactly what the app serves.
+
+import datetime
+import os
+import sys
+
+from fortune_core import ai_client, metrics, prompts, reading_cache, sectioned, singleflight
+from fortune_core.chart import compute_chart
+
+ENGINES = ("stream", "sectioned")
+DEFAULT_REQUEST_TIMEOUT = 60
+# How long a session waits on an identical reading another session is
+# generating before giving up: the leader's retries plus a long stream.
+DEFAULT_FOLLOWER_TIMEOUT = 300
+
+# Shown to the user when a reading job fails.
+MISSING_KEY_MESSAGE = "❌ ไม่พบ OpenAI API Key ในระบบ กรุณาตั้งค่า Environment Variable"
+ERROR_MESSAGE = "❌ เกิดข้อผิดพลาดในการเชื่อมต่อ AI: {error}"
+
+
+def stream_reading(api_key, day_name, thai_color, thai_animal, birth_time, cache=None, client=None, flights=None,
+                   trace=None, request_timeout=DEFAULT_REQUEST_TIMEOUT, follower_timeout=DEFAULT_FOLLOWER_TIMEOUT):
+    """
+    Yields the enhanced reading chunk by chunk as the model writes it.
+
+    A cached reading is yielded whole. A reading already being generated for
+    another session is waited for and yielded whole when it is done. Only a
+    fully received reading is written to the cache.
+
+    Args:
+        api_key (str): The OpenAI API key to call with.
+        day_name (str): The day of the week of birth (Thai).
+        thai_color (str): The lucky color (Thai).
+        thai_animal (str): The Chinese zodiac animal (Thai).
+        birth_time (datetime.time): The user's time of birth.
+        cache (reading_cache.ReadingCache, optional): Defaults to the process-wide cache.
+        client (ai_client.FortuneAIClient, optional): Defaults to the process-wide client.
+        flights (singleflight.SingleFlight, optional): Defaults to the process-wide one.
+        trace (metrics.ReadingTrace, optional): Receives the prompt timing, usage,
+            cache outcome and error class. The caller owns the ttft and
+            generation timings, since only it sees when text is shown.
+        request_timeout (float): Seconds to wait for the AI before giving up.
+        follower_timeout (float): Seconds to wait on an identical reading
+            being generated elsewhere before failing with TimeoutError.
+
+    Yields:
+        str: The reading's text, in order.
+
+    Raises:
+        Exception: Whatever the upstream call raised; its class is set on trace.
+    """
+    if trace is None:
+        trace = metrics.ReadingTrace("stream")
+    if cache is None:
+        cache = reading_cache.get_default_cache()
+    if client is None:
+        client = ai_client.get_default_client()
+    if flights is None:
+        flights = singleflight.get_default_flights()
+
+    try:
+        with trace.stage("prompt"):
+            # Static instructions first, chart last, so every user shares the same cached prefix.
+            messages = prompts.build_messages("enhanced", day_name, thai_color, thai_animal, birth_time)
+        cache_key = reading_cache.make_cache_key(prompts.ENHANCED_MODEL, messages, **prompts.ENHANCED_PARAMS)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            trace.cache_hit = True
+            yield cached
+            return
+
+        future, leader = flights.join(cache_key)
+        if not leader:
+            yield future.result(timeout=follower_timeout)
+            return
+
+        parts = []
+        try:
+            with flights.slot(cache_key):
+                # Retried only until the stream opens; text already shown is never replayed.
+                for content in client.stream(
+                    messages, prompts.ENHANCED_MODEL, api_key=api_key, timeout=request_timeout,
+                    **prompts.ENHANCED_PARAMS
+                ):
+                    parts.append(content)
+                    yield content
+        except BaseException as e:
+            # Followers must never be left waiting, even if this session goes away mid-stream.
+            flights.resolve(cache_key, error=e if isinstance(e, Exception) else RuntimeError("upstream call was interrupted"))
+            raise
+
+        fortune_text = "".join(parts)
+        # Followers are released first, so nothing that goes wrong below can strand them.
+        flights.resolve(cache_key, result=fortune_text)
+        try:
+            cache.put(cache_key, fortune_text)
+        except Exception as e:
+            # The reading itself is good; it is only not cached this time.
+            print(f"reading cache write failed: {type(e).__name__}: {e}", file=sys.stderr)
+        # Streamed responses carry no usage block, so the tokens are estimated.
+        trace.add_usage(
+            prompts.ENHANCED_MODEL,
+            prompts.count_message_tokens(messages),
+            metrics.estimate_tokens(fortune_text),
+            estimated=True
+        )
+    except Exception as e:
+        trace.set_error(e)
+        raise
+
+
+def sectioned_reading(api_key, day_name, thai_color, thai_animal, birth_time, cache=None, client=None, flights=None,
+                      trace=None):
+    """
+    Generates the sectioned reading, every section requested concurrently.
+
+    Takes the same arguments as stream_reading(). A failed section is recorded
+    on the trace and replaced by a notice; the reading fails only when every
+    section does.
+
+    Returns:
+        str: The stitched reading.
+
+    Raises:
+        Exception: The first section's error, when no section succeeded.
+    """
+    if trace is None:
+        trace = metrics.ReadingTrace("sectioned")
+    if cache is None:
+        cache = reading_cache.get_default_cache()
+    if client is None:
+        client = ai_client.get_default_client()
+    if flights is None:
+        flights = singleflight.get_default_flights()
+
+    def complete(messages, model, **params):
+        try:
+            response = client.complete(
+                messages, model, api_key=api_key, timeout=sectioned.DEFAULT_SECTION_TIMEOUT, **params
+            )
+        except Exception as e:
+            trace.set_error(e)
+            raise
+        trace.add_response_usage(model, response)
+        return response.choices[0].message.content
+
+    cache_hits = []
+    try:
+        fortune_text = sectioned.generate_sectioned_fortune(
+            day_name, thai_color, thai_animal, birth_time, complete=complete, cache=cache, flights=flights,
+            on_cache_hit=lambda: cache_hits.append(True)
+        )
+    except Exception as e:
+        trace.set_error(e)
+        raise
+    # A cache hit only when every section and the summary came from the cache.
+    trace.cache_hit = len(cache_hits) == len(sectioned.SECTIONS) + 1
+    return fortune_text
+
+
+def run_reading_job(payload, progress, api_key=None, cache=None, client=None, flights=None, recorder=None):
+    """
+    Job handler for "reading" jobs, run on a worker thread of the job pool.
+
+    Args:
+        payload (dict): ``engine`` (one of ENGINES), ``birth_date`` (ISO date)
+            and ``birth_time`` ("HH:MM").
+        progress (callable): Called with the text so far as it grows.
+        api_key (str, optional): Defaults to OPENAI_API_KEY, read on every job.
+        cache, client, flights: As for stream_reading().
+        recorder (metrics.MetricsRecorder, optional): Receives the job's trace;
+            defaults to the process-wide recorder.
+
+    Returns:
+        str: The finished reading.
+
+    Raises:
+        RuntimeError: With the message to show the user, when the reading failed.
+    """
+    birth_date = datetime.date.fromisoformat(payload["birth_date"])
+    birth_time = datetime.time.fromisoformat(payload["birth_time"])
+    engine = payload["engine"]
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}; expected one of {ENGINES}")
+    if api_key is None:
+        api_key = os.environ.get("OPENAI_API_KEY")
+    if recorder is None:
+        recorder = metrics.get_default_recorder()
+
+    trace = metrics.ReadingTrace(engine)
+    with trace.stage("chart"):
+        chart = compute_chart(birth_date, birth_time)
+        day_name, thai_color, thai_animal = chart.day_name_th, chart.color_th, chart.zodiac_th_short
+    trace.set_inputs(day_name, thai_color, thai_animal, birth_time)
+
+    trace.start("generation")
+    try:
+        if not api_key:
+            raise RuntimeError(MISSING_KEY_MESSAGE)
+        reading_args = (api_key, day_name, thai_color, thai_animal, birth_time)
+        try:
+            if engine == "sectioned":
+                chunks = iter((
+                    sectioned_reading(*reading_args, cache=cache, client=client, flights=flights, trace=trace),
+                ))
+            else:
+                chunks = stream_reading(*reading_args, cache=cache, client=client, flights=flights, trace=trace)
+            fortune_text = ""
+            for chunk in chunks:
+                trace.stop("ttft", since="generation")
+                fortune_text += chunk
+                progress(fortune_text)
+        except Exception as e:
+            raise RuntimeError(ERROR_MESSAGE.format(error=e)) from e
+        trace.stop("generation")
+        return fortune_text
+    finally:
+        recorder.record(trace)
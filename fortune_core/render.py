@@ -0,0 +1,170 @@
+# fortune_core/render.py
+# This file contains the renderer that turns a reading's Markdown into the HTML
+# shown on the page. It is a single pass over precompiled patterns. It handles
+# headings, bold and italic text, bullet and numbered lists, rules and line
+# breaks, and HTML-escapes everything else, so model output can never inject
+# markup. Blank lines end every block, so a streamed reading can be rendered
+# incrementally: finished blocks are rendered once, and only the block still
+# being written is rendered again as text arrives.
+
+import functools
+import html
+import re
+
+_BLOCK_SEPARATOR = re.compile(r"\n[ \t]*\n")
+_HEADING = re.compile(r"^\s*(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+_RULE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$")
+_BULLET = re.compile(r"^\s*[-*•+]\s+(.*)$")
+_NUMBERED = re.compile(r"^\s*(\d{1,9})[.)]\s+(.*)$")
+# Applied to already escaped text; neither "*" nor "_" is touched by escaping.
+_INLINE = re.compile(
+    r"\*\*(?P<bold>[^\s*](?:.*?[^\s])?)\*\*"
+    r"|(?<![*\w])\*(?P<em>[^\s*](?:[^*]*?[^\s*])?)\*(?![*\w])"
+    r"|(?<![_\w])_(?P<em_>[^\s_](?:[^_]*?[^\s_])?)_(?![_\w])"
+)
+
+MEMO_SIZE = 256
+
+
+def _inline_replacement(match):
+    if match.group("bold") is not None:
+        return f"<strong>{render_inline_escaped(match.group('bold'))}</strong>"
+    return f"<em>{match.group('em') or match.group('em_')}</em>"
+
+
+def render_inline_escaped(escaped):
+    """Renders bold and italic markers in text that has already been HTML-escaped."""
+    return _INLINE.sub(_inline_replacement, escaped)
+
+
+def render_inline(text):
+    """
+    Escapes one line of text and renders its bold and italic markers.
+
+    Unpaired markers are left as literal characters, never as open tags.
+    """
+    return render_inline_escaped(html.escape(text, quote=False))
+
+
+def render_block(block):
+    """
+    Renders one block, the text between two blank lines.
+
+    Lines are grouped in order: a heading or rule stands alone, consecutive
+    list items of one kind form a list, and other consecutive lines form a
+    paragraph joined by line breaks.
+    """
+    parts = []
+    paragraph = []
+    list_tag = None
+
+    def close_paragraph():
+        if paragraph:
+            parts.append(f"<p>{'<br>'.join(paragraph)}</p>")
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag is not None:
+            parts.append(f"</{list_tag}>")
+            list_tag = None
+
+    for line in block.split("\n"):
+        if not line.strip():
+            continue
+        heading = _HEADING.match(line)
+        if heading:
+            close_paragraph()
+            close_list()
+            level = len(heading.group(1))
+            parts.append(f'<h{level} class="section-title">{render_inline(heading.group(2))}</h{level}>')
+            continue
+        if _RULE.match(line):
+            close_paragraph()
+            close_list()
+            parts.append("<hr>")
+            continue
+        bullet = _BULLET.match(line)
+        numbered = None if bullet else _NUMBERED.match(line)
+        if bullet or numbered:
+            close_paragraph()
+            tag = "ul" if bullet else "ol"
+            if list_tag != tag:
+                close_list()
+                start = int(numbered.group(1)) if numbered else 1
+                parts.append(f'<ol start="{start}">' if start != 1 else f"<{tag}>")
+                list_tag = tag
+            item = bullet.group(1) if bullet else numbered.group(2)
+            parts.append(f"<li>{render_inline(item)}</li>")
+            continue
+        close_list()
+        paragraph.append(render_inline(line.strip()))
+    close_paragraph()
+    close_list()
+    return "".join(parts)
+
+
+def render_markdown(text):
+    """
+    Renders a reading's Markdown to HTML.
+
+    Args:
+        text (str): The reading, as written by the model or the offline engine.
+
+    Returns:
+        str: Escaped HTML; only the tags the renderer itself writes are markup.
+    """
+    return "".join(render_block(block) for block in _BLOCK_SEPARATOR.split(text.replace("\r", "")))
+
+
+def wrap_reading(body_html):
+    return f'<div class="fortune-content">{body_html}</div>'
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def render_reading(text):
+    """
+    Renders a whole reading inside its ``fortune-content`` container.
+
+    Memoized, so redisplaying a stored or cached reading on a rerun does not
+    parse it again.
+    """
+    return wrap_reading(render_markdown(text))
+
+
+class StreamRenderer:
+    """
+    Renders a reading while it is being written.
+
+    Blocks that a later blank line has closed are rendered once and kept;
+    each update renders only the open block at the end. The output always
+    equals render_reading() of the text received so far.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.text = ""
+        self._closed_html = ""
+        self._open_start = 0
+
+    def feed(self, chunk):
+        """Appends a chunk of text; returns the HTML of the whole reading so far."""
+        # A separator may straddle two chunks; if so it starts at the last newline received before.
+        search_from = max(self._open_start, self.text.rfind("\n", self._open_start))
+        self.text += chunk.replace("\r", "")
+        for separator in _BLOCK_SEPARATOR.finditer(self.text, search_from):
+            self._closed_html += render_block(self.text[self._open_start:separator.start()])
+            self._open_start = separator.end()
+        return self.html
+
+    def update(self, text):
+        """Brings the renderer up to ``text``, the full reading so far; returns its HTML."""
+        if not text.startswith(self.text):
+            self.reset()
+        return self.feed(text[len(self.text):])
+
+    @property
+    def html(self):
+        return wrap_reading(self._closed_html + render_block(self.text[self._open_start:]))
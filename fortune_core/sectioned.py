@@ -0,0 +1,203 @@
+# fortune_core/sectioned.py
+# This file contains the "sectioned" reading engine. Instead of asking one
+# completion to write the whole reading in order, it sends one sub-prompt per
+# section concurrently, all sharing the same chart context, stitches the
+# results back in order and writes the summary last from the section outputs.
+
+import concurrent.futures
+import time
+
+from fortune_core import ai_client, prompts, reading_cache
+
+SECTION_MODEL = "gpt-4o"
+SECTION_PARAMS = {"max_tokens": 600, "temperature": 0.8}
+SUMMARY_PARAMS = {"max_tokens": 500, "temperature": 0.7}
+DEFAULT_SECTION_TIMEOUT = 45
+
+STYLE_RULE = (
+    "จงรจนาคำพยากรณ์เป็น **'ภาษาไทย'** ด้วยลีลาของซินแสผู้ทรงภูมิ มีความหนักแน่น ชัดเจน "
+    "และให้คำแนะนำที่สามารถนำไปปรับใช้ในชีวิตได้จริง เขียนเฉพาะหัวข้อที่ได้รับมอบหมายเท่านั้น "
+    "โดยขึ้นต้นด้วยชื่อหัวข้อเป็นตัวหนา"
+)
+
+# Shared by every sub-prompt of every reading, so it is kept byte-stable.
+SYSTEM_PROMPT = f"{prompts.PERSONA}\n\n{STYLE_RULE}"
+
+# (title, instruction) in the order the sections appear in the final reading.
+SECTIONS = (
+    ("เปิดฟ้าอ่านชะตา: ฟ้า-ดิน-คน",
+     "วิเคราะห์ปัจจัยพื้นฐานแห่ง 'ฟ้า-ดิน-คน' ของดวงชะตานี้:\n"
+     " - **ฟ้า (天):** อธิบายว่าพลังแห่งปีนักษัตรกำหนด 'ธาตุประจำตัว' และภาพรวมแห่งชีวิตไว้อย่างไร\n"
+     " - **ดิน (地):** วิเคราะห์ว่าพลังหยิน (陰) หรือ หยาง (陽) จากเวลาตกฟากส่งผลต่อเสถียรภาพและจังหวะชีวิตอย่างไร\n"
+     " - **คน (人):** อธิบายว่าอิทธิพลจากวันเกิดตามคติไทย ช่วยเสริมหรือขัดเกลาพลังจากฟ้าและดินอย่างไรบ้าง\n"
+     "จงอธิบายปฏิสัมพันธ์ของทั้งสามส่วนนี้ เพื่อสรุปรากฐานความเข้าใจที่ลึกซึ้งและน่าเชื่อถือสูงสุด"),
+    ("1. วิเคราะห์แก่นแท้และพลังธาตุ",
+     "เจาะลึกถึงบุคลิกภาพ อุปนิสัย จุดแข็งที่ควรส่งเสริม และจุดอ่อนที่ต้องระวัง ตามหลักเบญจธาตุ (ดิน น้ำ ไฟ ไม้ ทอง)"),
+    ("2. ระดับวาสนาและคำเตือนที่ต้องจำให้ขึ้นใจ",
+     "ให้ประเมิน 'คะแนนวาสนา' เต็ม 100 (เกณฑ์: 90+ คือดวงชะตาระดับสูง, 60-89 คือระดับปานกลาง-ดี) "
+     "จากนั้นให้อธิบายถึง 'วาสนาที่ดี' หรือพรสวรรค์ที่โดดเด่นของดวงชะตานี้ แล้วจึงให้ **'คำเตือน' ที่ใช้ภาษากระชับ "
+     "รุนแรง แต่แฝงด้วยความปรารถนาดี (ขอความยาวเป็นพิเศษในส่วนนี้เพื่อความชัดเจน) "
+     "เพื่อให้ผู้รับสารจำขึ้นใจและตระหนักถึงผลที่จะตามมา**"),
+    ("3. กลอนพยากรณ์ชะตา 1 ปีข้างหน้า",
+     "จงเขียนกลอนสี่สุภาพ (กลอนไทยแบบดั้งเดิม) ทำนายแนวโน้มแต่ละเดือนตลอดปีข้างหน้า โดยแต่ละบทกลอนต้องพูดตรงๆ "
+     "ไม่อ้อมค้อม ชี้ชัดถึงเดือนที่ดี เดือนที่ต้องระวัง ด้วยคำคมกะทัดรัดแต่แหลมคม ให้ผู้ฟังได้คิดและตระหนัก"),
+    ("4. เส้นทางแห่งความมั่งคั่ง (การงาน-การเงิน)",
+     "ชี้แนะอาชีพที่ส่งเสริมธาตุประจำตัว ทิศทางการลงทุนที่เหมาะสม **เพิ่มหัวข้อ 'มุมมองจากเจ้าคนนายคน "
+     "(สิ่งที่หัวหน้างานคิดกับท่านในตอนนี้)' โดยให้วิเคราะห์แบบตรงไปตรงมา ไม่ต้องอ้อมค้อม "
+     "แต่ให้เป็นไปในเชิงสร้างสรรค์เพื่อการพัฒนา ไม่บั่นทอนกำลังใจ** และสุดท้ายมอบ 'คำคมนำทาง' "
+     "ที่สร้างแรงบันดาลใจในการทำงาน 1 ประโยค"),
+    ("5. วาสนาแห่งรักและเครือข่ายสัมพันธ์ (ความรัก-สังคม)",
+     "วิเคราะห์ลักษณะเนื้อคู่ตามธาตุที่สมพงษ์ วิธีการเสริมสร้างเสน่ห์ และการบริหารความสัมพันธ์กับคนรอบข้าง"),
+    ("6. สมดุลแห่งสังขาร (สุขภาพ)",
+     "ให้คำแนะนำในการดูแลสุขภาพตามธาตุเจ้าเรือน และอวัยวะที่ต้องใส่ใจเป็นพิเศษ"),
+    ("7. กลยุทธ์ปรับเปลี่ยนชะตา",
+     "แนะนำแนวทางการใช้ชีวิต การปรับสภาพแวดล้อม (ฮวงจุ้ย) หรือการใช้วัตถุมงคล/สีมงคล "
+     "เพื่อปรับสมดุลธาตุและเสริมสร้างสิริมงคล"),
+)
+
+SUMMARY_TITLE = "ส่วนสุดท้าย: บทสรุปสำหรับท่าน (ฉบับเข้าใจง่าย)"
+SUMMARY_INSTRUCTION = (
+    "จากคำพยากรณ์ทั้งหมดข้างต้น จงสรุปใจความสำคัญในแต่ละด้าน (ภาพรวม, การงาน, ความรัก, "
+    "และคำเตือนที่สำคัญที่สุด) ให้เป็นภาษาที่คนทั่วไปเข้าใจง่ายและนำไปใช้ได้ทันที โดยแยกเป็นข้อๆ"
+)
+
+TIMEOUT_NOTICE = "⏳ ซินแสยังพิจารณาหัวข้อนี้ไม่แล้วเสร็จในเวลาที่กำหนด กรุณาลองเปิดดวงอีกครั้งภายหลัง"
+ERROR_NOTICE = "❌ ไม่สามารถพยากรณ์หัวข้อนี้ได้ในขณะนี้"
+
+
+def build_chart_context(day_name, thai_color, thai_animal, birth_time):
+    """
+    Builds the chart description shared by every section sub-prompt.
+
+    Args:
+        day_name (str): The day of the week of birth.
+        thai_color (str): The lucky color.
+        thai_animal (str): The Chinese zodiac animal.
+        birth_time (datetime.time): The user's time of birth.
+
+    Returns:
+        str: The chart block from prompts.
+    """
+    return prompts.build_chart_block(day_name, thai_color, thai_animal, birth_time)
+
+
+def build_section_messages(chart_context, title, instruction):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": (
+            f"{chart_context}\n\n"
+            f"**หัวข้อ: {title}**\n{instruction}"
+        )},
+    ]
+
+
+def build_summary_messages(chart_context, section_texts):
+    reading = "\n\n".join(section_texts)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": (
+            f"{chart_context}\n\n"
+            f"คำพยากรณ์ที่ได้ทำไว้แล้ว:\n{reading}\n\n"
+            f"**หัวข้อ: {SUMMARY_TITLE}**\n{SUMMARY_INSTRUCTION}"
+        )},
+    ]
+
+
+def openai_complete(messages, model=SECTION_MODEL, **params):
+    """Default completion function, through the process-wide pooled client."""
+    params.setdefault("timeout", DEFAULT_SECTION_TIMEOUT)
+    return ai_client.get_default_client().complete_text(messages, model, **params)
+
+
+def _cached_complete(complete, cache, flights, messages, params, on_cache_hit=None):
+    cache_key = reading_cache.make_cache_key(SECTION_MODEL, messages, **params)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            if on_cache_hit is not None:
+                on_cache_hit()
+            return cached
+    if flights is not None:
+        text = flights.do(cache_key, complete, messages, model=SECTION_MODEL, **params)
+    else:
+        text = complete(messages, model=SECTION_MODEL, **params)
+    if cache is not None:
+        cache.put(cache_key, text)
+    return text
+
+
+def generate_sectioned_fortune(day_name, thai_color, thai_animal, birth_time, complete=openai_complete,
+                               cache=None, flights=None, section_timeout=DEFAULT_SECTION_TIMEOUT, max_workers=None,
+                               on_cache_hit=None):
+    """
+    Generates the full reading by requesting every section concurrently.
+
+    A section that fails or does not finish within ``section_timeout`` seconds
+    is replaced by a short notice; the rest of the reading is still returned.
+    If no section succeeds there is no reading to return, and the first
+    section's error is raised instead.
+
+    Args:
+        day_name (str): The day of the week of birth.
+        thai_color (str): The lucky color.
+        thai_animal (str): The Chinese zodiac animal.
+        birth_time (datetime.time): The user's time of birth.
+        complete (callable): ``complete(messages, model=..., **params) -> str``.
+        cache (reading_cache.ReadingCache, optional): Per-section reading cache.
+        flights (singleflight.SingleFlight, optional): Coalesces identical section
+            calls across concurrent readings and bounds upstream concurrency.
+        section_timeout (float): Seconds each section may take, counted from submission.
+        max_workers (int, optional): Thread pool size; defaults to one per section.
+        on_cache_hit (callable, optional): Called once for every section, and
+            the summary, served from ``cache``; may be called from worker threads.
+
+    Returns:
+        str: The stitched reading, sections in order followed by the summary.
+
+    Raises:
+        Exception: The first section's error, when every section failed or timed out.
+    """
+    chart_context = build_chart_context(day_name, thai_color, thai_animal, birth_time)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or len(SECTIONS))
+    try:
+        futures = [
+            executor.submit(
+                _cached_complete, complete, cache, flights,
+                build_section_messages(chart_context, title, instruction), SECTION_PARAMS, on_cache_hit
+            )
+            for title, instruction in SECTIONS
+        ]
+        deadline = time.monotonic() + section_timeout
+
+        section_texts = []
+        completed_texts = []
+        errors = []
+        for (title, _), future in zip(SECTIONS, futures):
+            try:
+                text = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                completed_texts.append(text)
+            except concurrent.futures.TimeoutError as e:
+                errors.append(e)
+                text = f"**{title}**\n{TIMEOUT_NOTICE}"
+            except Exception as e:
+                errors.append(e)
+                text = f"**{title}**\n{ERROR_NOTICE}"
+            section_texts.append(text)
+    finally:
+        # Do not wait for sections that timed out; they finish in the background.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # A reading made only of notices must not be shown, cached or stored as done.
+    if not completed_texts:
+        raise errors[0]
+    try:
+        summary = _cached_complete(
+            complete, cache, flights, build_summary_messages(chart_context, completed_texts), SUMMARY_PARAMS,
+            on_cache_hit
+        )
+    except Exception:
+        summary = f"**{SUMMARY_TITLE}**\n{ERROR_NOTICE}"
+    section_texts.append(summary)
+
+    return "\n\n".join(section_texts)
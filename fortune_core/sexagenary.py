@@ -0,0 +1,320 @@
+# fortune_core/sexagenary.py
+# This file contains the sexagenary (干支) calendar engine behind the BaZi
+# pillars and the zodiac year. Year and month pillars change at the twelve
+# "jie" solar terms (the year at Lichun 立春), so the engine keeps a compact,
+# array-backed table of those boundaries for 1900-2100. The table is computed
+# once per process (or memory-mapped from a file written by
+# `python -m fortune_core.sexagenary build <path>`), after which every pillar lookup is
+# O(1) arithmetic plus a bisect over at most 24 boundaries.
+
+import array
+import bisect
+import datetime
+import math
+import mmap
+import os
+import sys
+import threading
+from typing import NamedTuple
+
+FIRST_YEAR = 1900
+LAST_YEAR = 2100
+# Row 0 starts at Lichun 1899 so that January 1900 is covered.
+_FIRST_ROW_YEAR = FIRST_YEAR - 1
+_ROWS = LAST_YEAR - _FIRST_ROW_YEAR + 1
+TERMS_PER_YEAR = 12
+
+# Birth times are entered in Thai local time (UTC+7).
+DEFAULT_UTC_OFFSET_MINUTES = 7 * 60
+
+# Apparent solar longitudes of the jie terms, starting at Lichun (立春).
+JIE_LONGITUDES = (315, 345, 15, 45, 75, 105, 135, 165, 195, 225, 255, 285)
+
+_UNIX_EPOCH_JD = 2440587.5
+_EPOCH = datetime.datetime(1970, 1, 1)
+# date.toordinal() offset that puts 2000-01-01 (戊午) at cycle index 54.
+_DAY_CYCLE_OFFSET = 14
+
+
+class Pillars(NamedTuple):
+    year_stem: int
+    year_branch: int
+    month_stem: int
+    month_branch: int
+    day_stem: int
+    day_branch: int
+    hour_stem: int
+    hour_branch: int
+
+
+# Earth's heliocentric longitude as VSOP87 series, abridged as in Meeus,
+# Astronomical Algorithms, appendix III: per power of time, (amplitude in
+# 1e-8 radians, phase, frequency in radians per Julian millennium).
+_EARTH_L = (
+    (
+        (175347046, 0, 0), (3341656, 4.6692568, 6283.0758500), (34894, 4.62610, 12566.15170),
+        (3497, 2.7441, 5753.3849), (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715),
+        (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097), (1324, 0.7425, 11506.7698),
+        (1273, 2.0371, 529.6910), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+        (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694),
+        (753, 2.533, 5507.553), (505, 4.583, 18849.228), (492, 4.205, 775.523),
+        (357, 2.920, 0.067), (317, 5.849, 11790.629), (284, 1.899, 796.298),
+        (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+        (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299),
+        (132, 3.411, 2942.463), (126, 1.083, 20.775), (115, 0.645, 0.980),
+        (103, 0.636, 4694.003), (102, 0.976, 15720.839), (102, 4.267, 7.114),
+        (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+        (85, 1.30, 6275.96), (85, 3.67, 71430.70), (80, 1.81, 17260.15),
+        (79, 3.04, 12036.46), (75, 1.76, 5088.63), (74, 3.50, 3154.69),
+        (74, 4.68, 801.82), (70, 0.83, 9437.76), (62, 3.98, 8827.39),
+        (61, 1.82, 7084.90), (57, 2.78, 6286.60), (56, 4.39, 14143.50),
+        (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02),
+        (51, 0.28, 5856.48), (49, 0.49, 1194.45), (41, 5.37, 8429.24),
+        (41, 2.40, 19651.05), (39, 6.17, 10447.39), (37, 6.04, 10213.29),
+        (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+        (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87),
+        (25, 3.16, 4690.48),
+    ),
+    (
+        (628331966747, 0, 0), (206059, 2.678235, 6283.075850), (4303, 2.6351, 12566.1517),
+        (425, 1.590, 3.523), (119, 5.796, 26.298), (109, 2.966, 1577.344),
+        (93, 2.59, 18849.23), (72, 1.14, 529.69), (68, 1.87, 398.15),
+        (67, 4.41, 5507.55), (59, 2.89, 5223.69), (56, 2.17, 155.42),
+        (45, 0.40, 796.30), (36, 0.47, 775.52), (29, 2.65, 7.11),
+        (21, 5.34, 0.98), (19, 1.85, 5486.78), (19, 4.97, 213.30),
+        (17, 2.99, 6275.96), (16, 0.03, 2544.31), (16, 1.43, 2146.17),
+        (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+        (12, 5.27, 1194.45), (12, 2.08, 4694.00), (11, 0.77, 553.57),
+        (10, 1.30, 6286.60), (10, 4.24, 1349.87), (9, 2.70, 242.73),
+        (9, 5.64, 951.72), (8, 5.30, 2352.87), (6, 2.65, 9437.76),
+        (6, 4.67, 4690.48),
+    ),
+    (
+        (52919, 0, 0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152),
+        (27, 0.05, 3.52), (16, 5.19, 26.30), (16, 3.68, 155.42),
+        (10, 0.76, 18849.23), (9, 2.06, 77713.77), (7, 0.83, 775.52),
+        (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14),
+        (3, 5.14, 796.30), (3, 6.05, 5507.55), (3, 1.19, 242.73),
+        (3, 6.12, 529.69), (3, 0.31, 398.15), (3, 2.28, 553.57),
+        (2, 4.38, 5223.69), (2, 3.75, 0.98),
+    ),
+    (
+        (289, 5.844, 6283.076), (35, 0, 0), (17, 5.49, 12566.15),
+        (3, 5.20, 155.42), (1, 4.72, 3.52), (1, 5.30, 18849.23),
+        (1, 5.97, 242.73),
+    ),
+    ((114, 3.142, 0), (8, 4.13, 6283.08), (1, 3.84, 12566.15)),
+    ((1, 3.14, 0),),
+)
+# The largest terms of Earth's distance from the Sun, enough for the aberration.
+_EARTH_R = (
+    ((100013989, 0, 0), (1670700, 3.0984635, 6283.0758500), (13956, 3.05525, 12566.15170)),
+    ((103019, 1.107490, 6283.075850),),
+)
+
+
+def _vsop87(series, tau):
+    return sum(
+        sum(a * math.cos(b + c * tau) for a, b, c in terms) * tau ** power
+        for power, terms in enumerate(series)
+    ) / 1e8
+
+
+def _sun_apparent_longitude_vsop87(jd):
+    # Meeus, ch. 25 ("higher accuracy"): good to about a second of arc, i.e.
+    # well under a minute in term time.
+    tau = (jd - 2451545.0) / 365250.0
+    t = tau * 10
+    geometric = math.degrees(_vsop87(_EARTH_L, tau)) + 180.0
+    # Principal terms of the nutation in longitude (ch. 22), in arcseconds.
+    omega = math.radians(125.04452 - 1934.136261 * t)
+    sun_mean = math.radians(280.4665 + 36000.7698 * t)
+    moon_mean = math.radians(218.3165 + 481267.8813 * t)
+    nutation = (-17.20 * math.sin(omega) - 1.32 * math.sin(2 * sun_mean)
+                - 0.23 * math.sin(2 * moon_mean) + 0.21 * math.sin(2 * omega))
+    # FK5 frame correction, nutation and annual aberration.
+    correction = -0.09033 + nutation - 20.4898 / _vsop87(_EARTH_R, tau)
+    return (geometric + correction / 3600.0) % 360.0
+
+
+def _sun_apparent_longitude(jd):
+    # Low-precision solar position (Meeus, Astronomical Algorithms, ch. 25),
+    # good to about 0.01 degrees, i.e. a quarter of an hour in term time; it
+    # only brings the search close enough for the VSOP87 position to finish.
+    t = (jd - 2451545.0) / 36525.0
+    l0 = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    m = math.radians(357.52911 + 35999.05029 * t - 0.0001537 * t * t)
+    c = ((1.914602 - 0.004817 * t - 0.000014 * t * t) * math.sin(m)
+         + (0.019993 - 0.000101 * t) * math.sin(2 * m)
+         + 0.000289 * math.sin(3 * m))
+    omega = math.radians(125.04 - 1934.136 * t)
+    return (l0 + c - 0.00569 - 0.00478 * math.sin(omega)) % 360.0
+
+
+# TT - UT in seconds: Espenak and Meeus's polynomials, as (first year, epoch,
+# coefficients), for the years the table covers up to 2050.
+_DELTA_T_POLYNOMIALS = (
+    (1986, 2000, (63.86, 0.3345, -0.060374, 0.0017275, 0.000651814, 0.00002373599)),
+    (1961, 1975, (45.45, 1.067, -1 / 260, -1 / 718)),
+    (1941, 1950, (29.07, 0.407, -1 / 233, 1 / 2547)),
+    (1920, 1920, (21.20, 0.84493, -0.076100, 0.0020936)),
+    (-math.inf, 1900, (-2.79, 1.494119, -0.0598939, 0.0061966, -0.000197)),
+)
+
+
+def _delta_t_days(year):
+    if year >= 2050:
+        u = (year - 1820) / 100.0
+        return (-20.0 + 32.0 * u * u - 0.5628 * (2150 - year)) / 86400.0
+    if year >= 2005:
+        t = year - 2000
+        return (62.92 + 0.32217 * t + 0.005589 * t * t) / 86400.0
+    for first_year, epoch, coefficients in _DELTA_T_POLYNOMIALS:
+        if year >= first_year:
+            t = year - epoch
+            return sum(c * t ** power for power, c in enumerate(coefficients)) / 86400.0
+
+
+def _solar_term_minutes(year, term_index):
+    """Returns the UTC moment of one jie term as minutes since the Unix epoch."""
+    longitude = JIE_LONGITUDES[term_index]
+    guess = datetime.datetime(year, 2, 4) + datetime.timedelta(days=30.4369 * term_index)
+    jd = _UNIX_EPOCH_JD + (guess - _EPOCH).total_seconds() / 86400.0
+    for _ in range(6):
+        jd += ((longitude - _sun_apparent_longitude(jd) + 180.0) % 360.0 - 180.0) / 0.98564736
+    for _ in range(2):
+        jd += ((longitude - _sun_apparent_longitude_vsop87(jd) + 180.0) % 360.0 - 180.0) / 0.98564736
+    jd_ut = jd - _delta_t_days(year)
+    return round((jd_ut - _UNIX_EPOCH_JD) * 1440)
+
+
+def build_table():
+    """
+    Computes the jie boundaries for every supported solar year.
+
+    Returns:
+        array.array: int64 UTC minutes since the Unix epoch, row-major with
+        12 terms per solar year starting at Lichun 1899; strictly increasing.
+    """
+    return array.array("q", (
+        _solar_term_minutes(year, term)
+        for year in range(_FIRST_ROW_YEAR, LAST_YEAR + 1)
+        for term in range(TERMS_PER_YEAR)
+    ))
+
+
+def save_table(path, table=None):
+    """Writes the table as raw native int64s, ready for load_table to memory-map."""
+    table = table if table is not None else build_table()
+    with open(path, "wb") as f:
+        table.tofile(f)
+
+
+def load_table(path):
+    """Memory-maps a table written by save_table; returns an int64 memoryview."""
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    table = memoryview(mapped).cast("q")
+    if len(table) != _ROWS * TERMS_PER_YEAR:
+        raise ValueError(f"{path} does not hold a {FIRST_YEAR}-{LAST_YEAR} solar term table")
+    return table
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_table():
+    """
+    Returns the process-wide jie table.
+
+    It is memory-mapped from FORTUNE_SOLAR_TERMS_PATH when that file exists,
+    otherwise computed once in-process.
+    """
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                path = os.environ.get("FORTUNE_SOLAR_TERMS_PATH")
+                _table = load_table(path) if path and os.path.exists(path) else build_table()
+    return _table
+
+
+def _to_datetime(birth_date, birth_time=None):
+    if isinstance(birth_date, datetime.datetime):
+        return birth_date.replace(tzinfo=None)
+    birth_time = birth_time if birth_time is not None else datetime.time(12, 0)
+    return datetime.datetime.combine(birth_date, birth_time).replace(tzinfo=None)
+
+
+def solar_month(birth_date, birth_time=None, utc_offset_minutes=DEFAULT_UTC_OFFSET_MINUTES):
+    """
+    Finds the solar year and month a local birth moment falls in.
+
+    Args:
+        birth_date (datetime.date | datetime.datetime): Local date of birth.
+        birth_time (datetime.time, optional): Local time of birth; noon if omitted.
+        utc_offset_minutes (int): Offset of the local clock from UTC.
+
+    Returns:
+        tuple: ``(solar_year, month_index)`` where month 0 starts at Lichun (寅月).
+    """
+    moment = _to_datetime(birth_date, birth_time)
+    if not FIRST_YEAR <= moment.year <= LAST_YEAR:
+        raise ValueError(f"dates must fall between {FIRST_YEAR} and {LAST_YEAR}")
+    minutes = int((moment - _EPOCH).total_seconds() // 60) - utc_offset_minutes
+    table = get_table()
+    lo = (moment.year - 1 - _FIRST_ROW_YEAR) * TERMS_PER_YEAR
+    index = bisect.bisect_right(table, minutes, lo, min(lo + 2 * TERMS_PER_YEAR, len(table))) - 1
+    return _FIRST_ROW_YEAR + index // TERMS_PER_YEAR, index % TERMS_PER_YEAR
+
+
+def zodiac_index(birth_date, birth_time=None, utc_offset_minutes=DEFAULT_UTC_OFFSET_MINUTES):
+    """Returns the zodiac (year branch) index, Rat = 0, with the year starting at Lichun."""
+    solar_year, _ = solar_month(birth_date, birth_time, utc_offset_minutes)
+    return (solar_year - 4) % 12
+
+
+def day_cycle_index(day):
+    """Returns the 0-59 sexagenary index of a civil date (甲子 = 0)."""
+    return (day.toordinal() + _DAY_CYCLE_OFFSET) % 60
+
+
+def pillars(birth_date, birth_time=None, utc_offset_minutes=DEFAULT_UTC_OFFSET_MINUTES):
+    """
+    Computes the four pillars as stem/branch indices.
+
+    The day changes at 23:00, the start of the 子 hour.
+
+    Args:
+        birth_date (datetime.date | datetime.datetime): Local date of birth.
+        birth_time (datetime.time, optional): Local time of birth; noon if omitted.
+        utc_offset_minutes (int): Offset of the local clock from UTC.
+
+    Returns:
+        Pillars: Stem indices into HEAVENLY_STEMS, branch indices into EARTHLY_BRANCHES.
+    """
+    moment = _to_datetime(birth_date, birth_time)
+    solar_year, month = solar_month(moment, utc_offset_minutes=utc_offset_minutes)
+
+    year_cycle = (solar_year - 4) % 60
+    year_stem = year_cycle % 10
+    month_stem = (year_stem * 2 + 2 + month) % 10
+
+    day = moment.date() + datetime.timedelta(days=1) if moment.hour == 23 else moment.date()
+    day_cycle = day_cycle_index(day)
+    day_stem = day_cycle % 10
+    hour_branch = ((moment.hour + 1) // 2) % 12
+
+    return Pillars(
+        year_stem, year_cycle % 12,
+        month_stem, (month + 2) % 12,
+        day_stem, day_cycle % 12,
+        (day_stem % 5 * 2 + hour_branch) % 10, hour_branch,
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "build":
+        sys.exit("usage: python -m fortune_core.sexagenary build <path>")
+    save_table(sys.argv[2])
@@ -0,0 +1,133 @@
+# fortune_core/singleflight.py
+# This file contains a process-wide single-flight layer for upstream AI calls.
+# Concurrent requests for the same prompt key share one in-flight call, and a
+# FIFO gate caps how many distinct calls run upstream at once, so a burst of
+# identical readings costs one model call instead of one per session.
+
+import collections
+import concurrent.futures
+import contextlib
+import os
+import threading
+
+DEFAULT_MAX_CONCURRENT = 8
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls and bounds total upstream concurrency.
+
+    The leader for a key runs the call inside ``slot()``; followers that
+    ``join()`` the same key while it is in flight wait on the leader's future.
+    Waiting leaders are admitted in arrival order, so no call is overtaken by
+    later ones while it waits for a slot.
+    """
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT):
+        self.max_concurrent = max_concurrent
+        self._cond = threading.Condition()
+        self._inflight = {}
+        self._queue = collections.deque()
+        self._active = 0
+        self._coalesced = 0
+
+    def join(self, key):
+        """
+        Registers interest in a call.
+
+        Args:
+            key (str): The prompt key, e.g. from reading_cache.make_cache_key.
+
+        Returns:
+            tuple: ``(future, is_leader)``. The leader must eventually call
+            ``resolve(key, ...)``; followers just wait on ``future``.
+        """
+        with self._cond:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future, False
+            future = concurrent.futures.Future()
+            self._inflight[key] = future
+            return future, True
+
+    def resolve(self, key, result=None, error=None):
+        """Completes the in-flight call for ``key`` and releases its followers."""
+        with self._cond:
+            future = self._inflight.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    @contextlib.contextmanager
+    def slot(self, key):
+        """
+        Holds one of the ``max_concurrent`` upstream slots for the duration.
+
+        Args:
+            key (str): The prompt key queuing for a slot.
+        """
+        with self._cond:
+            self._queue.append(key)
+            try:
+                while self._queue[0] != key or self._active >= self.max_concurrent:
+                    self._cond.wait()
+            except BaseException:
+                self._queue.remove(key)
+                self._cond.notify_all()
+                raise
+            self._queue.popleft()
+            self._active += 1
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs ``fn(*args, **kwargs)`` once per concurrent group of callers for ``key``.
+
+        Returns:
+            The leader's result, shared by every caller; exceptions are shared too.
+        """
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+        try:
+            with self.slot(key):
+                result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.resolve(key, error=e)
+            raise
+        self.resolve(key, result=result)
+        return result
+
+    def stats(self):
+        with self._cond:
+            return {
+                "in_flight": len(self._inflight),
+                "active": self._active,
+                "queued": len(self._queue),
+                "coalesced": self._coalesced,
+            }
+
+
+_default_flights = None
+_default_flights_lock = threading.Lock()
+
+
+def get_default_flights():
+    """Returns the process-wide instance, sized by FORTUNE_MAX_UPSTREAM_CALLS."""
+    global _default_flights
+    with _default_flights_lock:
+        if _default_flights is None:
+            _default_flights = SingleFlight(
+                int(os.environ.get("FORTUNE_MAX_UPSTREAM_CALLS", DEFAULT_MAX_CONCURRENT))
+            )
+        return _default_flights
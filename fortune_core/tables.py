@@ -0,0 +1,56 @@
+# fortune_core/tables.py
+# This file contains the precomputed, immutable lookup tables shared by the
+# scalar chart functions and their vectorized counterparts. Everything here is
+# built once at import time; functions index into these tables rather than
+# rebuilding lists and dicts on every call.
+
+from types import MappingProxyType
+
+# Weekday tables are indexed like datetime.date.weekday(): Monday is 0.
+WEEKDAYS_EN = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+WEEKDAYS_TH = ("จันทร์", "อังคาร", "พุธ", "พฤหัสบดี", "ศุกร์", "เสาร์", "อาทิตย์")
+DAY_COLORS_EN = ("Yellow", "Pink", "Green", "Orange", "Blue", "Purple", "Red")
+DAY_COLORS_TH = ("เหลือง", "ชมพู", "เขียว", "ส้ม", "น้ำเงิน", "ม่วง", "แดง")
+
+# Zodiac tables are indexed by earthly branch: Rat is 0.
+ZODIAC_EN = ("Rat", "Ox", "Tiger", "Rabbit", "Dragon", "Snake", "Horse", "Goat", "Monkey", "Rooster", "Dog", "Pig")
+ZODIAC_TH = (
+    "ชวด (หนู)", "ฉลู (วัว)", "ขาล (เสือ)", "เถาะ (กระต่าย)", "มะโรง (มังกร)", "มะเส็ง (งูเล็ก)",
+    "มะเมีย (ม้า)", "มะแม (แพะ)", "วอก (ลิง)", "ระกา (ไก่)", "จอ (สุนัข)", "กุน (หมู)"
+)
+ZODIAC_TH_SHORT = ("หนู", "วัว", "เสือ", "กระต่าย", "มังกร", "งู", "ม้า", "แพะ", "ลิง", "ไก่", "หมา", "หมู")
+
+HEAVENLY_STEMS = ("甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸")
+EARTHLY_BRANCHES = ("子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥")
+
+# Element index of each stem (yang/yin pairs share an element) and each branch.
+STEM_ELEMENTS = (0, 0, 1, 1, 2, 2, 3, 3, 4, 4)
+BRANCH_ELEMENTS = (4, 2, 0, 0, 2, 1, 1, 2, 3, 3, 2, 4)
+
+# Branch relations, indexed by branch. Six-harmony partners are 子丑, 寅亥, 卯戌,
+# 辰酉, 巳申 and 午未; the clashing branch is six positions away; branches four
+# apart share a three-harmony group (申子辰, 亥卯未, 寅午戌, 巳酉丑).
+SIX_HARMONY = tuple((13 - branch) % 12 for branch in range(12))
+CLASH = tuple((branch + 6) % 12 for branch in range(12))
+THREE_HARMONY_GROUP = tuple(branch % 4 for branch in range(12))
+
+# Element relations, indexed by element: the element each one generates, and
+# the one it controls.
+GENERATES = tuple((element + 1) % 5 for element in range(5))
+CONTROLS = tuple((element + 2) % 5 for element in range(5))
+
+# Thai กาลกิณี: the unlucky weekday for each birth weekday (Monday is 0).
+KALAKINI_WEEKDAYS = (6, 0, 1, 5, 3, 2, 4)
+
+# Element tables are indexed in generating-cycle order: wood, fire, earth, metal, water.
+ELEMENT_KEYS = ("木", "火", "土", "金", "水")
+ELEMENTS = tuple(
+    MappingProxyType({"chinese": chinese, "thai": thai, "emoji": emoji, "color": color})
+    for chinese, thai, emoji, color in (
+        ("木", "ไม้", "🌳", "#22c55e"),
+        ("火", "ไฟ", "🔥", "#ef4444"),
+        ("土", "ดิน", "🏔️", "#a3a3a3"),
+        ("金", "โลหะ", "⚡", "#fbbf24"),
+        ("水", "น้ำ", "💧", "#3b82f6"),
+    )
+)
@@ -0,0 +1,160 @@
+# fortune_core/vectorized.py
+# This file contains array-in/array-out versions of the chart functions in
+# chart.py. They take NumPy datetime64 arrays (or pandas datetime columns) of
+# birth dates and times and return compact integer codes in one vectorized
+# pass, decoded through the same tables in tables.py.
+
+import datetime
+
+import numpy as np
+
+from fortune_core import sexagenary, tables
+
+# NumPy views of the shared tables, for decoding integer codes with np.take.
+WEEKDAYS_EN = np.array(tables.WEEKDAYS_EN)
+WEEKDAYS_TH = np.array(tables.WEEKDAYS_TH)
+DAY_COLORS_EN = np.array(tables.DAY_COLORS_EN)
+DAY_COLORS_TH = np.array(tables.DAY_COLORS_TH)
+ZODIAC_EN = np.array(tables.ZODIAC_EN)
+ZODIAC_TH = np.array(tables.ZODIAC_TH)
+HEAVENLY_STEMS = np.array(tables.HEAVENLY_STEMS)
+EARTHLY_BRANCHES = np.array(tables.EARTHLY_BRANCHES)
+ELEMENT_KEYS = np.array(tables.ELEMENT_KEYS)
+
+STEM_ELEMENTS = np.array(tables.STEM_ELEMENTS, dtype=np.int8)
+
+# 1970-01-01 was a Thursday, i.e. weekday() == 3.
+_EPOCH_WEEKDAY = 3
+# sexagenary.day_cycle_index of 1970-01-01.
+_EPOCH_DAY_CYCLE = sexagenary.day_cycle_index(datetime.date(1970, 1, 1))
+# Local-minute bounds of the range the jie table covers.
+_FIRST_MINUTE = np.datetime64(f"{sexagenary.FIRST_YEAR}-01-01", "m").astype(np.int64)
+_END_MINUTE = np.datetime64(f"{sexagenary.LAST_YEAR + 1}-01-01", "m").astype(np.int64)
+
+
+def _as_datetime64(values):
+    values = np.asarray(values)
+    if not np.issubdtype(values.dtype, np.datetime64):
+        values = values.astype("datetime64[ns]")
+    return values
+
+
+def _local_minutes(births, hours=None):
+    # Bare dates are taken as noon, as chart.compute_chart does; every function
+    # here goes through this one place, so they all agree on it.
+    births = _as_datetime64(births)
+    if hours is None and births.dtype == np.dtype("datetime64[D]"):
+        hours = np.full(births.shape, 12)
+    if hours is None:
+        return births.astype("datetime64[m]").astype(np.int64)
+    days = births.astype("datetime64[D]").astype(np.int64)
+    return days * 1440 + np.asarray(hours, dtype=np.int64) * 60
+
+
+def solar_months(births, hours=None, utc_offset_minutes=sexagenary.DEFAULT_UTC_OFFSET_MINUTES):
+    """
+    Vectorized sexagenary.solar_month over the shared jie table.
+
+    Returns:
+        tuple: ``(solar_year, month_index)`` int arrays.
+    """
+    minutes = _local_minutes(births, hours)
+    if np.any(minutes < _FIRST_MINUTE) or np.any(minutes >= _END_MINUTE):
+        raise ValueError(f"dates must fall between {sexagenary.FIRST_YEAR} and {sexagenary.LAST_YEAR}")
+    table = np.frombuffer(sexagenary.get_table(), dtype=np.int64)
+    index = np.searchsorted(table, minutes - utc_offset_minutes, side="right") - 1
+    return sexagenary.FIRST_YEAR - 1 + index // sexagenary.TERMS_PER_YEAR, index % sexagenary.TERMS_PER_YEAR
+
+
+def weekday_codes(births):
+    """
+    Computes weekday codes, Monday = 0, like datetime.date.weekday().
+
+    Args:
+        births (array-like): datetime64 dates or timestamps.
+
+    Returns:
+        numpy.ndarray: int8 codes; they also index the DAY_COLORS tables.
+    """
+    days = _as_datetime64(births).astype("datetime64[D]").astype(np.int64)
+    return ((days + _EPOCH_WEEKDAY) % 7).astype(np.int8)
+
+
+def zodiac_indices(births, hours=None):
+    """
+    Computes zodiac indices (Rat = 0), matching fortune.get_chinese_fortune_details
+    for dates: the zodiac year starts at Lichun.
+
+    Args:
+        births (array-like): datetime64 dates or timestamps.
+        hours (array-like, optional): Birth hours; noon is assumed for bare dates.
+
+    Returns:
+        numpy.ndarray: int8 indices into the ZODIAC tables.
+    """
+    solar_year, _ = solar_months(births, hours)
+    return ((solar_year - 4) % 12).astype(np.int8)
+
+
+def day_cycle_indices(days):
+    """Vectorized sexagenary.day_cycle_index over datetime64 dates."""
+    days = _as_datetime64(days).astype("datetime64[D]").astype(np.int64)
+    return (days + _EPOCH_DAY_CYCLE) % 60
+
+
+def bazi_codes(births, hours=None):
+    """
+    Computes integer-coded BaZi pillars, matching fortune.get_bazi_elements.
+
+    Args:
+        births (array-like): datetime64 dates or timestamps of birth (Thai local time).
+        hours (array-like, optional): Birth hours 0-23. When omitted they are
+            taken from the time-of-day part of ``births``; noon is assumed for
+            bare ``datetime64[D]`` dates.
+
+    Returns:
+        dict: int8 arrays ``year_stem``, ``year_branch``, ``month_stem``,
+        ``month_branch``, ``day_stem``, ``day_branch``, ``hour_stem``,
+        ``hour_branch`` and ``dominant_element`` (an index into ELEMENTS).
+    """
+    minutes = _local_minutes(births, hours)
+    solar_year, month = solar_months(births, hours)
+    day = minutes // 1440
+    hour = minutes % 1440 // 60
+
+    year_cycle = (solar_year - 4) % 60
+    year_stem = year_cycle % 10
+    # The day changes at 23:00, the start of the 子 hour.
+    day_cycle = (day + (hour == 23) + _EPOCH_DAY_CYCLE) % 60
+    day_stem = day_cycle % 10
+    hour_branch = (hour + 1) // 2 % 12
+
+    return {
+        "year_stem": year_stem.astype(np.int8),
+        "year_branch": (year_cycle % 12).astype(np.int8),
+        "month_stem": ((year_stem * 2 + 2 + month) % 10).astype(np.int8),
+        "month_branch": ((month + 2) % 12).astype(np.int8),
+        "day_stem": day_stem.astype(np.int8),
+        "day_branch": (day_cycle % 12).astype(np.int8),
+        "hour_stem": ((day_stem % 5 * 2 + hour_branch) % 10).astype(np.int8),
+        "hour_branch": hour_branch.astype(np.int8),
+        "dominant_element": np.take(STEM_ELEMENTS, day_stem),
+    }
+
+
+def decode_pillars(codes):
+    """
+    Turns the integer codes from bazi_codes into pillar strings such as "甲子".
+
+    Returns:
+        dict: ``year_pillar``, ``month_pillar``, ``day_pillar`` and ``hour_pillar``
+        string arrays, plus ``dominant_element`` as Chinese element characters.
+    """
+    pillars = {}
+    for pillar in ("year", "month", "day", "hour"):
+        pillars[f"{pillar}_pillar"] = np.char.add(
+            np.take(HEAVENLY_STEMS, codes[f"{pillar}_stem"]),
+            np.take(EARTHLY_BRANCHES, codes[f"{pillar}_branch"])
+        )
+    pillars["dominant_element"] = np.take(ELEMENT_KEYS, codes["dominant_element"])
+    return pillars
@@ -0,0 +1,63 @@
+# pages/admin_metrics.py
+# Admin page for the reading metrics: per-stage p50/p95/p99 latencies, token
+# and cost totals, error classes and the most recent traces. The page is only
+# available when FORTUNE_ADMIN_TOKEN is set, and asks for that token.
+
+import hmac
+import os
+
+import streamlit as st
+
+from fortune_core import metrics
+
+st.set_page_config(page_title="Fortune metrics", page_icon="📈", layout="wide")
+
+admin_token = os.environ.get("FORTUNE_ADMIN_TOKEN")
+if not admin_token:
+    st.info("The metrics page is disabled. Set FORTUNE_ADMIN_TOKEN to enable it.")
+    st.stop()
+
+entered = st.text_input("Admin token", type="password")
+if not hmac.compare_digest(entered.encode("utf-8"), admin_token.encode("utf-8")):
+    st.stop()
+
+recorder = metrics.get_default_recorder()
+summary = recorder.summary()
+counters = summary["counters"]
+readings = counters.get("readings", 0)
+
+st.title("📈 Reading metrics")
+st.caption(f"Percentiles over the last {summary['buffered']} readings; totals since the server started.")
+
+col_readings, col_hits, col_tokens, col_cost = st.columns(4)
+col_readings.metric("Readings", readings)
+col_hits.metric("Cache hit ratio", f"{counters.get('cache_hits', 0) / readings:.1%}" if readings else "–")
+col_tokens.metric(
+    "Tokens (prompt / completion)",
+    f"{counters.get('prompt_tokens', 0):,} / {counters.get('completion_tokens', 0):,}"
+)
+col_cost.metric("Estimated cost", f"${counters.get('cost_usd', 0.0):,.2f}")
+
+st.subheader("Stage latency (seconds)")
+st.table([
+    {"stage": name, **{key: "–" if value is None else f"{value:.3f}" for key, value in stats.items() if key != "count"},
+     "count": stats["count"]}
+    for name, stats in summary["stages"].items()
+])
+
+st.subheader("Errors")
+if summary["errors"]:
+    st.table([{"error class": name, "count": count} for name, count in sorted(summary["errors"].items())])
+else:
+    st.write("No failed readings.")
+
+st.subheader("Recent readings")
+st.dataframe(list(reversed(recorder.traces()[-50:])), use_container_width=True)
+
+col_prometheus, col_jsonl = st.columns(2)
+col_prometheus.download_button(
+    "Download Prometheus text", recorder.to_prometheus(), file_name="fortune_metrics.prom", mime="text/plain"
+)
+col_jsonl.download_button(
+    "Download JSONL", recorder.to_jsonl(), file_name="fortune_traces.jsonl", mime="application/jsonl"
+)
@@ -0,0 +1,238 @@
+# prewarm.py
+# This file contains the cache pre-warming job. It ranks birth-input
+# combinations by demand in the metrics request log, always adding the app's
+# default inputs (1990-01-01, 12:00), and generates readings for the hottest
+# ones ahead of time, under a token budget and optionally only inside an
+# off-peak window. Readings are written to the reading cache under the same
+# keys the app uses, so the hot set never reaches the model at request time.
+#
+# Usage:
+#   FORTUNE_METRICS_LOG=requests.jsonl python prewarm.py --top 200 --token-budget 500000 --window 01:00-06:00 --wait
+
+import argparse
+import collections
+import datetime
+import json
+import os
+import sys
+import time
+
+import fortune
+from fortune_core import ai_client, metrics, prompts, reading_cache, sectioned
+from fortune_core.chart import compute_chart
+
+DEFAULT_TOP_N = 100
+DEFAULT_TOKEN_BUDGET = 200000
+DEFAULT_EXPECTED_COMPLETION_TOKENS = 1500
+# The inputs the app's date and time pickers start with.
+DEFAULT_BIRTH_DATE = datetime.date(1990, 1, 1)
+DEFAULT_BIRTH_TIME = datetime.time(12, 0)
+
+# Which prompt each traced engine used; the app's stream engine sends the
+# enhanced prompt, fortune.py and the batch job the classic one.
+ENGINE_KINDS = {"stream": "enhanced", "sectioned": "sectioned", "classic": "classic", "batch": "classic"}
+
+
+def app_inputs(birth_date, birth_time):
+    """Returns (day_name, thai_color, thai_animal) as the Streamlit app derives them."""
+    chart = compute_chart(birth_date, birth_time)
+    return chart.day_name_th, chart.color_th, chart.zodiac_th_short
+
+
+def load_demand(log_path):
+    """
+    Counts how often each input combination was asked for.
+
+    Args:
+        log_path (str): A JSONL trace log written by metrics.MetricsRecorder.
+
+    Returns:
+        collections.Counter: Keyed by ``(kind, day_name, thai_color, thai_animal, "HH:MM")``.
+    """
+    demand = collections.Counter()
+    if not log_path or not os.path.exists(log_path):
+        return demand
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            inputs = entry.get("inputs")
+            kind = ENGINE_KINDS.get(entry.get("engine"))
+            if not inputs or kind is None:
+                continue
+            demand[(kind, inputs["day_name"], inputs["thai_color"], inputs["thai_animal"], inputs["birth_time"])] += 1
+    return demand
+
+
+def select_combos(demand, kinds, top_n):
+    """
+    Picks the combinations to warm: the app defaults first, then the most
+    requested ones, up to ``top_n`` in total.
+    """
+    day_name, thai_color, thai_animal = app_inputs(DEFAULT_BIRTH_DATE, DEFAULT_BIRTH_TIME)
+    combos = [
+        (kind, day_name, thai_color, thai_animal, DEFAULT_BIRTH_TIME.strftime("%H:%M"))
+        for kind in sorted(kinds) if kind != "classic"
+    ]
+    for combo, _ in demand.most_common():
+        if len(combos) >= top_n:
+            break
+        if combo[0] in kinds and combo not in combos:
+            combos.append(combo)
+    return combos[:top_n]
+
+
+def parse_window(window):
+    """Parses "HH:MM-HH:MM" into a pair of datetime.time; the window may wrap midnight."""
+    start, end = window.split("-")
+    return (
+        datetime.datetime.strptime(start.strip(), "%H:%M").time(),
+        datetime.datetime.strptime(end.strip(), "%H:%M").time(),
+    )
+
+
+def in_window(now, window):
+    start, end = window
+    if start <= end:
+        return start <= now < end
+    return now >= start or now < end
+
+
+def seconds_until(start, now):
+    today = datetime.datetime.combine(now.date(), start)
+    if today <= now:
+        today += datetime.timedelta(days=1)
+    return (today - now).total_seconds()
+
+
+class Prewarmer:
+    """Generates and caches readings one at a time until the token budget runs out."""
+
+    def __init__(self, api_key, cache, client=None, token_budget=DEFAULT_TOKEN_BUDGET,
+                 expected_completion_tokens=DEFAULT_EXPECTED_COMPLETION_TOKENS):
+        self.api_key = api_key
+        self.cache = cache
+        self.client = client if client is not None else ai_client.get_default_client()
+        self.token_budget = token_budget
+        self.expected_completion_tokens = expected_completion_tokens
+        self.tokens_spent = 0
+        self.outcomes = collections.Counter()
+
+    def _affordable(self, estimate):
+        return self.tokens_spent + estimate <= self.token_budget
+
+    def _warm_single(self, kind, day_name, thai_color, thai_animal, birth_time):
+        # Must match the messages, model and parameters of the code that reads
+        # these entries back, or the keys will differ.
+        if kind == "classic":
+            messages = fortune.build_fortune_messages(day_name, thai_color, thai_animal, birth_time)
+            model, params = fortune.FORTUNE_MODEL, {}
+        else:
+            messages = prompts.build_messages("enhanced", day_name, thai_color, thai_animal, birth_time)
+            model, params = prompts.ENHANCED_MODEL, prompts.ENHANCED_PARAMS
+        cache_key = reading_cache.make_cache_key(model, messages, **params)
+        if self.cache.get(cache_key) is not None:
+            return "cached"
+        if not self._affordable(prompts.count_message_tokens(messages) + self.expected_completion_tokens):
+            return "over_budget"
+        response = self.client.complete(messages, model, api_key=self.api_key, **params)
+        usage = response.get("usage") or {}
+        self.tokens_spent += usage.get("total_tokens", 0)
+        self.cache.put(cache_key, response.choices[0].message.content)
+        return "warmed"
+
+    def _warm_sectioned(self, day_name, thai_color, thai_animal, birth_time):
+        chart_context = sectioned.build_chart_context(day_name, thai_color, thai_animal, birth_time)
+        section_prompt = prompts.count_message_tokens(
+            sectioned.build_section_messages(chart_context, *sectioned.SECTIONS[0])
+        )
+        estimate = (len(sectioned.SECTIONS) + 1) * (
+            section_prompt + sectioned.SECTION_PARAMS["max_tokens"]
+        )
+        if not self._affordable(estimate):
+            return "over_budget"
+        trace = metrics.ReadingTrace("prewarm")
+
+        def complete(messages, model, **params):
+            response = self.client.complete(
+                messages, model, api_key=self.api_key, timeout=sectioned.DEFAULT_SECTION_TIMEOUT, **params
+            )
+            trace.add_response_usage(model, response)
+            return response.choices[0].message.content
+
+        # Sections already in the cache are served from it; only the rest are generated.
+        cache_hits = []
+        sectioned.generate_sectioned_fortune(
+            day_name, thai_color, thai_animal, birth_time, complete=complete, cache=self.cache,
+            on_cache_hit=lambda: cache_hits.append(True)
+        )
+        self.tokens_spent += trace.prompt_tokens + trace.completion_tokens
+        return "cached" if len(cache_hits) == len(sectioned.SECTIONS) + 1 else "warmed"
+
+    def warm(self, kind, day_name, thai_color, thai_animal, birth_time):
+        """
+        Makes sure one reading is in the cache.
+
+        Returns:
+            str: "cached", "warmed", "over_budget" or "failed".
+        """
+        birth_time = datetime.datetime.strptime(birth_time, "%H:%M").time()
+        try:
+            if kind == "sectioned":
+                outcome = self._warm_sectioned(day_name, thai_color, thai_animal, birth_time)
+            else:
+                outcome = self._warm_single(kind, day_name, thai_color, thai_animal, birth_time)
+        except Exception as e:
+            print(f"{kind} {day_name} {thai_animal} {birth_time:%H:%M}: {type(e).__name__}: {e}", file=sys.stderr)
+            outcome = "failed"
+        self.outcomes[outcome] += 1
+        return outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate readings for the most requested birth inputs.")
+    parser.add_argument("--log", default=os.environ.get("FORTUNE_METRICS_LOG"),
+                        help="JSONL trace log to rank inputs from (default: FORTUNE_METRICS_LOG)")
+    parser.add_argument("--engine", action="append", choices=sorted(ENGINE_KINDS),
+                        help="engine whose readings to warm; repeatable (default: FORTUNE_ENGINE or stream)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_N, help="number of input combinations to warm")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                        help="stop once this many prompt+completion tokens have been spent")
+    parser.add_argument("--expected-completion-tokens", type=int, default=DEFAULT_EXPECTED_COMPLETION_TOKENS)
+    parser.add_argument("--window", type=parse_window, help="off-peak window HH:MM-HH:MM, local time")
+    parser.add_argument("--wait", action="store_true", help="sleep until the window opens instead of exiting")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"))
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("OpenAI API key is missing; set OPENAI_API_KEY or pass --api-key")
+
+    if args.window and not in_window(datetime.datetime.now().time(), args.window):
+        if not args.wait:
+            print("Outside the off-peak window; nothing to do.", file=sys.stderr)
+            return 0
+        time.sleep(seconds_until(args.window[0], datetime.datetime.now()))
+
+    kinds = {ENGINE_KINDS[engine] for engine in args.engine or [os.environ.get("FORTUNE_ENGINE", "stream")]}
+    combos = select_combos(load_demand(args.log), kinds, args.top)
+    prewarmer = Prewarmer(
+        args.api_key, reading_cache.get_default_cache(), token_budget=args.token_budget,
+        expected_completion_tokens=args.expected_completion_tokens
+    )
+    for combo in combos:
+        if args.window and not in_window(datetime.datetime.now().time(), args.window):
+            print("Off-peak window closed; stopping.", file=sys.stderr)
+            break
+        if prewarmer.warm(*combo) == "over_budget":
+            print("Token budget exhausted; stopping.", file=sys.stderr)
+            break
+
+    outcomes = ", ".join(f"{name}={count}" for name, count in sorted(prewarmer.outcomes.items()))
+    print(f"{len(combos)} combinations selected; {outcomes}; {prewarmer.tokens_spent} tokens spent", file=sys.stderr)
+    return 1 if prewarmer.outcomes["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
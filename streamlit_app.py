@@ -3,8 +3,12 @@
 
 import streamlit as st
 import datetime
+import functools
 import os
-import openai
+import time
+
+from fortune_core import ai_client, jobs, metrics, offline, reading_cache, readings, render
+from fortune_core.chart import compute_chart
 
 # Page config
 st.set_page_config(
@@ -14,112 +18,27 @@ st.set_page_config(
 )
 
 # Functions
-def get_thai_fortune_details(birth_date):
-    days = ['จันทร์', 'อังคาร', 'พุธ', 'พฤหัสบดี', 'ศุกร์', 'เสาร์', 'อาทิตย์']
-    colors = ['เหลือง', 'ชมพู', 'เขียว', 'ส้ม', 'น้ำเงิน', 'ม่วง', 'แดง']
-    day_of_week = birth_date.weekday()
-    return days[day_of_week], colors[day_of_week]
-
-def get_chinese_fortune_details(birth_year):
-    animals = [
-        ('หนู', 'Rat'), ('วัว', 'Ox'), ('เสือ', 'Tiger'), ('กระต่าย', 'Rabbit'),
-        ('มังกร', 'Dragon'), ('งู', 'Snake'), ('ม้า', 'Horse'), ('แพะ', 'Goat'),
-        ('ลิง', 'Monkey'), ('ไก่', 'Rooster'), ('หมา', 'Dog'), ('หมู', 'Pig')
-    ]
-    index = (birth_year - 1900) % 12
-    return animals[index]
-
-def get_bazi_elements(birth_date, birth_time):
-    heavenly_stems = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
-    earthly_branches = ["子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥"]
-    
-    elements = {
-        "木": {"chinese": "木", "thai": "ไม้", "emoji": "🌳", "color": "#22c55e"},
-        "火": {"chinese": "火", "thai": "ไฟ", "emoji": "🔥", "color": "#ef4444"},
-        "土": {"chinese": "土", "thai": "ดิน", "emoji": "🏔️", "color": "#a3a3a3"},
-        "金": {"chinese": "金", "thai": "โลหะ", "emoji": "⚡", "color": "#fbbf24"},
-        "水": {"chinese": "水", "thai": "น้ำ", "emoji": "💧", "color": "#3b82f6"}
-    }
-    
-    year = birth_date.year
-    month = birth_date.month
-    day = birth_date.day
-    hour = birth_time.hour
-    
-    year_stem = heavenly_stems[(year - 4) % 10]
-    year_branch = earthly_branches[(year - 4) % 12]
-    month_stem = heavenly_stems[(month - 1) % 10]
-    month_branch = earthly_branches[(month - 1) % 12]
-    day_stem = heavenly_stems[(day - 1) % 10]
-    day_branch = earthly_branches[(day - 1) % 12]
-    hour_stem = heavenly_stems[(hour // 2) % 10]
-    hour_branch = earthly_branches[(hour // 2) % 12]
-    
-    dominant_element_key = list(elements.keys())[year % 5]
-    dominant_element = elements[dominant_element_key]
-    
-    return {
-        "year_pillar": f"{year_stem}{year_branch}",
-        "month_pillar": f"{month_stem}{month_branch}",
-        "day_pillar": f"{day_stem}{day_branch}",
-        "hour_pillar": f"{hour_stem}{hour_branch}",
-        "dominant_element": dominant_element
-    }
-
-def generate_enhanced_ai_fortune(birth_date, birth_time, day_name, thai_color, thai_animal):
-    api_key = os.environ.get("OPENAI_API_KEY")
-    
-    if not api_key:
-        return "❌ ไม่พบ OpenAI API Key ในระบบ กรุณาตั้งค่า Environment Variable"
-    
-    try:
-        openai.api_key = api_key
-        
-        today = datetime.date.today()
-        age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-        
-        # Enhanced detailed prompt
-        text_prompt = (
-            f"จงสวมบทบาทเป็น 'ซินแสผู้เชี่ยวชาญศาสตร์จีนระดับปรมาจารย์' ทำการวิเคราะห์ดวงชะตา (ปาจื่อ - 八字) ของบุคคลผู้ถือกำเนิดในวัน {day_name}, เวลา {birth_time.strftime('%H:%M')}, ในปีนักษัตร {thai_animal} (ซึ่งมีรากฐานธาตุตามปีเกิด) โดยมีสี {thai_color} เป็นสีเสริมดวงชะตา.\n\n"
-            f"**คำสั่งในการวิเคราะห์ดวงชะตา:**\n"
-            f"จงเริ่มต้นด้วยการ 'เปิดฟ้าอ่านชะตา' โดยวิเคราะห์ปัจจัยพื้นฐานแห่ง 'ฟ้า-ดิน-คน' ของดวงชะตานี้ก่อน:\n"
-            f" - **ฟ้า (天):** อธิบายว่าพลังแห่งปีนักษัตร {thai_animal} กำหนด 'ธาตุประจำตัว' และภาพรวมแห่งชีวิตไว้อย่างไร\n"
-            f" - **ดิน (地):** วิเคราะห์ว่าพลังหยิน (陰) หรือ หยาง (陽) จากเวลาตกฟาก {birth_time.strftime('%H:%M')} ส่งผลต่อเสถียรภาพและจังหวะชีวิตอย่างไร\n"
-            f" - **คน (人):** อธิบายว่าอิทธิพลจากวันเกิด ({day_name}) ตามคติไทย ช่วยเสริมหรือขัดเกลาพลังจากฟ้าและดินอย่างไรบ้าง\n"
-            f"จงอธิบายปฏิสัมพันธ์ของทั้งสามส่วนนี้ เพื่อสรุปรากฐานความเข้าใจที่ลึกซึ้งและน่าเชื่อถือสูงสุด\n\n"
-            f"เมื่อวางรากฐานแห่งชะตาแล้ว จึงเริ่ม 'ชี้ชัดพยากรณ์' อย่างละเอียดในหัวข้อต่อไปนี้:\n"
-            f"1. **วิเคราะห์แก่นแท้และพลังธาตุ:** เจาะลึกถึงบุคลิกภาพ อุปนิสัย จุดแข็งที่ควรส่งเสริม และจุดอ่อนที่ต้องระวัง ตามหลักเบญจธาตุ (ดิน น้ำ ไฟ ไม้ ทอง)\n"
-            f"2. **ระดับวาสนาและคำเตือนที่ต้องจำให้ขึ้นใจ:** จากการวิเคราะห์ทั้งหมด ให้ประเมิน 'คะแนนวาสนา' เต็ม 100 (เกณฑ์: 90+ คือดวงชะตาระดับสูง, 60-89 คือระดับปานกลาง-ดี) จากนั้นให้อธิบายถึง 'วาสนาที่ดี' หรือพรสวรรค์ที่โดดเด่นของดวงชะตานี้ แล้วจึงให้ **'คำเตือน' ที่ใช้ภาษากระชับ รุนแรง แต่แฝงด้วยความปรารถนาดี (ขอความยาวเป็นพิเศษในส่วนนี้เพื่อความชัดเจน) เพื่อให้ผู้รับสารจำขึ้นใจและตระหนักถึงผลที่จะตามมา**\n"
-            f"3. **กลอนพยากรณ์ชะตา 1 ปีข้างหน้า:** จงเขียนกลอนสี่สุภาพ (กลอนไทยแบบดั้งเดิม) ทำนายแนวโน้มแต่ละเดือนตลอดปีข้างหน้า โดยแต่ละบทกลอนต้องพูดตรงๆ ไม่อ้อมค้อม ชี้ชัดถึงเดือนที่ดี เดือนที่ต้องระวัง ด้วยคำคมกะทัดรัดแต่แหลมคม ให้ผู้ฟังได้คิดและตระหนัก\n"
-            f"4. **เส้นทางแห่งความมั่งคั่ง (การงาน-การเงิน):** ชี้แนะอาชีพที่ส่งเสริมธาตุประจำตัว ทิศทางการลงทุนที่เหมาะสม **เพิ่มหัวข้อ 'มุมมองจากเจ้าคนนายคน (สิ่งที่หัวหน้างานคิดกับท่านในตอนนี้)' โดยให้วิเคราะห์แบบตรงไปตรงมา ไม่ต้องอ้อมค้อม แต่ให้เป็นไปในเชิงสร้างสรรค์เพื่อการพัฒนา ไม่บั่นทอนกำลังใจ** และสุดท้ายมอบ 'คำคมนำทาง' ที่สร้างแรงบันดาลใจในการทำงาน 1 ประโยค\n"
-            f"5. **วาสนาแห่งรักและเครือข่ายสัมพันธ์ (ความรัก-สังคม):** วิเคราะห์ลักษณะเนื้อคู่ตามธาตุที่สมพงษ์ วิธีการเสริมสร้างเสน่ห์ และการบริหารความสัมพันธ์กับคนรอบข้าง\n"
-            f"6. **สมดุลแห่งสังขาร (สุขภาพ):** ให้คำแนะนำในการดูแลสุขภาพตามธาตุเจ้าเรือน และอวัยวะที่ต้องใส่ใจเป็นพิเศษ\n"
-            f"7. **กลยุทธ์ปรับเปลี่ยนชะตา:** แนะนำแนวทางการใช้ชีวิต การปรับสภาพแวดล้อม (ฮวงจุ้ย) หรือการใช้วัตถุมงคล/สีมงคล เพื่อปรับสมดุลธาตุและเสริมสร้างสิริมงคล\n\n"
-            f"**ส่วนสุดท้าย: บทสรุปสำหรับท่าน (ฉบับเข้าใจง่าย)**\n"
-            f"หลังจากคำพยากรณ์ทั้งหมด จงสรุปใจความสำคัญในแต่ละด้าน (ภาพรวม, การงาน, ความรัก, และคำเตือนที่สำคัญที่สุด) ให้เป็นภาษาที่คนทั่วไปเข้าใจง่ายและนำไปใช้ได้ทันที โดยแยกเป็นข้อๆ\n\n"
-            f"จงรจนาคำพยากรณ์ทั้งหมดเป็น **'ภาษาไทย'** ด้วยลีลาของซินแสผู้ทรงภูมิ มีความหนักแน่น ชัดเจน และให้คำแนะนำที่สามารถนำไปปรับใช้ในชีวิตได้จริง"
-        )
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "คุณเป็นซินแสผู้เชี่ยวชาญศาสตร์จีนระดับปรมาจารย์ มีประสบการณ์กว่า 50 ปี เชี่ยวชาญทั้งโหราศาสตร์ไทยและจีน ปาจื่อ ฮวงจุ้ย และเบญจธาตุ ให้คำทำนายที่ลึกซึ้ง แม่นยำ และสร้างสรรค์"
-                },
-                {"role": "user", "content": text_prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.8
-        )
-        
-        return response.choices[0].message.content
-        
-    except Exception as e:
-        return f"❌ เกิดข้อผิดพลาดในการเชื่อมต่อ AI: {str(e)}"
-
-# CSS
-st.markdown("""
+@st.cache_resource
+def get_reading_cache():
+    return reading_cache.ReadingCache.from_env()
+
+@st.cache_resource
+def get_ai_client():
+    # One pooled client per server process; the API key is passed on each call.
+    return ai_client.FortuneAIClient(timeout=readings.DEFAULT_REQUEST_TIMEOUT)
+
+# "stream" writes one long completion progressively; "sectioned" requests each
+# section of the reading concurrently (see fortune_core/readings.py).
+FORTUNE_ENGINE = os.environ.get("FORTUNE_ENGINE", "stream")
+
+# How long to wait for the first AI text before showing the local reading.
+HEDGE_BUDGET_SECONDS = float(os.environ.get("FORTUNE_HEDGE_SECONDS", 5))
+# How often a page checks on its reading job while it runs.
+JOB_POLL_SECONDS = 0.5
+
+# Page styling and header. Streamlit rebuilds the page on every rerun, so these
+# are sent each time, but they are built once per process rather than per run.
+APP_CSS = """
 <style>
 body {
     background: linear-gradient(135deg, #dc2626 0%, #991b1b 100%);
@@ -231,10 +150,9 @@ body {
     text-decoration: underline;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# Header
-st.markdown("""
+HEADER_HTML = """
 <div style="
     text-align: center;
     background: rgba(255, 255, 255, 0.15);
@@ -252,63 +170,47 @@ st.markdown("""
         📜 วิเคราะห์ลึก ด้วยปรมาจารย์ซินแสแห่งศาสตร์จีน 📜
     </p>
 </div>
-""", unsafe_allow_html=True)
+"""
 
-# Input section
-st.markdown("### 📋 ข้อมูลสำหรับผูกดวง")
+ZODIAC_EMOJIS = {
+    "Rat": "🐭", "Ox": "🐮", "Tiger": "🐯", "Rabbit": "🐰", "Dragon": "🐲", 
+    "Snake": "🐍", "Horse": "🐴", "Goat": "🐐", "Monkey": "🐵", 
+    "Rooster": "🐔", "Dog": "🐶", "Pig": "🐷"
+}
 
-col1, col2 = st.columns(2)
+COLOR_MAP = {
+    'แดง': '#dc2626', 'เขียว': '#16a34a', 'น้ำเงิน': '#2563eb',
+    'เหลือง': '#eab308', 'ม่วง': '#9333ea', 'ชมพู': '#ec4899',
+    'ส้ม': '#ea580c', 'ขาว': '#f8fafc', 'ดำ': '#1f2937'
+}
 
-with col1:
-    birth_date = st.date_input(
-        "📅 วัน/เดือน/ปีเกิด:", 
-        datetime.date(1990, 1, 1),
-        min_value=datetime.date(1950, 1, 1), 
-        max_value=datetime.date.today()
-    )
+# Readings kept per browser session, keyed by their inputs, so reruns and
+# repeated clicks redisplay a reading instead of asking the AI again.
+MAX_SESSION_READINGS = 8
 
-with col2:
-    birth_time = st.time_input(
-        "🕐 เวลาเกิด:", 
-        datetime.time(12, 0)
-    )
+# st.fragment replaced st.experimental_fragment in Streamlit 1.37.
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
 
-# Button
-if st.button("🔮 เปิดดวงชะตา", use_container_width=True, type="primary"):
-    st.balloons()
-    
-    day_name, thai_color = get_thai_fortune_details(birth_date)
-    thai_animal, english_animal = get_chinese_fortune_details(birth_date.year)
-    bazi = get_bazi_elements(birth_date, birth_time)
-    
-    col_left, col_right = st.columns(2)
+@st.cache_data(max_entries=1024, show_spinner=False)
+def render_chart_boards(birth_date, birth_time):
+    # The two chart boards depend only on the birth inputs, so their HTML is
+    # built once per input pair and shared by every session.
+    chart = compute_chart(birth_date, birth_time)
+    bazi = chart.bazi()
+    animal_emoji = ZODIAC_EMOJIS.get(chart.zodiac_en, "✨")
+    display_color = COLOR_MAP.get(chart.color_th, chart.color_th.lower())
     
-    with col_left:
-        zodiac_emojis = {
-            "Rat": "🐭", "Ox": "🐮", "Tiger": "🐯", "Rabbit": "🐰", "Dragon": "🐲", 
-            "Snake": "🐍", "Horse": "🐴", "Goat": "🐐", "Monkey": "🐵", 
-            "Rooster": "🐔", "Dog": "🐶", "Pig": "🐷"
-        }
-        animal_emoji = zodiac_emojis.get(english_animal, "✨")
-        
-        color_map = {
-            'แดง': '#dc2626', 'เขียว': '#16a34a', 'น้ำเงิน': '#2563eb',
-            'เหลือง': '#eab308', 'ม่วง': '#9333ea', 'ชมพู': '#ec4899',
-            'ส้ม': '#ea580c', 'ขาว': '#f8fafc', 'ดำ': '#1f2937'
-        }
-        display_color = color_map.get(thai_color, thai_color.lower())
-        
-        st.markdown(f"""
+    thai_board = f"""
         <div class="board">
             <h3>🔮 กระดานชันษาจร</h3>
             <div class="info-grid">
                 <div class="info-item">
                     <div class="label">🌟 ดาวประจำวัน</div>
-                    <div class="value">วัน{day_name}</div>
+                    <div class="value">วัน{chart.day_name_th}</div>
                 </div>
                 <div class="info-item">
                     <div class="label">🐉 ปีนักษัตร</div>
-                    <div class="value">{thai_animal}</div>
+                    <div class="value">{chart.zodiac_th_short}</div>
                 </div>
                 <div class="info-item">
                     <div class="label">⏰ เวลาเกิด</div>
@@ -317,17 +219,16 @@ if st.button("🔮 เปิดดวงชะตา", use_container_width=True,
                 <div class="info-item">
                     <div class="label">🎨 สีมงคล</div>
                     <div class="color-circle" style="background-color: {display_color};"></div>
-                    <div class="value">{thai_color}</div>
+                    <div class="value">{chart.color_th}</div>
                 </div>
             </div>
             <div class="animal-display">
                 <span class="animal-emoji">{animal_emoji}</span>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """
     
-    with col_right:
-        st.markdown(f"""
+    bazi_board = f"""
         <div class="board">
             <h3>🏮 八字命盤</h3>
             <div class="info-grid">
@@ -363,19 +264,167 @@ if st.button("🔮 เปิดดวงชะตา", use_container_width=True,
                 </div>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+        """
+    return thai_board, bazi_board
+
+def show_chart_boards(birth_date, birth_time):
+    thai_board, bazi_board = render_chart_boards(birth_date, birth_time)
+    col_left, col_right = st.columns(2)
+    col_left.markdown(thai_board, unsafe_allow_html=True)
+    col_right.markdown(bazi_board, unsafe_allow_html=True)
+
+@fragment
+def show_reading(fortune_text, birth_date, birth_time):
+    # A fragment, so the download button reruns only the reading, not the page.
+    with metrics.get_default_recorder().stage("render"):
+        reading_html = render.render_reading(fortune_text)
+    st.markdown(reading_html, unsafe_allow_html=True)
+    st.download_button(
+        "💾 บันทึกคำพยากรณ์",
+        fortune_text,
+        file_name=f"fortune_{birth_date:%Y%m%d}_{birth_time:%H%M}.txt",
+        mime="text/plain"
+    )
+
+def remember_reading(session_readings, reading_key, fortune_text):
+    session_readings.pop(reading_key, None)
+    session_readings[reading_key] = fortune_text
+    while len(session_readings) > MAX_SESSION_READINGS:
+        session_readings.pop(next(iter(session_readings)))
+
+@st.cache_resource
+def get_job_queue():
+    # One queue and one FORTUNE_WORKERS-sized pool per server process, so the
+    # number of concurrent AI calls no longer grows with the number of sessions.
+    handler = functools.partial(readings.run_reading_job, cache=get_reading_cache(), client=get_ai_client())
+    jobs.start_default_pool({"reading": handler})
+    return jobs.get_default_queue()
+
+def submit_reading(reading_key):
+    engine, birth_date, birth_time = reading_key
+    # Keyed on the inputs, so sessions asking for a reading that is still being
+    # generated share its job; finished readings are reused only via the reading cache.
+    job_id = get_job_queue().submit(
+        "reading",
+        {"engine": engine, "birth_date": birth_date.isoformat(), "birth_time": birth_time.strftime("%H:%M")},
+        idempotency_key=f"reading:{engine}:{birth_date.isoformat()}:{birth_time:%H:%M}"
+    )
+    pending = {"key": reading_key, "job_id": job_id, "submitted_at": time.time()}
+    st.session_state["pending_reading"] = pending
+    return pending
+
+@fragment(run_every=JOB_POLL_SECONDS)
+def poll_reading():
+    # Reruns on its own every JOB_POLL_SECONDS while a reading job is pending,
+    # showing the text so far; the page reruns in full once the job finishes.
+    pending = st.session_state.get("pending_reading")
+    if pending is None:
+        return
+    reading_key = pending["key"]
+    _, birth_date, birth_time = reading_key
+    job_queue = get_job_queue()
+    job = job_queue.get(pending["job_id"])
     
-    st.markdown("### 📜 คำพยากรณ์ดวงชะตาจากซินแสปรมาจารย์")
+    if job is None or job.status == jobs.FAILED:
+        st.session_state["failed_reading"] = {
+            "key": reading_key,
+            "error": job.error if job is not None else "❌ คำขอพยากรณ์หมดอายุ กรุณาลองใหม่อีกครั้ง",
+        }
+        del st.session_state["pending_reading"]
+        st.rerun()
+    if job.status == jobs.DONE:
+        remember_reading(st.session_state.setdefault("readings", {}), reading_key, job.result)
+        st.session_state["shown_reading"] = reading_key
+        del st.session_state["pending_reading"]
+        st.rerun()
+    
+    position = job_queue.position(job.id)
+    if position:
+        st.info(f"⏳ ขณะนี้มีผู้ใช้งานจำนวนมาก ท่านอยู่ในคิวลำดับที่ {position}")
+    else:
+        st.info("🤖 ซินแสปรมาจารย์กำลังเปิดฟ้าอ่านชะตา กรุณารอสักครู่...")
+    # Hedged reading: until AI text arrives, the local reading is shown once the
+    # budget has passed; the AI text replaces it as soon as it starts arriving.
+    if job.partial:
+        # The partial text only grows, so only its newest block is rendered again on each poll.
+        renderer = pending.setdefault("renderer", render.StreamRenderer())
+        with metrics.get_default_recorder().stage("render"):
+            reading_html = renderer.update(job.partial)
+        st.markdown(reading_html, unsafe_allow_html=True)
+    elif time.time() - pending["submitted_at"] >= HEDGE_BUDGET_SECONDS:
+        offline_text = offline.generate_offline_fortune(birth_date, birth_time)
+        with metrics.get_default_recorder().stage("render"):
+            reading_html = render.render_reading(offline_text)
+        st.markdown(reading_html, unsafe_allow_html=True)
+
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# Header
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
+
+# Input section
+st.markdown("### 📋 ข้อมูลสำหรับผูกดวง")
+
+col1, col2 = st.columns(2)
+
+with col1:
+    birth_date = st.date_input(
+        "📅 วัน/เดือน/ปีเกิด:", 
+        datetime.date(1990, 1, 1),
+        min_value=datetime.date(1950, 1, 1), 
+        max_value=datetime.date.today()
+    )
+
+with col2:
+    birth_time = st.time_input(
+        "🕐 เวลาเกิด:", 
+        datetime.time(12, 0)
+    )
+
+# Button
+clicked = st.button("🔮 เปิดดวงชะตา", use_container_width=True, type="primary")
+
+# The AI is only asked when the button is pressed for inputs this session has no
+# reading for yet; every other rerun redisplays the stored reading. The reading
+# itself is generated by the job pool, and the page only polls for it.
+session_readings = st.session_state.setdefault("readings", {})
+reading_key = (FORTUNE_ENGINE, birth_date, birth_time)
+pending = st.session_state.get("pending_reading")
+if clicked and reading_key not in session_readings and (pending is None or pending["key"] != reading_key):
+    st.balloons()
+    pending = submit_reading(reading_key)
+    st.session_state.pop("failed_reading", None)
+if reading_key in session_readings:
+    st.session_state["shown_reading"] = reading_key
+    st.session_state.pop("failed_reading", None)
+failed = st.session_state.get("failed_reading")
+
+if pending is not None:
+    shown_key = pending["key"]
+elif failed is not None:
+    shown_key = failed["key"]
+else:
+    shown_key = st.session_state.get("shown_reading")
+    if shown_key not in session_readings:
+        shown_key = None
+
+if shown_key is not None:
+    _, shown_date, shown_time = shown_key
+    if shown_key != reading_key:
+        st.info("ℹ️ คำพยากรณ์ด้านล่างเป็นของข้อมูลเดิม กดปุ่ม \"เปิดดวงชะตา\" เพื่อผูกดวงตามข้อมูลใหม่")
     
-    with st.spinner("🤖 ซินแสปรมาจารย์กำลังเปิดฟ้าอ่านชะตา กรุณารอสักครู่..."):
-        fortune_text = generate_enhanced_ai_fortune(birth_date, birth_time, day_name, thai_color, thai_animal)
+    show_chart_boards(shown_date, shown_time)
     
-    if fortune_text:
-        st.markdown(f"""
-        <div class="fortune-content">
-            {fortune_text.replace('\\n', '<br>').replace('**', '<strong>').replace('**', '</strong>')}
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown("### 📜 คำพยากรณ์ดวงชะตาจากซินแสปรมาจารย์")
+    
+    if pending is not None:
+        poll_reading()
+    elif failed is not None:
+        # Failed readings are not kept, so pressing the button again retries.
+        st.warning(failed["error"])
+        show_reading(offline.generate_offline_fortune(shown_date, shown_time), shown_date, shown_time)
+    else:
+        show_reading(session_readings[shown_key], shown_date, shown_time)
 
 st.markdown("---")
 st.markdown(
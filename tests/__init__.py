@@ -0,0 +1,3 @@
+# tests/__init__.py
+# Unit tests for fortune_core. Run them from the repository root with
+# `python -m pytest`.
@@ -0,0 +1,172 @@
+# tests/test_jobs.py
+# The SQLite job queue: claim order, idempotency, stale-job recovery, purging,
+# and the worker pool's heartbeat.
+
+import threading
+import time
+
+import pytest
+
+from fortune_core import jobs
+
+
+@pytest.fixture
+def queue():
+    queue = jobs.JobQueue("")
+    yield queue
+    queue.close()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_claims_follow_lane_then_arrival_order(queue):
+    first = queue.submit("reading", {"n": 1}, lane="background")
+    second = queue.submit("reading", {"n": 2})
+    third = queue.submit("reading", {"n": 3})
+    assert [queue.position(j) for j in (first, second, third)] == [3, 1, 2]
+    claimed = [queue.claim() for _ in range(3)]
+    assert [job.id for job in claimed] == [second, third, first]
+    assert all(job.status == jobs.RUNNING and job.attempts == 1 for job in claimed)
+    assert queue.claim() is None
+    assert queue.position(second) == 0
+
+
+def test_claim_only_takes_the_given_kinds(queue):
+    queue.submit("other", {})
+    reading = queue.submit("reading", {})
+    assert queue.claim(["reading"]).id == reading
+    assert queue.claim(["reading"]) is None
+
+
+def test_unknown_lane_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("reading", {}, lane="urgent")
+
+
+def test_submissions_share_a_job_only_while_it_is_unfinished(queue):
+    job_id = queue.submit("reading", {}, idempotency_key="k")
+    assert queue.submit("reading", {}, idempotency_key="k") == job_id
+    job = queue.claim()
+    assert queue.submit("reading", {}, idempotency_key="k") == job_id
+    assert queue.complete(job.id, job.attempts, "reading text")
+
+    retry_id = queue.submit("reading", {}, idempotency_key="k")
+    assert retry_id != job_id
+    # The finished job stays readable by id for the page polling it.
+    assert queue.get(job_id).result == "reading text"
+    retry = queue.claim()
+    assert queue.fail(retry.id, retry.attempts, "boom")
+    assert queue.get(retry_id).error == "boom"
+    assert queue.submit("reading", {}, idempotency_key="k") not in (job_id, retry_id)
+
+
+def test_partial_text_and_result(queue):
+    queue.submit("reading", {"engine": "stream"})
+    job = queue.claim()
+    assert job.payload == {"engine": "stream"}
+    assert queue.update_partial(job.id, job.attempts, "ดวง")
+    assert queue.get(job.id).partial == "ดวง"
+    assert queue.complete(job.id, job.attempts, "ดวงดี")
+    done = queue.get(job.id)
+    assert (done.status, done.partial, done.result, done.finished) == (jobs.DONE, None, "ดวงดี", True)
+    assert queue.stats() == {jobs.QUEUED: 0, jobs.RUNNING: 0, jobs.DONE: 1, jobs.FAILED: 0}
+
+
+def test_stale_jobs_are_requeued_until_out_of_attempts():
+    queue = jobs.JobQueue("", stale_seconds=0, max_attempts=2)
+    job_id = queue.submit("reading", {})
+    first = queue.claim()
+    time.sleep(0.01)
+    assert queue.requeue_stale() == 1
+    assert queue.get(job_id).status == jobs.QUEUED
+    second = queue.claim()
+    assert second.attempts == 2
+    time.sleep(0.01)
+    assert queue.requeue_stale() == 0
+    lost = queue.get(job_id)
+    assert (lost.status, lost.error) == (jobs.FAILED, "worker lost")
+    assert first.attempts == 1
+    queue.close()
+
+
+def test_a_requeued_attempt_cannot_overwrite_its_retry():
+    queue = jobs.JobQueue("", stale_seconds=0)
+    job_id = queue.submit("reading", {}, idempotency_key="k")
+    stale = queue.claim()
+    time.sleep(0.01)
+    queue.requeue_stale()
+    live = queue.claim()
+    assert not queue.update_partial(stale.id, stale.attempts, "late")
+    assert not queue.heartbeat(stale.id, stale.attempts)
+    assert not queue.fail(stale.id, stale.attempts, "late failure")
+    assert not queue.complete(stale.id, stale.attempts, "late result")
+    assert queue.get(job_id).status == jobs.RUNNING
+    assert queue.submit("reading", {}, idempotency_key="k") == job_id
+    assert queue.complete(live.id, live.attempts, "reading text")
+    assert queue.get(job_id).result == "reading text"
+    queue.close()
+
+
+def test_finished_jobs_are_purged_after_the_retention_period():
+    queue = jobs.JobQueue("", retention_seconds=0)
+    done_id = queue.submit("reading", {})
+    job = queue.claim()
+    queue.complete(job.id, job.attempts, "text")
+    running_id = queue.submit("reading", {})
+    queue.claim()
+    time.sleep(0.01)
+    queue.submit("reading", {})
+    assert queue.get(done_id) is None
+    assert queue.get(running_id).status == jobs.RUNNING
+    queue.close()
+
+
+def test_pool_runs_jobs_and_reports_failures(queue):
+    def handler(payload, progress):
+        progress("partial")
+        if payload.get("fail"):
+            raise RuntimeError("no reading")
+        return "reading text"
+
+    pool = jobs.WorkerPool(queue, {"reading": handler}, workers=2, poll_interval=0.01).start()
+    try:
+        ok = queue.submit("reading", {})
+        bad = queue.submit("reading", {"fail": True})
+        wait_until(lambda: queue.get(ok).finished and queue.get(bad).finished)
+    finally:
+        pool.stop(timeout=5)
+    assert queue.get(ok).result == "reading text"
+    assert (queue.get(bad).status, queue.get(bad).error) == (jobs.FAILED, "no reading")
+
+
+def test_heartbeat_keeps_a_silent_job_alive():
+    # The handler produces no text for several stale windows, as a sectioned
+    # reading or one stuck in client retries does.
+    queue = jobs.JobQueue("", stale_seconds=0.2)
+    release = threading.Event()
+
+    def handler(payload, progress):
+        release.wait(5)
+        return "reading text"
+
+    pool = jobs.WorkerPool(queue, {"reading": handler}, workers=1, poll_interval=0.01,
+                           heartbeat_interval=0.02).start()
+    try:
+        job_id = queue.submit("reading", {})
+        wait_until(lambda: queue.get(job_id).status == jobs.RUNNING)
+        for _ in range(6):
+            time.sleep(0.1)
+            assert queue.requeue_stale() == 0
+        release.set()
+        wait_until(lambda: queue.get(job_id).finished)
+        job = queue.get(job_id)
+        assert (job.status, job.attempts) == (jobs.DONE, 1)
+    finally:
+        release.set()
+        pool.stop(timeout=5)
+        queue.close()
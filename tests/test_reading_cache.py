@@ -0,0 +1,126 @@
+# tests/test_reading_cache.py
+# The two-tier reading cache: key stability, expiry and size bounds in both
+# tiers, promotion from the disk tier to memory, and the hit/miss counters.
+
+import pytest
+
+from fortune_core import reading_cache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reading_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path):
+    return reading_cache.SQLiteStore(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, max_entries=3)
+
+
+def test_cache_key_ignores_parameter_order():
+    messages = [{"role": "user", "content": "ดวงวันนี้"}]
+    assert reading_cache.make_cache_key("m", messages, temperature=0.7, max_tokens=10) == (
+        reading_cache.make_cache_key("m", messages, max_tokens=10, temperature=0.7)
+    )
+    assert reading_cache.make_cache_key("m", messages, temperature=0.7) != (
+        reading_cache.make_cache_key("m", messages, temperature=0.8)
+    )
+
+
+def test_memory_entries_expire(clock):
+    memory = reading_cache.MemoryLRU(ttl_seconds=60)
+    memory.put("a", "reading")
+    clock.now += 59
+    assert memory.get("a") == "reading"
+    clock.now += 2
+    assert memory.get("a") is None
+    assert len(memory) == 0
+
+
+def test_memory_evicts_the_least_recently_read(clock):
+    memory = reading_cache.MemoryLRU(max_entries=2)
+    memory.put("a", "1")
+    memory.put("b", "2")
+    memory.get("a")
+    memory.put("c", "3")
+    assert memory.get("b") is None
+    assert memory.get("a") == "1" and memory.get("c") == "3"
+
+
+def test_store_entries_expire(clock, store):
+    store.put("a", "reading")
+    clock.now += 59
+    assert store.get("a") == "reading"
+    # Reading an entry does not extend its life.
+    clock.now += 2
+    assert store.get("a") is None
+    assert len(store) == 0
+
+
+def test_store_evicts_the_least_recently_read(clock, store):
+    for key in "abc":
+        store.put(key, key)
+        clock.now += 1
+    store.get("a")
+    clock.now += 1
+    store.put("d", "d")
+    assert len(store) == 3
+    assert store.get("b") is None
+    assert [store.get(key) for key in "acd"] == ["a", "c", "d"]
+
+
+def test_store_drops_expired_rows_before_evicting_live_ones(clock, store):
+    store.put("old", "old")
+    clock.now += 30
+    store.put("a", "a")
+    store.put("b", "b")
+    clock.now += 31
+    store.put("c", "c")
+    assert store.get("old") is None
+    assert [store.get(key) for key in "abc"] == ["a", "b", "c"]
+
+
+def test_store_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    reading_cache.SQLiteStore(path).put("a", "reading")
+    assert reading_cache.SQLiteStore(path).get("a") == "reading"
+
+
+def test_store_hits_are_promoted_to_memory(store):
+    store.put("a", "reading")
+    cache = reading_cache.ReadingCache(memory=reading_cache.MemoryLRU(), store=store)
+    assert cache.get("a") == "reading"
+    assert cache.memory.get("a") == "reading"
+    assert cache.get("a") == "reading"
+    stats = cache.stats()
+    assert stats["store_hits"] == 1 and stats["memory_hits"] == 1
+
+
+def test_counters_and_hit_ratio(store):
+    cache = reading_cache.ReadingCache(memory=reading_cache.MemoryLRU(), store=store)
+    assert cache.stats()["hit_ratio"] == 0.0
+    assert cache.get("a") is None
+    cache.put("a", "reading")
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats() == {
+        "memory_hits": 2, "store_hits": 0, "misses": 2, "writes": 1, "hit_ratio": 0.5
+    }
+
+
+def test_disabled_tiers_always_miss():
+    cache = reading_cache.ReadingCache()
+    cache.put("a", "reading")
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1 and cache.stats()["writes"] == 1
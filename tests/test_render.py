@@ -0,0 +1,94 @@
+# tests/test_render.py
+# The reading renderer: escaping, inline markers, block structure, and the
+# streaming renderer agreeing with a whole-reading render.
+
+import datetime
+import random
+
+import pytest
+
+from fortune_core import offline, render
+from fortune_core.chart import compute_chart
+
+
+def test_html_in_the_reading_is_escaped():
+    html = render.render_markdown('<script>alert("x")</script> & <b>bold</b>')
+    assert "<script>" not in html and "<b>" not in html
+    assert "&lt;script&gt;" in html and "&amp;" in html
+
+
+def test_markers_do_not_smuggle_markup():
+    html = render.render_markdown("**<img src=x onerror=alert(1)>**")
+    assert html == "<p><strong>&lt;img src=x onerror=alert(1)&gt;</strong></p>"
+
+
+@pytest.mark.parametrize("text", ["ราคา **พิเศษ", "a ** b", "**", "*open", "_open"])
+def test_unpaired_markers_stay_literal(text):
+    html = render.render_markdown(text)
+    assert "<strong>" not in html and "<em>" not in html
+    assert html == f"<p>{text}</p>"
+
+
+def test_inline_markers():
+    assert render.render_inline("**ดวง** ดี *มาก* _จริง_") == (
+        "<strong>ดวง</strong> ดี <em>มาก</em> <em>จริง</em>"
+    )
+
+
+def test_blocks():
+    text = "# หัวข้อ\n\nบรรทัด 1\nบรรทัด 2\n\n- ก\n- ข\n\n3. สาม\n4. สี่\n\n---"
+    assert render.render_markdown(text) == (
+        '<h1 class="section-title">หัวข้อ</h1>'
+        "<p>บรรทัด 1<br>บรรทัด 2</p>"
+        "<ul><li>ก</li><li>ข</li></ul>"
+        '<ol start="3"><li>สาม</li><li>สี่</li></ol>'
+        "<hr>"
+    )
+
+
+def test_render_reading_wraps_the_container():
+    assert render.render_reading("x") == '<div class="fortune-content"><p>x</p></div>'
+
+
+def sample_readings():
+    readings = [
+        "**a**\n\n\n**b**\r\n\r\nc\n \nd\n\n",
+        "# h\n- x\n- y\n\n1. z\n\n---\n\n*e* **f",
+    ]
+    for birth_date in (datetime.date(1950, 1, 1), datetime.date(1990, 6, 15), datetime.date(2010, 12, 31)):
+        chart = compute_chart(birth_date, datetime.time(9, 30))
+        readings.append(offline.generate_offline_fortune(birth_date, datetime.time(9, 30)))
+        readings.append(f"**{chart.zodiac_th}**\n\n{chart.day_name_th} <{chart.color_th}>")
+    return readings
+
+
+@pytest.mark.parametrize("text", sample_readings())
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64])
+def test_stream_renderer_matches_whole_render(text, chunk_size):
+    renderer = render.StreamRenderer()
+    for i in range(0, len(text), chunk_size):
+        chunk = text[i:i + chunk_size]
+        html = renderer.feed(chunk)
+        assert html == render.render_reading(text[:i + len(chunk)])
+    assert renderer.html == render.render_reading(text)
+
+
+def test_stream_renderer_random_chunks():
+    rng = random.Random(0)
+    alphabet = ["\n", "\n\n", " ", "\r\n", "*", "**", "_", "#", "- ", "1. ", "---", "<", "&", "ก", "x"]
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 60)))
+        renderer = render.StreamRenderer()
+        i = 0
+        while i < len(text):
+            step = rng.randrange(1, 6)
+            renderer.feed(text[i:i + step])
+            i += step
+        assert renderer.html == render.render_reading(text)
+
+
+def test_stream_renderer_update_restarts_on_a_new_text():
+    renderer = render.StreamRenderer()
+    renderer.update("first reading\n\nmore")
+    assert renderer.update("second") == render.render_reading("second")
+    assert renderer.update("second\n\nthird") == render.render_reading("second\n\nthird")
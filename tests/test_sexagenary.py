@@ -0,0 +1,81 @@
+# tests/test_sexagenary.py
+# Known pillars for the sexagenary engine, and agreement between the scalar
+# chart functions and their vectorized counterparts.
+
+import datetime
+
+import pytest
+
+from fortune_core import sexagenary, tables
+from fortune_core.chart import compute_chart
+
+
+def pillar_strings(birth_date, birth_time=None):
+    p = sexagenary.pillars(birth_date, birth_time)
+    return tuple(
+        tables.HEAVENLY_STEMS[stem] + tables.EARTHLY_BRANCHES[branch]
+        for stem, branch in (
+            (p.year_stem, p.year_branch), (p.month_stem, p.month_branch),
+            (p.day_stem, p.day_branch), (p.hour_stem, p.hour_branch),
+        )
+    )
+
+
+def test_1949_10_01_is_a_jiazi_day():
+    assert pillar_strings(datetime.date(1949, 10, 1))[2] == "甲子"
+
+
+def test_1990_01_01_noon():
+    assert pillar_strings(datetime.date(1990, 1, 1), datetime.time(12, 0)) == ("己巳", "丙子", "丙寅", "甲午")
+
+
+def test_day_changes_at_23_00():
+    assert pillar_strings(datetime.date(1949, 9, 30), datetime.time(23, 0))[2] == "甲子"
+    assert pillar_strings(datetime.date(1949, 9, 30), datetime.time(22, 59))[2] != "甲子"
+
+
+@pytest.mark.parametrize("birth_time, year_pillar, zodiac", [
+    # Lichun 2024 fell at 15:27 Thai time on 4 February.
+    (datetime.time(15, 20), "癸卯", "Rabbit"),
+    (datetime.time(15, 35), "甲辰", "Dragon"),
+])
+def test_zodiac_year_changes_at_lichun_2024(birth_time, year_pillar, zodiac):
+    birth_date = datetime.date(2024, 2, 4)
+    assert pillar_strings(birth_date, birth_time)[0] == year_pillar
+    assert compute_chart(birth_date, birth_time).zodiac_en == zodiac
+
+
+def test_dates_outside_the_table_are_rejected():
+    with pytest.raises(ValueError):
+        sexagenary.pillars(datetime.date(1899, 12, 31))
+
+
+def test_vectorized_matches_scalar():
+    np = pytest.importorskip("numpy")
+    from fortune_core import vectorized
+
+    start = datetime.datetime(1950, 1, 1)
+    # Every ~6.1 days over 60 years, at times cycling through the hours and
+    # minutes, so boundaries of terms, days and hours are all crossed.
+    births = [start + datetime.timedelta(minutes=8837 * i) for i in range(3600)]
+    stamps = np.array(births, dtype="datetime64[m]")
+    codes = vectorized.bazi_codes(stamps)
+    zodiac = vectorized.zodiac_indices(stamps)
+    weekdays = vectorized.weekday_codes(stamps)
+    for i, birth in enumerate(births):
+        chart = compute_chart(birth.date(), birth.time())
+        assert tuple(int(codes[field][i]) for field in sexagenary.Pillars._fields) == chart.pillars
+        assert zodiac[i] == chart.pillars.year_branch
+        assert weekdays[i] == chart.weekday
+
+
+def test_vectorized_bare_dates_are_noon():
+    np = pytest.importorskip("numpy")
+    from fortune_core import vectorized
+
+    # Lichun 1990 fell in the morning, so noon is already in the new year.
+    dates = np.array(["1990-02-04", "2024-02-04"], dtype="datetime64[D]")
+    codes = vectorized.bazi_codes(dates)
+    expected = [compute_chart(datetime.date(1990, 2, 4)), compute_chart(datetime.date(2024, 2, 4))]
+    assert list(vectorized.zodiac_indices(dates)) == [c.zodiac for c in expected]
+    assert list(codes["year_branch"]) == [c.pillars.year_branch for c in expected]
@@ -0,0 +1,124 @@
+# tests/test_singleflight.py
+# Coalescing and the concurrency gate of SingleFlight, and the streamed
+# reading's use of it.
+
+import concurrent.futures
+import datetime
+import threading
+import time
+
+import pytest
+
+from fortune_core import prompts, reading_cache, readings, singleflight
+
+
+def test_concurrent_calls_for_one_key_share_one_call():
+    flights = singleflight.SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "reading"
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        first = executor.submit(flights.do, "key", slow)
+        started.wait()
+        others = [executor.submit(flights.do, "key", slow) for _ in range(7)]
+        results = [f.result() for f in [first] + others]
+    assert results == ["reading"] * 8
+    assert calls == [1]
+    assert flights.stats() == {"in_flight": 0, "active": 0, "queued": 0, "coalesced": 7}
+
+
+def test_errors_are_shared_and_the_key_is_released():
+    flights = singleflight.SingleFlight()
+    future, leader = flights.join("key")
+    follower, is_leader = flights.join("key")
+    assert leader and not is_leader and follower is future
+    flights.resolve("key", error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        follower.result(timeout=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flights.do("key", fail)
+    assert flights.do("key", lambda: "again") == "again"
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_slots_bound_concurrency():
+    flights = singleflight.SingleFlight(max_concurrent=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def call(i):
+        with flights.slot(f"key{i}"):
+            with lock:
+                active.append(i)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(i)
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        list(executor.map(call, range(16)))
+    assert max(peak) == 2
+    assert flights.stats()["active"] == 0
+
+
+class FailingCache:
+    """A reading cache whose writes fail, like a locked SQLite file."""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, value):
+        raise RuntimeError("database is locked")
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def stream(self, messages, model, **kwargs):
+        self.calls += 1
+        yield "**ดวง**"
+        yield " ดี"
+
+
+def read(cache, client, flights, **kwargs):
+    return "".join(readings.stream_reading(
+        "sk-test", "จันทร์", "เหลือง", "ม้า", datetime.time(9, 0), cache=cache, client=client, flights=flights,
+        **kwargs
+    ))
+
+
+def test_failed_cache_write_does_not_strand_later_readings():
+    flights = singleflight.SingleFlight()
+    client = FakeClient()
+    assert read(FailingCache(), client, flights) == "**ดวง** ดี"
+    assert flights.stats()["in_flight"] == 0
+    # Before the fix, the key stayed in flight and this call waited forever.
+    results = []
+    thread = threading.Thread(target=lambda: results.append(read(FailingCache(), client, flights)), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert results == ["**ดวง** ดี"]
+    assert client.calls == 2
+
+
+def test_followers_give_up_after_the_follower_timeout():
+    flights = singleflight.SingleFlight()
+    messages = prompts.build_messages("enhanced", "จันทร์", "เหลือง", "ม้า", datetime.time(9, 0))
+    # Another session leads this reading and never finishes.
+    flights.join(reading_cache.make_cache_key(prompts.ENHANCED_MODEL, messages, **prompts.ENHANCED_PARAMS))
+    client = FakeClient()
+    with pytest.raises(concurrent.futures.TimeoutError):
+        read(FailingCache(), client, flights, follower_timeout=0.05)
+    assert client.calls == 0